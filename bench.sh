@@ -0,0 +1 @@
+cd src && python3.13 -m bench "$@"
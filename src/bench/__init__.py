@@ -0,0 +1,8 @@
+"""
+Benchmarks for the generator.
+corpus - deterministic synthetic markdown content
+micro - timings of the single parsing and rendering steps
+build - end to end builds of generated sites
+results - storing results and comparing them against a recorded baseline
+Run with ./bench.sh (python3 -m bench from src/), see --help.
+"""
@@ -0,0 +1,57 @@
+import argparse
+import sys
+from bench.build import run_build
+from bench.corpus import CorpusConfig
+from bench.memory import run_memory
+from bench.micro import run_micro
+from bench.results import DEFAULT_THRESHOLD, compare_results, format_results, load_results, make_results, save_results
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="bench", description="Benchmark the static site generator on synthetic content")
+    parser.add_argument("suite", nargs="?", choices=("micro", "memory", "build", "all"), default="all")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma separated page counts of the build benchmark")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="worker processes of the build benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sample-pages", type=int, default=50, help="documents the micro benchmarks run over")
+    parser.add_argument("--inline-density", type=float, default=0.1)
+    parser.add_argument("--nesting-depth", type=int, default=3)
+    parser.add_argument("--images", type=int, default=2, help="images per page")
+    parser.add_argument("--links", type=int, default=4, help="links per page")
+    parser.add_argument("--output", default="bench-results.json", help="where the json results are written")
+    parser.add_argument("--baseline", help="json results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown against the baseline, 0.1 = 10%%")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    config = CorpusConfig(inline_density=args.inline_density, nesting_depth=args.nesting_depth,
+                          images_per_page=args.images, links_per_page=args.links)
+
+    results = {}
+    if args.suite in ("micro", "all"):
+        for name, result in run_micro(args.sample_pages, args.seed, config).items():
+            results[f"micro.{name}"] = result
+    if args.suite in ("memory", "all"):
+        for name, result in run_memory(args.sample_pages, args.seed, config).items():
+            results[f"memory.{name}"] = result
+    if args.suite in ("build", "all"):
+        for pages in [int(size) for size in args.sizes.split(",") if size]:
+            print(f"Building {pages} pages...", file=sys.stderr)
+            results[f"build.{pages}"] = run_build(pages, args.seed, config, args.jobs)
+
+    current = make_results(results, {"seed": args.seed, "jobs": args.jobs, "sample_pages": args.sample_pages, "corpus": config.to_dict()})
+    save_results(args.output, current)
+    baseline = load_results(args.baseline) if args.baseline else None
+    print(format_results(current, baseline))
+    print(f"Results written to {args.output}")
+
+    if baseline:
+        regressions = compare_results(current, baseline, args.threshold)
+        for name, base_seconds, seconds in regressions:
+            print(f"REGRESSION {name}: {base_seconds * 1000:.3f}ms -> {seconds * 1000:.3f}ms")
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
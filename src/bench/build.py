@@ -0,0 +1,54 @@
+import contextlib
+import os
+import shutil
+import tempfile
+import time
+from bench.corpus import write_corpus
+from main import generate_pages_recursive, rec_copy_static, setup_public_dir
+
+TEMPLATE = """<!doctype html>
+<html>
+  <head>
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>
+"""
+
+def write_site(site_dir, pages, seed=0, config=None):
+    write_corpus(os.path.join(site_dir, "content"), pages, seed, config)
+    os.makedirs(os.path.join(site_dir, "static", "images"), exist_ok=True)
+    with open(os.path.join(site_dir, "static", "index.css"), "w") as file:
+        file.write("body { margin: 0; }\n")
+    for i in range(8):
+        with open(os.path.join(site_dir, "static", "images", f"image{i}.png"), "wb") as file:
+            file.write(bytes(range(256)) * 64)
+    with open(os.path.join(site_dir, "template.html"), "w") as file:
+        file.write(TEMPLATE)
+
+"""
+Generates a site with pages pages and times a full build of it.
+The per page log of the build is discarded so it doesn't dominate the timing.
+"""
+def run_build(pages, seed=0, config=None, jobs=1, base_path="/"):
+    site_dir = tempfile.mkdtemp(prefix="ssg-bench-")
+    try:
+        write_site(site_dir, pages, seed, config)
+        content_dir = os.path.join(site_dir, "content")
+        static_dir = os.path.join(site_dir, "static")
+        template_path = os.path.join(site_dir, "template.html")
+        dest_dir = os.path.join(site_dir, "docs")
+
+        start = time.perf_counter()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            setup_public_dir(dest_dir)
+            rec_copy_static(static_dir, dest_dir)
+            generate_pages_recursive(base_path, content_dir, template_path, dest_dir, jobs)
+        seconds = time.perf_counter() - start
+    finally:
+        shutil.rmtree(site_dir)
+
+    return {"seconds": seconds, "pages_per_second": pages / seconds}
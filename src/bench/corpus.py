@@ -0,0 +1,115 @@
+import os
+import random
+
+WORDS = (
+    "hobbit", "ring", "shire", "elf", "dwarf", "wizard", "mountain", "river", "forest", "tower",
+    "sword", "council", "journey", "shadow", "light", "song", "road", "king", "steward", "horse",
+    "the", "a", "of", "and", "to", "in", "with", "under", "beyond", "again",
+)
+
+BLOCK_TYPES = ("paragraph", "heading", "code", "quote", "unordered_list", "ordered_list")
+
+class CorpusConfig():
+
+    """
+    block_mix - dict of block type -> relative weight, keys are BLOCK_TYPES
+    blocks_per_page - (min, max) number of blocks after the title
+    words_per_block - (min, max) words in a paragraph, quote or code block
+    inline_density - probability that a word is wrapped in bold, italic or code
+    nesting_depth - maximum directory depth of the generated pages
+    images_per_page - images spread over the paragraphs of a page
+    links_per_page - links spread over the paragraphs of a page
+    """
+    def __init__(self, block_mix=None, blocks_per_page=(8, 24), words_per_block=(20, 80), inline_density=0.1,
+                 nesting_depth=3, images_per_page=2, links_per_page=4):
+        self.block_mix = block_mix or {"paragraph": 10, "heading": 2, "code": 1, "quote": 1, "unordered_list": 2, "ordered_list": 1}
+        self.blocks_per_page = blocks_per_page
+        self.words_per_block = words_per_block
+        self.inline_density = inline_density
+        self.nesting_depth = nesting_depth
+        self.images_per_page = images_per_page
+        self.links_per_page = links_per_page
+
+    def to_dict(self):
+        return dict(vars(self))
+
+def words(rng, count):
+    return [rng.choice(WORDS) for _ in range(count)]
+
+def inline_text(rng, config, count):
+    text = []
+    for word in words(rng, count):
+        if rng.random() < config.inline_density:
+            delimiter = rng.choice(("**", "_", "`"))
+            word = f"{delimiter}{word}{delimiter}"
+        text.append(word)
+    return text
+
+def make_block(rng, config, block_type):
+    low, high = config.words_per_block
+    match(block_type):
+        case "heading":
+            return "#" * rng.randint(2, 5) + " " + " ".join(inline_text(rng, config, rng.randint(2, 6)))
+        case "code":
+            lines = [" ".join(words(rng, rng.randint(3, 10))) for _ in range(rng.randint(2, 8))]
+            return "```\n" + "\n".join(lines) + "\n```"
+        case "quote":
+            return "> " + " ".join(inline_text(rng, config, rng.randint(low, high)))
+        case "unordered_list":
+            return "\n".join("- " + " ".join(inline_text(rng, config, rng.randint(3, 12))) for _ in range(rng.randint(2, 8)))
+        case "ordered_list":
+            return "\n".join(f"{i}. " + " ".join(inline_text(rng, config, rng.randint(3, 12))) for i in range(1, rng.randint(2, 8) + 1))
+        case _:
+            return " ".join(inline_text(rng, config, rng.randint(low, high)))
+
+"""
+Builds one markdown page. Images and links are inserted into random paragraphs,
+a page without paragraphs gets one so the counts are always met.
+"""
+def generate_markdown(rng, config):
+    types = list(config.block_mix)
+    weights = [config.block_mix[block_type] for block_type in types]
+    block_types = rng.choices(types, weights, k=rng.randint(*config.blocks_per_page))
+    if "paragraph" not in block_types:
+        block_types.append("paragraph")
+    blocks = [make_block(rng, config, block_type) for block_type in block_types]
+
+    paragraphs = [i for i, block_type in enumerate(block_types) if block_type == "paragraph"]
+    for i in range(config.images_per_page):
+        index = rng.choice(paragraphs)
+        blocks[index] += f" ![{' '.join(words(rng, 3))}](/images/image{i % 8}.png)"
+    for i in range(config.links_per_page):
+        index = rng.choice(paragraphs)
+        blocks[index] += f" [{' '.join(words(rng, 2))}](/page/{rng.randrange(1000)})"
+
+    title = "# " + " ".join(words(rng, rng.randint(2, 6)))
+    return "\n\n".join([title] + blocks) + "\n"
+
+"""
+Deterministic relative path of page number index, spread over nesting_depth directory levels.
+"""
+def page_path(index, nesting_depth):
+    parts = []
+    rest = index
+    for _ in range(nesting_depth):
+        parts.append(f"section{rest % 10}")
+        rest //= 10
+    return os.path.join(*parts, f"page{index}", "index.md") if parts else os.path.join(f"page{index}", "index.md")
+
+"""
+Yields (relative path, markdown) for pages 0..pages-1.
+Every page has its own random generator derived from seed and its index,
+so page n is identical no matter how many pages are generated.
+"""
+def iter_corpus(pages, seed=0, config=None):
+    config = config or CorpusConfig()
+    for index in range(pages):
+        rng = random.Random(f"{seed}:{index}")
+        yield page_path(index, config.nesting_depth), generate_markdown(rng, config)
+
+def write_corpus(dest_dir, pages, seed=0, config=None):
+    for rel_path, markdown in iter_corpus(pages, seed, config):
+        path = os.path.join(dest_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            file.write(markdown)
@@ -0,0 +1,62 @@
+import gc
+import tracemalloc
+from helperfunctions import markdown_to_blocks, markdown_to_html_node, text_to_textnodes
+from htmlnode import HTMLNode
+from leafnode import LeafNode
+from parentnode import ParentNode
+from textnode import TextNode, TextType
+from bench.micro import sample_documents
+
+NODE_COUNT = 10000
+
+"""
+Bytes traced while make() runs, the result of make is kept alive until the measurement is taken.
+"""
+def traced_bytes(make):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = make()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return after - before
+
+def count_nodes(node):
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if isinstance(node, ParentNode):
+            stack.extend(node.children)
+    return count
+
+"""
+Bytes per node of every node class and of real node trees.
+The per class numbers allocate NODE_COUNT nodes over shared strings, so they are the size of the node objects alone
+(the list holding them is subtracted). The tree numbers include everything markdown_to_html_node and text_to_textnodes
+allocate for the sample documents, divided by the number of nodes they produce.
+"""
+def run_memory(pages=50, seed=0, config=None):
+    text = "shared text"
+    children = [LeafNode(None, text)]
+    list_bytes = traced_bytes(lambda: [None] * NODE_COUNT)
+    makers = {
+        "TextNode": lambda: [TextNode(text, TextType.BOLD) for _ in range(NODE_COUNT)],
+        "HTMLNode": lambda: [HTMLNode("p", text) for _ in range(NODE_COUNT)],
+        "LeafNode": lambda: [LeafNode("b", text) for _ in range(NODE_COUNT)],
+        "ParentNode": lambda: [ParentNode("p", children) for _ in range(NODE_COUNT)],
+    }
+    results = {name: {"bytes_per_node": (traced_bytes(make) - list_bytes) / NODE_COUNT} for name, make in makers.items()}
+
+    documents = sample_documents(pages, seed, config)
+    blocks = [block for document in documents for block in markdown_to_blocks(document) if not block.startswith("```")]
+    trees = [markdown_to_html_node(document) for document in documents]
+    node_count = sum(count_nodes(tree) for tree in trees)
+    results["markdown_to_html_node"] = {"bytes_per_node": traced_bytes(lambda: [markdown_to_html_node(document) for document in documents]) / node_count}
+    textnode_count = sum(len(text_to_textnodes(block)) for block in blocks)
+    results["text_to_textnodes"] = {"bytes_per_node": traced_bytes(lambda: [text_to_textnodes(block) for block in blocks]) / textnode_count}
+    return results
@@ -0,0 +1,67 @@
+import timeit
+from blocklexer import lex_blocks
+from blocktype import block_to_block_type
+from helperfunctions import markdown_to_blocks, markdown_to_html_node, text_to_spans, text_to_textnodes, text_to_textnodes_chained
+from minify import minify_html
+from bench.corpus import iter_corpus
+
+"""
+Runs function over and over and returns the best seconds per call of repeat rounds.
+The number of calls per round is picked by timeit so a round takes at least 0.2s.
+"""
+def best_of(function, repeat=5):
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+"""
+Inline text that is worst case for a tokenizer: long runs of unmatched delimiters and brackets.
+"""
+ADVERSARIAL_INLINE = {
+    "underscores": "_" * 20000,
+    "brackets": "[" * 20000,
+    "images": "![" * 10000,
+    "open_links": "[a](" * 5000,
+    "alternating": "a_b*c`" * 5000,
+}
+
+def sample_documents(pages=50, seed=0, config=None):
+    return [markdown for _, markdown in iter_corpus(pages, seed, config)]
+
+"""
+Times the parsing and rendering steps over the same sample documents.
+Every result is the best time for one pass over all sample documents.
+text_to_textnodes_chained is the original chain of split passes, both run over the same blocks
+and over ADVERSARIAL_INLINE, whose mb_per_second is measured on the adversarial text.
+mb_per_second is measured on the markdown, except for minify_html which runs over the rendered html
+and also reports seconds_per_mb, the cost of minifying one MB of html.
+"""
+def run_micro(pages=50, seed=0, config=None, repeat=5):
+    documents = sample_documents(pages, seed, config)
+    blocks = [block for document in documents for block in markdown_to_blocks(document)]
+    inline_blocks = [block for block in blocks if not block.startswith("```")]
+    trees = [markdown_to_html_node(document) for document in documents]
+    size = sum(len(document) for document in documents)
+
+    results = {
+        "markdown_to_blocks": best_of(lambda: [markdown_to_blocks(document) for document in documents], repeat),
+        "block_to_block_type": best_of(lambda: [block_to_block_type(block) for block in blocks], repeat),
+        "lex_blocks": best_of(lambda: [lex_blocks(document) for document in documents], repeat),
+        "text_to_textnodes": best_of(lambda: [text_to_textnodes(block) for block in inline_blocks], repeat),
+        "text_to_spans": best_of(lambda: [text_to_spans(block) for block in inline_blocks], repeat),
+        "text_to_textnodes_chained": best_of(lambda: [text_to_textnodes_chained(block) for block in inline_blocks], repeat),
+        "markdown_to_html_node": best_of(lambda: [markdown_to_html_node(document) for document in documents], repeat),
+        "ParentNode.to_html": best_of(lambda: [tree.to_html() for tree in trees], repeat),
+    }
+    results = {name: {"seconds": seconds, "mb_per_second": size / seconds / 1e6} for name, seconds in results.items()}
+
+    for name, text in ADVERSARIAL_INLINE.items():
+        for function in (text_to_textnodes, text_to_textnodes_chained):
+            seconds = best_of(lambda: function(text), repeat)
+            results[f"{function.__name__}.{name}"] = {"seconds": seconds, "mb_per_second": len(text) / seconds / 1e6}
+
+    pages = [tree.to_html() for tree in trees]
+    html_size = sum(len(page) for page in pages)
+    seconds = best_of(lambda: [minify_html(page) for page in pages], repeat)
+    results["minify_html"] = {"seconds": seconds, "mb_per_second": html_size / seconds / 1e6, "seconds_per_mb": seconds / html_size * 1e6}
+    return results
@@ -0,0 +1,60 @@
+import json
+import platform
+import sys
+import time
+
+DEFAULT_THRESHOLD = 0.1
+
+def make_results(results, config):
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "config": config,
+        },
+        "results": results,
+    }
+
+def save_results(path, results):
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+
+def load_results(path):
+    with open(path) as file:
+        return json.load(file)
+
+"""
+Returns every benchmark of current that got slower than baseline by more than threshold (0.1 = 10%),
+as a list of (name, baseline seconds, current seconds). Benchmarks missing in one of them
+and the memory benchmarks, which have no seconds, are ignored.
+"""
+def compare_results(current, baseline, threshold=DEFAULT_THRESHOLD):
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if not base or "seconds" not in result or "seconds" not in base:
+            continue
+        if result["seconds"] > base["seconds"] * (1 + threshold):
+            regressions.append((name, base["seconds"], result["seconds"]))
+    return regressions
+
+"""
+Timings are shown in ms, the memory benchmarks in bytes per node, each with the change against baseline.
+"""
+def format_results(current, baseline=None):
+    lines = []
+    for name, result in current["results"].items():
+        key = "bytes_per_node" if "bytes_per_node" in result else "seconds"
+        if key == "seconds":
+            line = f"{name:<32} {result['seconds'] * 1000:12.3f}ms"
+        else:
+            line = f"{name:<32} {result['bytes_per_node']:12.1f}B/node"
+        if "seconds_per_mb" in result:
+            line += f" ({result['seconds_per_mb'] * 1000:.3f}ms/MB)"
+        base = baseline["results"].get(name) if baseline else None
+        if base and base.get(key):
+            line += f" {(result[key] / base[key] - 1) * 100:+8.1f}%"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,151 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+DEFAULT_CACHE_PATH = "./.cache/blocks.sqlite"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+FLUSH_EVERY = 1024
+
+"""
+Every module that influences the html of a block. Changing any of them changes the cache version,
+which drops every cached fragment.
+"""
+PARSER_MODULES = ("blocklexer.py", "blocktype.py", "helperfunctions.py", "htmlnode.py", "htmltags.py", "leafnode.py", "parentnode.py", "rawnode.py", "textnode.py", "transform.py", "urlrewriter.py", "htmlwriter.py")
+
+def parser_version():
+    hasher = hashlib.sha256()
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    for module in PARSER_MODULES:
+        with open(os.path.join(src_dir, module), "rb") as module_file:
+            hasher.update(module_file.read())
+    return hasher.hexdigest()
+
+CACHE_VERSION = parser_version()
+
+class BlockCache():
+
+    """
+    Persistent map of markdown block hash -> rendered html fragment, stored in sqlite.
+    path - The sqlite file, its directory is created when the cache is first used
+    max_bytes - Size bound of the cached html, the least recently used blocks are evicted beyond it
+    version - Cache version key, a different version than the stored one empties the cache
+    hits, misses - Lookups of this process
+    The connection is opened lazily and not pickled, so a cache can be handed to worker processes.
+    """
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES, version=CACHE_VERSION):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.connection = None
+        self.pending_puts = {}
+        self.pending_uses = set()
+
+    def __getstate__(self):
+        return {"path": self.path, "max_bytes": self.max_bytes, "version": self.version}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["max_bytes"], state["version"])
+
+    def connect(self):
+        if self.connection is not None:
+            return self.connection
+
+        cache_dir = os.path.dirname(self.path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self.connection = sqlite3.connect(self.path, timeout=60)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS blocks (key TEXT PRIMARY KEY, html TEXT, size INTEGER, used INTEGER)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS blocks_used ON blocks (used)")
+
+        stored = self.connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if not stored or stored[0] != self.version:
+            self.connection.execute("DELETE FROM blocks")
+            self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (self.version,))
+        self.connection.commit()
+        return self.connection
+
+    """
+    context - Everything besides the block text that changes its html, e.g. the UrlRewriter key
+    """
+    def key(self, markdown_block, context=()):
+        return hashlib.sha256(f"{context!r}\0{markdown_block}".encode()).hexdigest()
+
+    def get(self, key):
+        html = self.pending_puts.get(key)
+        if html is None:
+            row = self.connect().execute("SELECT html FROM blocks WHERE key = ?", (key,)).fetchone()
+            html = row[0] if row else None
+
+        if html is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.pending_uses.add(key)
+        return html
+
+    """
+    New fragments are buffered and written in batches of FLUSH_EVERY, so a huge page doesn't pile them up in memory.
+    """
+    def put(self, key, html):
+        self.pending_puts[key] = html
+        if len(self.pending_puts) >= FLUSH_EVERY:
+            self.flush()
+
+    """
+    Writes the new fragments and the last use of every hit in one transaction.
+    """
+    def flush(self):
+        if not self.pending_puts and not self.pending_uses:
+            return
+
+        now = time.time_ns()
+        connection = self.connect()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO blocks (key, html, size, used) VALUES (?, ?, ?, ?)",
+                [(key, html, len(html.encode()), now) for key, html in self.pending_puts.items()]
+            )
+            connection.executemany("UPDATE blocks SET used = ? WHERE key = ?", [(now, key) for key in self.pending_uses])
+        self.pending_puts.clear()
+        self.pending_uses.clear()
+
+    """
+    Deletes the least recently used fragments until the cache fits into max_bytes.
+    """
+    def evict(self):
+        connection = self.connect()
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM blocks").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+
+        to_delete = []
+        for key, size in connection.execute("SELECT key, size FROM blocks ORDER BY used ASC"):
+            if total <= self.max_bytes:
+                break
+            to_delete.append((key,))
+            total -= size
+
+        with connection:
+            connection.executemany("DELETE FROM blocks WHERE key = ?", to_delete)
+        return len(to_delete)
+
+    """
+    Writes what is pending and evicts down to max_bytes. Also connects if this process did no lookups,
+    e.g. the parent of worker processes that filled the cache.
+    """
+    def close(self):
+        self.flush()
+        self.evict()
+        self.connection.close()
+        self.connection = None
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.path}, {self.max_bytes})"
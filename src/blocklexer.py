@@ -0,0 +1,118 @@
+import re
+from blocktype import BlockType
+
+FENCE = "```"
+REGEX_HEADING = re.compile(r"#{1,6} .")
+REGEX_ORDERED_ITEM = re.compile(r"(\d+)\.")
+
+"""
+Type of a block from its first line, paragraphs can still turn out to be ordered lists.
+"""
+def first_line_type(line):
+    if REGEX_HEADING.match(line):
+        return BlockType.HEADING
+    if line.startswith(">"):
+        return BlockType.QUOTE
+    if line.startswith("- "):
+        return BlockType.UNORDERED_LIST
+    return BlockType.PARAGRAPH
+
+def closes_fence(line, first):
+    line = line.rstrip()
+    if first:
+        return len(line) >= 2 * len(FENCE) + 1 and line.endswith(FENCE)
+    return line.endswith(FENCE)
+
+class BlockLexer():
+
+    """
+    Line-oriented block lexer, lines are fed one at a time and completed blocks come out as (BlockType, text).
+    Blocks are separated by blank lines, a block that starts with ``` is a fenced code block that runs until
+    a line ending with ``` even across blank lines, and ends right there.
+    text is the block with surrounding whitespace stripped, the same text markdown_to_blocks produces for it.
+    Only the lines of the current block are held.
+    """
+    def __init__(self):
+        self.lines = []
+        self.in_block = False
+        self.in_fence = False
+        self.ordered = True
+        self.next_number = 1
+
+    def start_block(self, line):
+        line = line.lstrip()
+        self.lines.append(line)
+        self.in_block = True
+        if line.startswith(FENCE):
+            self.in_fence = True
+            return closes_fence(line, True)
+
+        self.ordered = True
+        self.next_number = 1
+        self.check_ordered(line)
+        return False
+
+    """
+    Ordered lists are blocks whose lines starting with "<number>." count up from 1 without gaps.
+    """
+    def check_ordered(self, line):
+        if not line[:1].isdigit():
+            return
+        item = REGEX_ORDERED_ITEM.match(line)
+        if item:
+            self.ordered = self.ordered and int(item.group(1)) == self.next_number
+            self.next_number += 1
+
+    """
+    Feeds one line (with or without its newline) and returns the block it completes, or None.
+    """
+    def feed(self, line):
+        line = line.rstrip("\r\n")
+        if self.in_fence:
+            self.lines.append(line)
+            return self.finish() if closes_fence(line, False) else None
+
+        if not line.strip():
+            return self.finish()
+
+        if not self.in_block:
+            return self.finish() if self.start_block(line) else None
+
+        self.lines.append(line)
+        self.check_ordered(line)
+        return None
+
+    """
+    Returns the block that is still open, or None. An unclosed fence becomes a code block up to the end.
+    """
+    def finish(self):
+        if not self.in_block:
+            return None
+
+        text = "\n".join(self.lines).strip()
+        if self.in_fence:
+            block_type = BlockType.CODE
+        else:
+            block_type = first_line_type(text)
+            if block_type == BlockType.PARAGRAPH and self.ordered and self.next_number > 1:
+                block_type = BlockType.ORDERED_LIST
+        self.lines = []
+        self.in_block = self.in_fence = False
+        return block_type, text
+
+"""
+Yields (BlockType, text) of every block of an iterable of lines, e.g. an open file.
+"""
+def iter_blocks(lines):
+    lexer = BlockLexer()
+    for line in lines:
+        block = lexer.feed(line)
+        if block:
+            yield block
+
+    block = lexer.finish()
+    if block:
+        yield block
+
+def lex_blocks(markdown):
+    return list(iter_blocks(markdown.split("\n")))
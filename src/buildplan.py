@@ -0,0 +1,106 @@
+import os
+
+RENDER = "render"
+COPY = "copy"
+
+class PlanEntry():
+
+    """
+    source - Path of the markdown or static file
+    rel_path - Path of the source relative to the content or static directory
+    dest - Path of the output file
+    action - RENDER for markdown pages, COPY for static files
+    dir_entry - os.DirEntry from the scan, its stat() result is cached after the first call
+    """
+    def __init__(self, source, rel_path, dest, action, dir_entry=None):
+        self.source = source
+        self.rel_path = rel_path
+        self.dest = dest
+        self.action = action
+        self.dir_entry = dir_entry
+
+    def stat(self):
+        if self.dir_entry is None:
+            return os.stat(self.source)
+        return self.dir_entry.stat()
+
+    def __eq__(self, value):
+        return (isinstance(value, PlanEntry) and
+            self.source == value.source and
+            self.dest == value.dest and
+            self.action == value.action)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.source}, {self.dest}, {self.action})"
+
+class BuildPlan():
+
+    """
+    pages - PlanEntry list of the markdown files in render order
+    static - PlanEntry list of the static files
+    dirs - Every output directory, sorted so parents come before their children
+    """
+    def __init__(self, pages, static, dirs):
+        self.pages = pages
+        self.static = static
+        self.dirs = dirs
+
+    def page_pairs(self):
+        return [(entry.source, entry.dest) for entry in self.pages]
+
+    def static_pairs(self):
+        return [(entry.source, entry.dest) for entry in self.static]
+
+    def static_files(self):
+        return {entry.rel_path: entry.stat() for entry in self.static}
+
+"""
+Walks root once with os.scandir and yields (path relative to root, os.DirEntry) of every file
+and directory, sorted by name. Directories are yielded before their content.
+"""
+def scan_tree(root, rel_dir=""):
+    with os.scandir(os.path.join(root, rel_dir)) as scan:
+        entries = sorted(scan, key=lambda entry: entry.name)
+
+    for entry in entries:
+        rel_path = os.path.join(rel_dir, entry.name)
+        yield rel_path, entry
+        if entry.is_dir():
+            yield from scan_tree(root, rel_path)
+
+def page_dest(dest_dir, rel_path):
+    return os.path.join(dest_dir, rel_path.replace(".md", ".html"))
+
+"""
+Scans the content and the static directory once and lists what every output is built from.
+content/a/b.md is rendered to dest/a/b.html, static/x/y.png is copied to dest/x/y.png.
+content_dir or static_dir may be None to plan only one of them.
+"""
+def make_plan(content_dir, static_dir, dest_dir):
+    pages = []
+    static = []
+    dirs = {dest_dir}
+
+    for rel_path, entry in scan_tree(content_dir) if content_dir is not None else ():
+        if entry.is_dir():
+            dirs.add(page_dest(dest_dir, rel_path))
+            continue
+        pages.append(PlanEntry(entry.path, rel_path, page_dest(dest_dir, rel_path), RENDER, entry))
+
+    for rel_path, entry in scan_tree(static_dir) if static_dir is not None else ():
+        if entry.is_dir():
+            dirs.add(os.path.join(dest_dir, rel_path))
+            continue
+        static.append(PlanEntry(entry.path, rel_path, os.path.join(dest_dir, rel_path), COPY, entry))
+
+    return BuildPlan(pages, static, sorted(dirs))
+
+"""
+Creates the output directories of a plan with one mkdir each, parents first.
+"""
+def create_dirs(dirs):
+    for dir_path in dirs:
+        try:
+            os.mkdir(dir_path)
+        except FileExistsError:
+            pass
@@ -0,0 +1,62 @@
+import os
+from manifest import hash_file, save_json_state
+
+CHANGES_NAME = "changes.json"
+
+"""
+Moves the freshly written tmp_path to dest_path, unless dest_path already has the same bytes (same size and hash),
+then tmp_path is removed and dest_path keeps its mtime. The rename is atomic, readers see the old or the new file.
+Returns True if dest_path was replaced.
+"""
+def replace_if_changed(tmp_path, dest_path):
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        os.replace(tmp_path, dest_path)
+        return True
+
+    if dest_stat.st_size == os.path.getsize(tmp_path) and hash_file(tmp_path) == hash_file(dest_path):
+        os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, dest_path)
+    return True
+
+def is_tracked(rel_path):
+    return rel_path != CHANGES_NAME and not any(part.startswith(".") for part in rel_path.split(os.sep)) and not rel_path.endswith(".tmp")
+
+"""
+dict of relative path -> (size, mtime_ns, inode) of every published file below dest_dir.
+Hidden files (the build state) and changes.json itself are not published.
+"""
+def snapshot_outputs(dest_dir):
+    snapshot = {}
+    if not os.path.isdir(dest_dir):
+        return snapshot
+
+    for dir_path, dir_names, file_names in os.walk(dest_dir):
+        dir_names[:] = [name for name in dir_names if not name.startswith(".")]
+        for name in file_names:
+            path = os.path.join(dir_path, name)
+            rel_path = os.path.relpath(path, dest_dir)
+            if is_tracked(rel_path):
+                stat = os.stat(path)
+                snapshot[rel_path] = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+    return snapshot
+
+"""
+Compares the snapshots taken before and after a build. Outputs the build didn't rewrite keep size, mtime
+and inode, every write replaces at least one of them.
+Returns {"added", "modified", "deleted"}, sorted lists of relative paths with "/" separators.
+"""
+def diff_outputs(before, after):
+    def urls(paths):
+        return sorted(path.replace(os.sep, "/") for path in paths)
+
+    return {
+        "added": urls(path for path in after if path not in before),
+        "modified": urls(path for path in after if path in before and after[path] != before[path]),
+        "deleted": urls(path for path in before if path not in after),
+    }
+
+def save_changes(dest_dir, changes):
+    return save_json_state(os.path.join(dest_dir, CHANGES_NAME), changes)
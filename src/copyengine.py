@@ -0,0 +1,133 @@
+import errno
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from manifest import hash_file
+
+"""
+errno values meaning the kernel or filesystem can't do an in-kernel copy for this pair of files,
+in which case the next slower method is tried.
+"""
+UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF, errno.EPERM}
+MAX_COPY_CHUNK = 1024 * 1024 * 1024
+
+def copy_file_range_fd(src_fd, dest_fd, size):
+    copied = 0
+    while copied < size:
+        sent = os.copy_file_range(src_fd, dest_fd, min(size - copied, MAX_COPY_CHUNK), copied, copied)
+        if sent == 0:
+            break
+        copied += sent
+    return copied
+
+def sendfile_fd(src_fd, dest_fd, size):
+    copied = 0
+    while copied < size:
+        sent = os.sendfile(dest_fd, src_fd, copied, min(size - copied, MAX_COPY_CHUNK))
+        if sent == 0:
+            break
+        copied += sent
+    return copied
+
+COPY_METHODS = []
+if hasattr(os, "copy_file_range"):
+    COPY_METHODS.append(copy_file_range_fd)
+if hasattr(os, "sendfile"):
+    COPY_METHODS.append(sendfile_fd)
+
+"""
+Copies the bytes of src_path to dest_path inside the kernel and returns the stat of the source.
+Uses os.copy_file_range (which can reflink on btrfs/XFS), then os.sendfile,
+and only falls back to a buffered copy through Python if neither works for these files.
+"""
+def fast_copy(src_path, dest_path):
+    with open(src_path, "rb") as src_file, open(dest_path, "wb") as dest_file:
+        src_fd = src_file.fileno()
+        dest_fd = dest_file.fileno()
+        src_stat = os.fstat(src_fd)
+        size = src_stat.st_size
+        copied = 0
+
+        for copy_method in COPY_METHODS:
+            try:
+                copied = copy_method(src_fd, dest_fd, size)
+                break
+            except OSError as e:
+                if e.errno not in UNSUPPORTED_ERRNOS:
+                    raise
+
+        if copied < size:
+            src_file.seek(copied)
+            dest_file.seek(copied)
+            shutil.copyfileobj(src_file, dest_file)
+    return src_stat
+
+def replace_target(dest_path):
+    try:
+        os.unlink(dest_path)
+    except FileNotFoundError:
+        pass
+
+"""
+Copies the content and the timestamps, but not the permission bits, of src_path.
+The directory of dest_path has to exist. The copy is written next to dest_path and renamed over it,
+so readers never see a partial file and a hardlinked output never writes through to its source.
+"""
+def copy_file(src_path, dest_path):
+    tmp_path = dest_path + ".tmp"
+    replace_target(tmp_path)
+    try:
+        src_stat = fast_copy(src_path, tmp_path)
+        os.utime(tmp_path, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        replace_target(tmp_path)
+        raise
+
+def link_file(src_path, dest_path):
+    tmp_path = dest_path + ".tmp"
+    replace_target(tmp_path)
+    try:
+        os.link(src_path, tmp_path)
+    except OSError:
+        copy_file(src_path, dest_path)
+        return
+    os.replace(tmp_path, dest_path)
+    # rename does nothing if dest_path already is a link to the same file, the temporary link is left over then
+    replace_target(tmp_path)
+
+"""
+Maps every path to the first path (in the given order) with identical content.
+Only files sharing their size with another file are hashed, with hash_path, e.g. manifest.cached_hasher.
+"""
+def dedupe_files(paths, hash_path=hash_file):
+    by_size = {}
+    for path in paths:
+        by_size.setdefault(os.path.getsize(path), []).append(path)
+
+    canonical = {}
+    for same_size in by_size.values():
+        if len(same_size) == 1:
+            canonical[same_size[0]] = same_size[0]
+            continue
+
+        by_hash = {}
+        for path in same_size:
+            canonical[path] = by_hash.setdefault(hash_path(path), path)
+    return canonical
+
+"""
+Copies (or with link=True hardlinks) a list of (source path, destination path) tuples on a thread pool.
+The copies run inside the kernel and release the GIL, so threads scale with the disk.
+The destination directories have to exist.
+"""
+def transfer_files(pairs, link=False, workers=None):
+    transfer = link_file if link else copy_file
+    if len(pairs) < 2:
+        for src_path, dest_path in pairs:
+            transfer(src_path, dest_path)
+        return
+
+    with ThreadPoolExecutor(workers) as executor:
+        for _ in executor.map(lambda pair: transfer(*pair), pairs):
+            pass
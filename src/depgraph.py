@@ -0,0 +1,93 @@
+SOURCE = "source"
+TEMPLATE = "template"
+PARAM = "param"
+ASSET = "asset"
+IMAGE = "image"
+
+def input_key(kind, name):
+    return f"{kind}:{name}"
+
+"""
+The inputs a page is built from, as a dict of input key -> fingerprint.
+Files are fingerprinted by their content hash, parameters by their value.
+More inputs (partials, data files, other pages) only need another key.
+minify - Pages are minified, only recorded when set so the inputs of earlier builds stay valid
+transforms - Key of the tree transforms as a string, only recorded when there are any
+references - dict of input key -> fingerprint of the urls the page references, e.g. "asset:/index.css" -> fingerprinted url
+or "image:/images/a.png" -> "640x480", so a renamed asset or resized image only rebuilds the pages that use it
+"""
+def page_inputs(source, source_hash, template, template_hash, base_path, minify=False, transforms=None, references=None):
+    inputs = {
+        input_key(SOURCE, source): source_hash,
+        input_key(TEMPLATE, template): template_hash,
+        input_key(PARAM, "base_path"): base_path,
+    }
+    if minify:
+        inputs[input_key(PARAM, "minify")] = True
+    if transforms:
+        inputs[input_key(PARAM, "transforms")] = transforms
+    if references:
+        inputs.update(references)
+    return inputs
+
+class DependencyGraph():
+
+    """
+    outputs - dict of output path -> dict of input key -> fingerprint the output was built from
+    """
+    def __init__(self, outputs=None):
+        self.outputs = outputs if outputs is not None else {}
+
+    def record(self, output, inputs):
+        self.outputs[output] = inputs
+
+    def dependents(self, key):
+        return [output for output, inputs in self.outputs.items() if key in inputs]
+
+    def to_dict(self):
+        return dict(self.outputs)
+
+    def __eq__(self, value):
+        return isinstance(value, DependencyGraph) and self.outputs == value.outputs
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.outputs})"
+
+"""
+Lists why an output built from old_inputs is out of date for new_inputs, an empty list means it is current.
+"""
+def explain_changes(old_inputs, new_inputs):
+    if old_inputs is None:
+        return ["new output"]
+
+    reasons = []
+    for key, fingerprint in new_inputs.items():
+        if key not in old_inputs:
+            reasons.append(f"new input {key}")
+        elif old_inputs[key] != fingerprint:
+            if key.startswith(PARAM + ":"):
+                reasons.append(f"{key} changed ({old_inputs[key]!r} -> {fingerprint!r})")
+            else:
+                reasons.append(f"{key} changed")
+
+    for key in old_inputs:
+        if key not in new_inputs:
+            reasons.append(f"input {key} removed")
+    return reasons
+
+"""
+Compares the graph of the last build with the graph of this build.
+Returns a dict of output -> reasons for every output that has to be built, in the order of new_graph,
+and the list of outputs of the old graph that are no longer produced.
+"""
+def invalidated_outputs(old_graph, new_graph, output_exists):
+    to_build = {}
+    for output, inputs in new_graph.outputs.items():
+        reasons = explain_changes(old_graph.outputs.get(output), inputs)
+        if not reasons and not output_exists(output):
+            reasons = ["output missing"]
+        if reasons:
+            to_build[output] = reasons
+
+    stale = [output for output in old_graph.outputs if output not in new_graph.outputs]
+    return to_build, stale
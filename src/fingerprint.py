@@ -0,0 +1,49 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from changes import replace_if_changed
+from manifest import hash_file, save_json_state
+
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+FINGERPRINT_LENGTH = 10
+
+"""
+"images/tom.png" -> "images/tom.<first FINGERPRINT_LENGTH hex digits of digest>.png"
+"""
+def fingerprint_path(rel_path, digest):
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest[:FINGERPRINT_LENGTH]}{ext}"
+
+"""
+Hashes every static file and returns a dict of relative path -> fingerprinted relative path.
+static_files - Relative paths below static_dir, e.g. the keys of BuildPlan.static_files()
+hash_path - Hashes a file, e.g. manifest.cached_hasher to skip unchanged files
+"""
+def fingerprint_assets(static_dir, static_files, workers=None, hash_path=hash_file):
+    rel_paths = sorted(static_files)
+    with ThreadPoolExecutor(workers) as executor:
+        digests = executor.map(lambda rel_path: hash_path(os.path.join(static_dir, rel_path)), rel_paths)
+        return {rel_path: fingerprint_path(rel_path, digest) for rel_path, digest in zip(rel_paths, digests)}
+
+def to_url(rel_path):
+    return "/" + rel_path.replace(os.sep, "/")
+
+"""
+Turns the result of fingerprint_assets into the site-absolute url map of UrlRewriter.
+"""
+def asset_urls(assets):
+    return {to_url(rel_path): to_url(fingerprinted) for rel_path, fingerprinted in assets.items()}
+
+"""
+Writes dest_dir/asset-manifest.json, a dict of url -> fingerprinted url for tooling outside the build.
+An unchanged manifest is not rewritten.
+"""
+def save_asset_manifest(dest_dir, assets):
+    return save_json_state(os.path.join(dest_dir, ASSET_MANIFEST_NAME), asset_urls(assets), replace_if_changed)
+
+"""
+Removes the asset manifest of an earlier fingerprinted build, its urls point to files that are gone.
+"""
+def remove_asset_manifest(dest_dir):
+    path = os.path.join(dest_dir, ASSET_MANIFEST_NAME)
+    if os.path.exists(path):
+        os.remove(path)
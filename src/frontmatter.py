@@ -0,0 +1,116 @@
+import io
+
+FENCE = "---"
+BOOLEANS = {"true": True, "yes": True, "on": True, "false": False, "no": False, "off": False}
+
+def is_fence(line):
+    return line.rstrip() == FENCE
+
+"""
+True if every line between the fences is blank, a comment, "key: value" or a "- item" of a list key,
+the lines parse_front_matter reads. Fences around anything else, e.g. prose between two rules, are no front matter.
+"""
+def is_front_matter(lines):
+    in_list = False
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith("- ") and in_list:
+            continue
+        key, separator, value = stripped.partition(":")
+        if not separator or not key.strip():
+            return False
+        in_list = not value.strip()
+    return True
+
+"""
+Reads the front matter from an iterator of lines, reading stops at the closing fence.
+Returns its lines including both fences, or None if the document doesn't start with front matter
+(an opening fence without a closing one, or fences around lines that aren't "key: value", are not front matter either).
+"""
+def read_front_matter_lines(lines):
+    first = next(lines, "")
+    if not is_fence(first):
+        return None
+
+    header = [first]
+    for line in lines:
+        header.append(line)
+        if is_fence(line):
+            return header if is_front_matter(header[1:-1]) else None
+    return None
+
+def unquote(value):
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+def parse_value(value):
+    if value.startswith("[") and value.endswith("]"):
+        return [unquote(item.strip()) for item in value[1:-1].split(",") if item.strip()]
+    return unquote(value)
+
+def parse_bool(key, value):
+    if isinstance(value, str) and value.lower() in BOOLEANS:
+        return BOOLEANS[value.lower()]
+    raise Exception(f"front matter {key} has to be true or false, not {value!r}")
+
+"""
+Parses the lines between the fences, a YAML subset of "key: value" lines.
+Values are strings, "[a, b]" and "- item" lines below an empty "key:" are lists, an empty value without items is None.
+tags is always a list of strings, draft a bool. Other keys are kept as they are.
+"""
+def parse_front_matter(lines):
+    metadata = {}
+    key = None
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+
+        if stripped.startswith("- ") and key is not None and (metadata[key] is None or isinstance(metadata[key], list)):
+            if metadata[key] is None:
+                metadata[key] = []
+            metadata[key].append(unquote(stripped[2:].strip()))
+            continue
+
+        key, separator, value = stripped.partition(":")
+        key = key.strip()
+        if not separator or not key:
+            raise Exception(f"invalid front matter line {line!r}")
+        value = value.strip()
+        metadata[key] = parse_value(value) if value else None
+
+    if "tags" in metadata and metadata["tags"] is None:
+        metadata["tags"] = []
+    elif isinstance(metadata.get("tags"), str):
+        metadata["tags"] = [tag.strip() for tag in metadata["tags"].split(",") if tag.strip()]
+    if metadata.get("draft") is None:
+        metadata.pop("draft", None)
+    else:
+        metadata["draft"] = parse_bool("draft", metadata["draft"])
+    return metadata
+
+"""
+Reads the front matter of an open markdown file and leaves the file at the start of the body.
+Only the header is read. Returns the metadata dict, empty without front matter.
+"""
+def read_front_matter(file):
+    header = read_front_matter_lines(iter(file.readline, ""))
+    if header is None:
+        file.seek(0)
+        return {}
+    return parse_front_matter(header[1:-1])
+
+"""
+Splits a markdown document into (metadata, body), the body is the document without its front matter.
+"""
+def split_front_matter(markdown):
+    if not markdown.startswith(FENCE):
+        return {}, markdown
+
+    header = read_front_matter_lines(iter(io.StringIO(markdown)))
+    if header is None:
+        return {}, markdown
+    return parse_front_matter(header[1:-1]), markdown[sum(len(line) for line in header):]
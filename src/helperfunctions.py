@@ -1,14 +1,26 @@
 import re
-from blocktype import BlockType, block_to_block_type
+from blocklexer import lex_blocks
+from blocktype import BlockType
 from htmlnode import HTMLNode
+from htmltags import escape_text
 from parentnode import ParentNode
 from textnode import TextType, TextNode
+from transform import NO_TRANSFORMS
 from leafnode import LeafNode
+from profiler import phase
+from rawnode import RawNode
+from urlrewriter import DEFAULT_URL_REWRITER
 
-REGEX_MARKDOWN_IMAGES = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-REGEX_MARKDOWN_LINKS = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
+REGEX_MARKDOWN_IMAGES = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+REGEX_MARKDOWN_LINKS = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+REGEX_TITLE_LINE = re.compile(r"\s*#(?!#)(.*)", re.DOTALL)
+REGEX_DELIMITERS = re.compile(r"(\*\*|_|`)")
+REGEX_MARKDOWN_URLS = re.compile(r"\]\(([^\(\)]*)\)")
 
-def text_node_to_html_node(text_node):
+"""
+url_rewriter - UrlRewriter applied to link and image urls, this is where base_path ends up in the html
+"""
+def text_node_to_html_node(text_node, url_rewriter=DEFAULT_URL_REWRITER):
     match(text_node.text_type):
 
         case TextType.NORMAL:
@@ -21,17 +33,17 @@ def text_node_to_html_node(text_node):
             return LeafNode("i", text_node.text)
         
         case TextType.CODE:
-            return LeafNode("code", text_node.text)
+            return LeafNode("code", escape_text(text_node.text))
         
         case TextType.LINK:
             if not text_node.url:
                 raise ValueError(f"TextType {TextType.LINK} needs an url")
-            return LeafNode("a", text_node.text, {"href" : text_node.url})
+            return LeafNode("a", text_node.text, {"href" : url_rewriter.rewrite(text_node.url)})
         
         case TextType.IMAGE:
             if not text_node.url:
                 raise ValueError(f"TextType {TextType.IMAGE} needs an url")
-            return LeafNode("img", "", {"src" : text_node.url, "alt" : text_node.text})
+            return LeafNode("img", "", {"src" : url_rewriter.rewrite(text_node.url), "alt" : text_node.text})
         
         case _:
             raise Exception(f"Unknow TextType {text_node.text_type}")
@@ -90,7 +102,11 @@ def split_nodes_link(old_nodes):
 
     return new_nodes
 
-def text_to_textnodes(text):
+"""
+The original chain of split passes, every pass re-scans the text of every node.
+Kept as the reference text_to_textnodes is tested and benchmarked against.
+"""
+def text_to_textnodes_chained(text):
     new_text_node = TextNode(text, TextType.NORMAL)
     tmp_text_nodes = split_nodes_image([new_text_node])
     tmp_text_nodes = split_nodes_link(tmp_text_nodes)
@@ -98,6 +114,118 @@ def text_to_textnodes(text):
     tmp_text_nodes = split_nodes_delimiter(tmp_text_nodes, "_", TextType.ITALIC)
     return split_nodes_delimiter(tmp_text_nodes, "`", TextType.CODE)
 
+"""
+Inline html tag of every TextType, None is plain text. The inline tokenizer works with these tags
+instead of TextType members so the hot path never touches the enum.
+"""
+TEXT_TYPE_TAGS = {
+    TextType.NORMAL: None,
+    TextType.BOLD: "b",
+    TextType.ITALIC: "i",
+    TextType.CODE: "code",
+    TextType.LINK: "a",
+    TextType.IMAGE: "img",
+}
+TAG_TEXT_TYPES = {tag: text_type for text_type, tag in TEXT_TYPE_TAGS.items()}
+
+def delimited_tag(bold, italic, code):
+    if code:
+        return "code"
+    if italic:
+        return "i"
+    if bold:
+        return "b"
+    return None
+
+"""
+Splits text at its delimiters into (tag, text, url) spans of base_tag (with url) and the delimited tags, appending them to spans.
+The delimiters nest like the split passes did: every "**" starts a new bold span and closes the open italic and code spans,
+every "_" starts a new italic span and closes the open code span. A span is open while its delimiter count is odd,
+the innermost open span decides the tag. Empty pieces produce no span.
+"""
+def split_delimiters(text, base_tag, url, spans):
+    if "*" not in text and "_" not in text and "`" not in text:
+        if text:
+            spans.append((base_tag, text, url))
+        return
+
+    parts = REGEX_DELIMITERS.split(text)
+    if parts[0]:
+        spans.append((base_tag, parts[0], url))
+
+    bold = italic = code = False
+    for i in range(1, len(parts), 2):
+        delimiter = parts[i]
+        if delimiter == "_":
+            italic = not italic
+            code = False
+        elif delimiter == "`":
+            code = not code
+        else:
+            bold = not bold
+            italic = code = False
+
+        piece = parts[i + 1]
+        if piece:
+            tag = delimited_tag(bold, italic, code)
+            spans.append((base_tag, piece, url) if tag is None else (tag, piece, None))
+
+"""
+Splits text at its links into spans, appending them to spans.
+"""
+def split_links(text, spans):
+    position = 0
+    for link in REGEX_MARKDOWN_LINKS.finditer(text):
+        split_delimiters(text[position:link.start()], None, None, spans)
+        split_delimiters(link.group(1), "a", link.group(2), spans)
+        position = link.end()
+    split_delimiters(text[position:], None, None, spans)
+
+"""
+Bulk form of text_to_textnodes: the same sequence as a list of (tag, text, url) tuples, see TEXT_TYPE_TAGS,
+without allocating a TextNode per span.
+Like the split passes images are found first and links only in the text between them, so an image wins over a link
+that overlaps it. Both are single regex scans and every other character is looked at once by the delimiter split,
+so the time is linear in the length of text even for thousands of unmatched "_", "[" or "![".
+"""
+def text_to_spans(text):
+    spans = []
+    position = 0
+    for image in REGEX_MARKDOWN_IMAGES.finditer(text):
+        split_links(text[position:image.start()], spans)
+        split_delimiters(image.group(1), "img", image.group(2), spans)
+        position = image.end()
+    split_links(text[position:], spans)
+    return spans
+
+"""
+Produces the same TextNodes as the chained split passes, see text_to_spans.
+"""
+def text_to_textnodes(text):
+    return [TextNode(span_text, TAG_TEXT_TYPES[tag], url) for tag, span_text, url in text_to_spans(text)]
+
+"""
+text_node_to_html_node for a (tag, text, url) span of text_to_spans.
+"""
+def span_to_html_node(tag, text, url, url_rewriter=DEFAULT_URL_REWRITER):
+    if tag is None:
+        return LeafNode(None, text)
+
+    if tag == "a":
+        if not url:
+            raise ValueError(f"TextType {TextType.LINK} needs an url")
+        return LeafNode("a", text, {"href" : url_rewriter.rewrite(url)})
+
+    if tag == "img":
+        if not url:
+            raise ValueError(f"TextType {TextType.IMAGE} needs an url")
+        return LeafNode("img", "", {"src" : url_rewriter.rewrite(url), "alt" : text})
+
+    if tag == "code":
+        return LeafNode("code", escape_text(text))
+
+    return LeafNode(tag, text)
+
 """
 Takes a raw Markdown string (representing a full document) as input and returns a list of "block" strings. 
 Spliting Text by \n\n
@@ -114,21 +242,21 @@ def get_heading_tag(markdown):
             return f"h{i}"
     raise Exception("unexpected # count (>6), invalid heading")
 
-def text_to_children(text):
-    text = text.strip()
-    text = text.replace("\n", " ")
-    text_nodes = text_to_textnodes(text)
-    html_nodes = [text_node_to_html_node(node) for node in text_nodes]
+def text_to_children(text, url_rewriter=DEFAULT_URL_REWRITER):
+    with phase("inline_parse"):
+        text = text.strip()
+        text = text.replace("\n", " ")
+        html_nodes = [span_to_html_node(tag, span_text, url, url_rewriter) for tag, span_text, url in text_to_spans(text)]
     return html_nodes
 
-def handle_paragraph(markdown_block):
-    child_nodes = text_to_children(markdown_block)
+def handle_paragraph(markdown_block, url_rewriter=DEFAULT_URL_REWRITER):
+    child_nodes = text_to_children(markdown_block, url_rewriter)
     return ParentNode("p", child_nodes)
 
-def handle_heading(markdown_block):
+def handle_heading(markdown_block, url_rewriter=DEFAULT_URL_REWRITER):
     tag = get_heading_tag(markdown_block)
     heading_text = markdown_block.lstrip("#").strip()
-    child_nodes = text_to_children(heading_text)
+    child_nodes = text_to_children(heading_text, url_rewriter)
     return ParentNode(tag, child_nodes)
 
 def handle_code(markdown_block):
@@ -137,58 +265,131 @@ def handle_code(markdown_block):
     code_html_node = text_node_to_html_node(code_text_node)
     return ParentNode("pre", [code_html_node])
 
-def handle_quote(markdown_block):
+def handle_quote(markdown_block, url_rewriter=DEFAULT_URL_REWRITER):
     quote_text = markdown_block.lstrip(">").strip()
-    child_nodes = text_to_children(quote_text)
+    child_nodes = text_to_children(quote_text, url_rewriter)
     return ParentNode("blockquote", child_nodes)
 
-def handle_unordered_list(markdown_block):
+def handle_unordered_list(markdown_block, url_rewriter=DEFAULT_URL_REWRITER):
     items = [line.lstrip("-").strip() for line in markdown_block.split("\n") if line.strip()]
-    li_nodes = [ParentNode("li", text_to_children(item)) for item in items]
+    li_nodes = [ParentNode("li", text_to_children(item, url_rewriter)) for item in items]
     return ParentNode("ul", li_nodes)
 
-def handle_ordered_list(markdown_block):
+def handle_ordered_list(markdown_block, url_rewriter=DEFAULT_URL_REWRITER):
     items = [re.sub(r"^\d+\.\s*", "", line).strip() for line in markdown_block.split("\n") if line.strip()]
-    li_nodes = [ParentNode("li", text_to_children(item)) for item in items]
+    li_nodes = [ParentNode("li", text_to_children(item, url_rewriter)) for item in items]
     return ParentNode("ol", li_nodes)
 
-def markdown_to_html_node(markdown):
+def block_to_html_node(markdown_block, blocktype, url_rewriter=DEFAULT_URL_REWRITER):
+    match(blocktype):
+        case BlockType.PARAGRAPH:
+            return handle_paragraph(markdown_block, url_rewriter)
+        
+        case BlockType.HEADING:
+            return handle_heading(markdown_block, url_rewriter)
+        
+        case BlockType.CODE:
+            return handle_code(markdown_block)
+
+        case BlockType.QUOTE:
+            return handle_quote(markdown_block, url_rewriter)
+
+        case BlockType.UNORDERED_LIST:
+            return handle_unordered_list(markdown_block, url_rewriter)
+        
+        case BlockType.ORDERED_LIST:
+            return handle_ordered_list(markdown_block, url_rewriter)
+        
+        case _:
+            return handle_paragraph(markdown_block, url_rewriter)
+
+"""
+The blocks come typed from the block lexer, they are not classified again.
+block_cache - Optional BlockCache, blocks found in it skip inline parsing and to_html
+and end up in the tree as RawNode fragments
+"""
+def markdown_to_html_node(markdown, url_rewriter=DEFAULT_URL_REWRITER, block_cache=None, transforms=NO_TRANSFORMS):
     if not markdown:
         return LeafNode("div", "")
 
-    markdown_blocks = markdown_to_blocks(markdown)
+    with phase("block_split"):
+        markdown_blocks = lex_blocks(markdown)
     children = []
+    page_pass = transforms.page_pass()
 
-    for markdown_block in markdown_blocks:
-        blocktype = block_to_block_type(markdown_block)
-
-        match(blocktype):
-            case BlockType.PARAGRAPH:
-                children.append(handle_paragraph(markdown_block))
-            
-            case BlockType.HEADING:
-                children.append(handle_heading(markdown_block))
-            
-            case BlockType.CODE:
-                children.append(handle_code(markdown_block))
-
-            case BlockType.QUOTE:
-                children.append(handle_quote(markdown_block))
-
-            case BlockType.UNORDERED_LIST:
-                children.append(handle_unordered_list(markdown_block))
-            
-            case BlockType.ORDERED_LIST:
-                children.append(handle_ordered_list(markdown_block))
-            
-            case _:
-                children.append(handle_paragraph(markdown_block))        
+    for blocktype, markdown_block in markdown_blocks:
+        block_node = render_block(markdown_block, blocktype, url_rewriter, block_cache, transforms)
+        children.append(page_pass.block(block_node) if page_pass else block_node)
 
     return ParentNode("div", children)
 
+"""
+Every url an image or link of the markdown can have, lines joined like the inline parser joins them.
+A superset: text that only looks like a link adds its url too.
+"""
+def markdown_urls(markdown):
+    return REGEX_MARKDOWN_URLS.findall(markdown.replace("\n", " "))
+
+"""
+What html referencing urls depends on besides the markdown, as a dict of input key -> fingerprint (see depgraph):
+the fingerprinted names of assets (UrlRewriter.inputs) and what the transforms look up per url (TransformPipeline.inputs).
+"""
+def url_inputs(urls, url_rewriter=DEFAULT_URL_REWRITER, transforms=NO_TRANSFORMS):
+    inputs = url_rewriter.inputs(urls)
+    if transforms:
+        inputs.update(transforms.inputs([url_rewriter.rewrite(url) for url in urls]))
+    return inputs
+
+"""
+Node of one typed block, a RawNode with the cached html if block_cache is given.
+The cache key holds the fingerprinted names and image sizes of the urls of the block only,
+a renamed asset or resized image only invalidates the blocks that reference it.
+transforms - TransformPipeline applied to the tree of the block, one traversal for all of its transforms
+"""
+def render_block(markdown_block, blocktype, url_rewriter=DEFAULT_URL_REWRITER, block_cache=None, transforms=NO_TRANSFORMS):
+    if block_cache is None:
+        return transforms.apply(block_to_html_node(markdown_block, blocktype, url_rewriter))
+
+    references = url_inputs(markdown_urls(markdown_block), url_rewriter, transforms)
+    key = block_cache.key(markdown_block, (blocktype.value, url_rewriter.base_path, *transforms.key, *sorted(references.items())))
+    html = block_cache.get(key)
+    if html is None:
+        block_node = transforms.apply(block_to_html_node(markdown_block, blocktype, url_rewriter))
+        with phase("to_html"):
+            html = block_node.to_html()
+        block_cache.put(key, html)
+    return RawNode(html)
+
 def extract_title(markdown):
     title = re.search(r"^\s*#(?!#)\s*(.+?)\s*$", markdown, re.MULTILINE)
     if not title:
         raise Exception("No h1 found in document")
     return title.group(1)
+
+"""
+extract_title over an iterable of lines, e.g. an open file. Only reads up to the title.
+Like extract_title an "#" without text takes its title from the next line that has some,
+and if only whitespace follows up to the end its last character that isn't a newline.
+"""
+def find_title(lines):
+    title_follows = False
+    last_whitespace = None
+    for line in lines:
+        if not title_follows:
+            title_line = REGEX_TITLE_LINE.match(line)
+            if not title_line:
+                continue
+            line = title_line.group(1)
+
+        title = line.strip()
+        if title:
+            return title
+        title_follows = True
+        line = line.replace("\n", "")
+        if line:
+            last_whitespace = line[-1]
+
+    if last_whitespace is None:
+        raise Exception("No h1 found in document")
+    return last_whitespace
         
\ No newline at end of file
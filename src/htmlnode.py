@@ -1,4 +1,12 @@
+import sys
 from functools import reduce
+from htmltags import render_props
+
+"""
+Tags are interned, the nodes of a page then share one string per tag name.
+"""
+def intern_tag(tag):
+    return sys.intern(tag) if type(tag) is str else tag
 
 class HTMLNode():
 
@@ -7,9 +15,12 @@ class HTMLNode():
     value - A string representing the value of the HTML tag (e.g. the text inside a paragraph)
     children - A list of HTMLNode objects representing the children of this node
     props - A dictionary of key-value pairs representing the attributes of the HTML tag. For example, a link (<a> tag) might have {"href": "https://www.google.com"}
+    Nodes have __slots__ and no __dict__, nodes without attributes share None as their props instead of an empty dict.
     """
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag  = None, value = None, children = None, props = None):
-        self.tag = tag
+        self.tag = intern_tag(tag)
         self.value = value
         self.children = children
         self.props = props
@@ -17,15 +28,11 @@ class HTMLNode():
     def to_html(self):
         raise NotImplementedError("Child classes have to override this")
     
+    """
+    Attribute values are escaped, see htmltags.render_props.
+    """
     def props_to_html(self):
-        if not self.props:
-            return ""
-        
-        def tuple_to_string(tupple):
-            key, value = tupple
-            return f" {key}=\"{value}\"" 
-         
-        return "".join(list(map(tuple_to_string, self.props.items())))
+        return render_props(self.props)
 
     def __repr__(self):
         return f"{type(self).__name__}({self.tag}, {self.value}, {self.children}, {self.props})"
\ No newline at end of file
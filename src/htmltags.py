@@ -0,0 +1,60 @@
+from functools import lru_cache
+
+PROPS_CACHE_SIZE = 4096
+
+ESCAPE_TEXT = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+ESCAPE_ATTRIBUTE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", "\"": "&quot;"})
+
+"""
+Escapes text for element content, e.g. code that has to show up literally.
+"""
+def escape_text(text):
+    if "&" not in text and "<" not in text and ">" not in text:
+        return text
+    return text.translate(ESCAPE_TEXT)
+
+"""
+Escapes a value for a double quoted attribute, a quote in an alt text can't end the attribute.
+"""
+def escape_attribute(value):
+    if "&" not in value and "<" not in value and ">" not in value and "\"" not in value:
+        return value
+    return value.translate(ESCAPE_ATTRIBUTE)
+
+class TagTable(dict):
+
+    """
+    dict of tag -> formatted tag string, every tag is formatted on first use only.
+    """
+    def __init__(self, template):
+        super().__init__()
+        self.template = template
+
+    def __missing__(self, tag):
+        formatted = self[tag] = self.template.format(tag)
+        return formatted
+
+OPEN_TAGS = TagTable("<{}>")
+CLOSE_TAGS = TagTable("</{}>")
+
+@lru_cache(maxsize=PROPS_CACHE_SIZE)
+def attributes_html(items):
+    return "".join([f" {key}=\"{escape_attribute(str(value))}\"" for key, value in items])
+
+"""
+The attribute string of a props dict, " key=\"value\"" per item in dict order with escaped values.
+Pages repeat the same props over and over (the same image src/alt, the same link href),
+so the strings are kept in a bounded LRU cache keyed by the items.
+"""
+def render_props(props):
+    if not props:
+        return ""
+    try:
+        return attributes_html(tuple(props.items()))
+    except TypeError:
+        return attributes_html.__wrapped__(props.items())
+
+def open_tag(tag, props=None):
+    if not props:
+        return OPEN_TAGS[tag]
+    return f"<{tag}{render_props(props)}>"
@@ -0,0 +1,48 @@
+from htmltags import CLOSE_TAGS, OPEN_TAGS
+from parentnode import ParentNode
+
+WRITE_BUFFER_SIZE = 64 * 1024
+
+"""
+Walks the node tree iteratively and yields the html in document order.
+Produces exactly what node.to_html() returns, but never builds intermediate strings
+per subtree and doesn't recurse, so deeply nested trees don't hit the recursion limit.
+"""
+def iter_html(node):
+    stack = [node]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            yield item
+            continue
+
+        if not isinstance(item, ParentNode):
+            yield item.to_html()
+            continue
+
+        if not item.tag:
+            raise ValueError("All parent nodes must have a tag")
+
+        if not item.children:
+            raise ValueError("All parent nodes must have at least one child node")
+
+        yield OPEN_TAGS[item.tag]
+        stack.append(CLOSE_TAGS[item.tag])
+        stack.extend(reversed(item.children))
+
+"""
+Writes the html of node to a file object (or io.StringIO) in chunks of about buffer_size characters.
+"""
+def write_html(node, file, buffer_size=WRITE_BUFFER_SIZE):
+    buffer = []
+    buffered = 0
+    for chunk in iter_html(node):
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= buffer_size:
+            file.write("".join(buffer))
+            buffer.clear()
+            buffered = 0
+
+    if buffer:
+        file.write("".join(buffer))
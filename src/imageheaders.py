@@ -0,0 +1,126 @@
+import os
+import struct
+from manifest import load_json_state, save_json_state
+
+IMAGE_INDEX_PATH = "./.cache/image-index.json"
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+HEADER_SIZE = 32
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+JPEG_SOI = b"\xff\xd8"
+"""
+Start of frame markers, they carry the size. C4 (huffman tables), C8 (reserved) and CC (arithmetic coding) are not frames.
+"""
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+JPEG_STANDALONE_MARKERS = frozenset((0x01, *range(0xD0, 0xD9)))
+
+def png_size(header):
+    if header[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", header[16:24])
+
+def gif_size(header):
+    return struct.unpack("<HH", header[6:10])
+
+def webp_size(header):
+    chunk = header[12:16]
+    if chunk == b"VP8 " and header[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", header[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and header[20] == 0x2F:
+        bits = int.from_bytes(header[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        return int.from_bytes(header[24:27], "little") + 1, int.from_bytes(header[27:30], "little") + 1
+    return None
+
+"""
+Walks the segment headers of a JPEG up to the first start of frame, segment data is skipped with seek.
+"""
+def jpeg_size(file):
+    file.seek(len(JPEG_SOI))
+    while True:
+        if file.read(1) != b"\xff":
+            return None
+        marker = file.read(1)
+        while marker == b"\xff":
+            marker = file.read(1)
+        if not marker:
+            return None
+
+        marker = marker[0]
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        if marker in (0xD9, 0xDA):
+            return None
+
+        length = file.read(2)
+        if len(length) < 2:
+            return None
+        if marker in JPEG_SOF_MARKERS:
+            frame = file.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return width, height
+        file.seek(int.from_bytes(length, "big") - 2, os.SEEK_CUR)
+
+"""
+(width, height) of a PNG, JPEG, GIF or WebP file from its header, None for other or broken files.
+Only the first HEADER_SIZE bytes are read, JPEGs additionally read their segment headers up to the frame header.
+"""
+def image_size(path):
+    with open(path, "rb") as file:
+        header = file.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE and not header.startswith(JPEG_SOI):
+            return None
+        if header.startswith(PNG_SIGNATURE):
+            size = png_size(header)
+        elif header[:6] in (b"GIF87a", b"GIF89a"):
+            size = gif_size(header)
+        elif header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+            size = webp_size(header)
+        elif header.startswith(JPEG_SOI):
+            size = jpeg_size(file)
+        else:
+            size = None
+    if size is None or not size[0] or not size[1]:
+        return None
+    return tuple(size)
+
+def is_image(rel_path):
+    return rel_path.lower().endswith(IMAGE_EXTENSIONS)
+
+def load_image_index(path):
+    return load_json_state(path)
+
+def save_image_index(path, index):
+    save_json_state(path, index)
+
+"""
+Image sizes of the static files: dict of relative path -> {"size", "mtime_ns", "width", "height"},
+width and height are None if the header can't be read.
+static_files - dict of path relative to static_dir -> stat result, e.g. BuildPlan.static_files()
+Images whose size and mtime match their record in old_index keep it without opening the file.
+"""
+def index_images(static_dir, static_files, old_index=None):
+    old_index = old_index or {}
+    index = {}
+    for rel_path, stat in sorted(static_files.items()):
+        if not is_image(rel_path):
+            continue
+        record = old_index.get(rel_path)
+        if not record or record.get("size") != stat.st_size or record.get("mtime_ns") != stat.st_mtime_ns:
+            width, height = image_size(os.path.join(static_dir, rel_path)) or (None, None)
+            record = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "width": width, "height": height}
+        index[rel_path] = record
+    return index
+
+"""
+dict of image url as it appears in the html -> (width, height), url_rewriter turns the static paths into those urls.
+"""
+def image_dimensions(index, url_rewriter):
+    return {
+        url_rewriter.rewrite("/" + rel_path.replace(os.sep, "/")): (record["width"], record["height"])
+        for rel_path, record in index.items() if record["width"]
+    }
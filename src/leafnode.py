@@ -1,6 +1,9 @@
 from htmlnode import HTMLNode
+from htmltags import CLOSE_TAGS, open_tag
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
 
@@ -12,4 +15,4 @@ class LeafNode(HTMLNode):
         if not self.tag:
             return self.value
         
-        return f"<{self.tag}{super().props_to_html()}>{self.value}</{self.tag}>"
\ No newline at end of file
+        return f"{open_tag(self.tag, self.props)}{self.value}{CLOSE_TAGS[self.tag]}"
\ No newline at end of file
@@ -1,74 +1,400 @@
+import argparse
+import cProfile
 import os
 import shutil
-import sys
-from helperfunctions import extract_title, markdown_to_html_node
-from textnode import TextNode, TextType
+import time
+from blockcache import DEFAULT_CACHE_PATH, DEFAULT_MAX_BYTES, BlockCache
+from buildplan import BuildPlan, create_dirs, make_plan
+from changes import CHANGES_NAME, diff_outputs, save_changes, snapshot_outputs
+from copyengine import dedupe_files, transfer_files
+from depgraph import DependencyGraph, invalidated_outputs, page_inputs
+from fingerprint import ASSET_MANIFEST_NAME, asset_urls, fingerprint_assets, remove_asset_manifest, save_asset_manifest
+from imageheaders import IMAGE_INDEX_PATH, image_dimensions, index_images, load_image_index, save_image_index
+from helperfunctions import markdown_urls, url_inputs
+from manifest import HASH_CACHE_PATH, MANIFEST_NAME, cached_hasher, hash_file, hash_file_cached, load_json_state, load_manifest, save_json_state, save_manifest, urls_cached
+from metaindex import METADATA_INDEX_PATH, drafts, index_metadata, load_metadata_index, save_metadata_index
+from parallel import generate_pages_parallel
+from precompress import ENCODERS, precompress_dir
+from profiler import BuildProfile, active_profile, enable_profile, format_report, phase
+from pagetemplate import load_template
+from render import write_page_file
+from shard import parse_shard, plan_merge, select_shard, write_merge, write_shard_manifest
+from urlrewriter import UrlRewriter, html_urls
+from staticsync import record_synced_files, sync_static
+from transform import NO_TRANSFORMS, TRANSFORMS, ImageDimensions, LazyImages, make_pipeline
 
 def setup_public_dir(path):
     if os.path.exists(path):
         shutil.rmtree(path)
     os.mkdir(path)
 
-def rec_copy_static(dir_old_path, dir_new_path):
-    for entry in os.listdir(dir_old_path):
-        entry_old_path = os.path.join(dir_old_path, entry)
-        entry_new_path = os.path.join(dir_new_path, entry)
+def rec_copy_static(dir_old_path, dir_new_path, link=False):
+    plan = make_plan(None, dir_old_path, dir_new_path)
+    create_dirs(plan.dirs)
+    copy_static(plan.static_pairs(), link)
 
-        if os.path.isfile(entry_old_path):
-            shutil.copy(entry_old_path, entry_new_path)
-            continue
-        
-        os.mkdir(entry_new_path)
-        rec_copy_static(entry_old_path, entry_new_path)
+"""
+Copies a list of (static path, output path) tuples with the copy engine, the output directories have to exist.
+hash_path - Hashes the same-size sources compared with link=True, see copyengine.dedupe_files
+"""
+def copy_static(pairs, link=False, hash_path=hash_file):
+    if link:
+        canonical = dedupe_files([entry_old_path for entry_old_path, _ in pairs], hash_path)
+        pairs = [(canonical[entry_old_path], entry_new_path) for entry_old_path, entry_new_path in pairs]
+    transfer_files(pairs, link)
 
 def generate_page(base_path, from_path, template_path, dest_path):
     if not os.path.exists(from_path):
         raise Exception(f"source file does not exist {from_path}")
 
-    if not os.path.exists(template_path):
-        raise Exception(f"template file does not exist {template_path}")
+    template = load_template(template_path, UrlRewriter(base_path))
 
     to_create = os.path.dirname(dest_path)
     if not os.path.exists(to_create):
         os.makedirs(to_create)
 
+    render_page_file(from_path, dest_path, template_path, template)
+
+"""
+Renders one page of a build plan, the source exists and the output directory was created with the plan.
+"""
+def render_page_file(from_path, dest_path, template_path, template, block_cache=None):
     print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    markdown_file = open(from_path)
-    markdown_text = markdown_file.read()
-    markdown_file.close()
-    title = extract_title(markdown_text)
-    html = markdown_to_html_node(markdown_text).to_html()
+    page_start = time.perf_counter()
+    write_page_file(dest_path, from_path, template, block_cache)
+
+    profile = active_profile()
+    if profile:
+        profile.add_page(from_path, time.perf_counter() - page_start)
+
+"""
+Renders a list of (markdown path, html path) tuples, on jobs worker processes if jobs > 1.
+The output directories have to exist.
+block_cache - Optional BlockCache, the caller closes it
+asset_map - Optional dict of asset url -> fingerprinted url, see UrlRewriter
+minify - Minify the template and the content html of every page
+transforms - TransformPipeline applied to the node tree of every page
+"""
+def generate_pages(base_path, pages, template_path, jobs=1, block_cache=None, asset_map=None, minify=False, transforms=NO_TRANSFORMS):
+    if jobs > 1 and len(pages) > 1:
+        generate_pages_parallel(base_path, pages, template_path, min(jobs, len(pages)), block_cache, asset_map, minify, transforms)
+        return
+
+    template = load_template(template_path, UrlRewriter(base_path, asset_map), minify, transforms)
+    for from_path, dest_path in pages:
+        render_page_file(from_path, dest_path, template_path, template, block_cache)
+
+def generate_pages_recursive(base_path, dir_path_content, template_path, dest_dir_path, jobs=1):
+    plan = make_plan(dir_path_content, None, dest_dir_path)
+    create_dirs(plan.dirs)
+    generate_pages(base_path, plan.page_pairs(), template_path, jobs)
+
+def remove_output(dest_dir_path, dest_path):
+    if os.path.exists(dest_path):
+        os.remove(dest_path)
+
+    parent = os.path.dirname(dest_path)
+    while os.path.abspath(parent) != os.path.abspath(dest_dir_path) and os.path.isdir(parent) and not os.listdir(parent):
+        os.rmdir(parent)
+        parent = os.path.dirname(parent)
+
+"""
+Renders only the pages of the plan whose inputs changed since the last run
+and removes the outputs of pages whose markdown was deleted.
+The dependency graph of every page lives in the manifest in the output directory,
+explain prints why each page is rebuilt. With fingerprinted assets or transforms a page also depends on
+the fingerprinted names and image sizes of the urls it and the template reference, see helperfunctions.url_inputs.
+rebuild_all - Render every page anyway, unchanged html is still not written, see render.write_page
+"""
+def generate_pages_incremental(base_path, plan, template_path, dest_dir_path, jobs=1, explain=False, block_cache=None, asset_map=None, minify=False, transforms=NO_TRANSFORMS, rebuild_all=False):
+    manifest_path = os.path.join(dest_dir_path, MANIFEST_NAME)
+    old_manifest = load_manifest(manifest_path)
+    old_graph = DependencyGraph(old_manifest["pages"])
+    files = {}
+    template_hash = hash_file_cached(template_path, os.stat(template_path), old_manifest["files"], files)
+    transforms_key = ",".join(transforms.key)
+    url_rewriter = UrlRewriter(base_path, asset_map)
+    track_urls = bool(asset_map) or bool(transforms)
+    template_references = url_rewriter.inputs(urls_cached(template_path, files, html_urls)) if track_urls else None
 
-    template_file = open(template_path)
-    template_text = template_file.read()
-    template_file.close()
-    full_html = template_text.replace("{{ Title }}", title).replace("{{ Content }}", html)
-    full_html_www = full_html.replace("href=\"/", f"href=\"{base_path}").replace("src=\"/", f"src=\"{base_path}")
+    graph = DependencyGraph()
+    paths = {}
+    for entry in plan.pages:
+        dest_key = os.path.relpath(entry.dest, dest_dir_path)
+        source_hash = hash_file_cached(entry.source, entry.stat(), old_manifest["files"], files)
+        references = None
+        if track_urls:
+            references = {**template_references, **url_inputs(urls_cached(entry.source, files, markdown_urls), url_rewriter, transforms)}
+        graph.record(dest_key, page_inputs(entry.rel_path, source_hash, os.path.basename(template_path), template_hash, base_path, minify, transforms_key, references))
+        paths[dest_key] = (entry.source, entry.dest)
 
-    destination_file = open(dest_path, "w")
-    destination_file.write(full_html_www)
-    destination_file.close()
+    to_build, stale = invalidated_outputs(old_graph, graph, lambda dest_key: os.path.exists(os.path.join(dest_dir_path, dest_key)))
+    if rebuild_all:
+        to_build = {dest_key: to_build.get(dest_key) or ["rebuild all"] for dest_key in graph.outputs}
 
-def generate_pages_recursive(base_path, dir_path_content, template_path, dest_dir_path):
-    for entry in os.listdir(dir_path_content):
-        entry_old_path = os.path.join(dir_path_content, entry)
-        entry_new_path = os.path.join(dest_dir_path, entry).replace(".md", ".html")
+    for dest_key in stale:
+        print(f"Removing stale page {dest_key}")
+        remove_output(dest_dir_path, os.path.join(dest_dir_path, dest_key))
 
-        if os.path.isfile(entry_old_path):
-            generate_page(base_path, entry_old_path, template_path, entry_new_path)
-            continue
+    if explain:
+        for dest_key, reasons in to_build.items():
+            print(f"Rebuilding {dest_key}: {', '.join(reasons)}")
 
-        generate_pages_recursive(base_path, entry_old_path, template_path, entry_new_path)
+    generate_pages(base_path, [paths[dest_key] for dest_key in to_build], template_path, jobs, block_cache, asset_map, minify, transforms)
+
+    print(f"{len(to_build)} of {len(graph.outputs)} pages rebuilt, {len(stale)} removed")
+    save_manifest(manifest_path, {"pages": graph.to_dict(), "files": files})
+
+def shard_argument(text):
+    try:
+        return parse_shard(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the static site from ./content/ and ./static/ into ./docs/ (or --out)")
+    parser.add_argument("base_path", nargs="?", default="/", help="prefix for absolute links, e.g. /staticSiteGenerator/")
+    parser.add_argument("--out", default="./docs/", help="output directory, ./docs/ by default")
+    parser.add_argument("--incremental", action="store_true", help="keep ./docs/, only re-render pages whose inputs changed and only copy changed static files")
+    parser.add_argument("--explain", action="store_true", help="incremental build that prints why each page is rebuilt")
+    parser.add_argument("--write-if-changed", action="store_true", help=f"keep ./docs/ and render every page, but only write outputs whose bytes changed and list the changes in {CHANGES_NAME}")
+    parser.add_argument("--hash-static", action="store_true", help="with --incremental compare static files by content hash instead of mtime")
+    parser.add_argument("--link-static", action="store_true", help="hardlink static files into ./docs/ instead of copying, identical files share one inode")
+    parser.add_argument("--profile", action="store_true", help="time every build phase and page and write a json report")
+    parser.add_argument("--profile-output", default="build-profile.json", help="path of the --profile json report")
+    parser.add_argument("--profile-top", type=int, default=10, help="number of slowest pages in the --profile report")
+    parser.add_argument("--pstats", metavar="PATH", help="profile and also dump cProfile stats of the main process to PATH")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="number of worker processes rendering pages, 0 uses every core")
+    parser.add_argument("--drafts", action="store_true", help="also render pages whose front matter has draft: true")
+    parser.add_argument("--fingerprint", action="store_true", help=f"rename static files to name.<content hash>.ext, rewrite the links to them and write {ASSET_MANIFEST_NAME}")
+    parser.add_argument("--minify", action="store_true", help="minify the html of every page: collapse whitespace outside <pre>/<code>, drop comments and optional quotes")
+    parser.add_argument("--transform", action="append", choices=sorted(TRANSFORMS), default=[], metavar="NAME",
+                        help=f"apply a tree transform to every page, repeat for more ({', '.join(sorted(TRANSFORMS))}), all of them run in one pass")
+    parser.add_argument("--image-dimensions", action="store_true", help="add width and height read from the image headers under ./static/ to images, and lazy load them")
+    parser.add_argument("--block-cache", nargs="?", const=DEFAULT_CACHE_PATH, metavar="PATH", help=f"reuse rendered blocks from a persistent cache, {DEFAULT_CACHE_PATH} by default")
+    parser.add_argument("--block-cache-size", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024), metavar="MB", help="size bound of the block cache, least recently used blocks are evicted")
+    parser.add_argument("--precompress", action="store_true", help="write .gz (and .br with the brotli module) siblings of the html, css, svg and json outputs")
+    parser.add_argument("--shard", type=shard_argument, metavar="i/N", help="render only shard i of N (1-based) into --out, without static files")
+    parser.add_argument("--merge", nargs="+", metavar="SHARD_DIR", help="combine the outputs of every shard build into --out and copy the static files")
+    args = parser.parse_args(argv)
+    if args.jobs < 0:
+        parser.error("--jobs must be >= 0")
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+    if args.pstats:
+        args.profile = True
+    if args.explain:
+        args.incremental = True
+    if (args.shard or args.merge) and (args.incremental or args.write_if_changed):
+        parser.error("--shard and --merge always build from scratch, they can't be combined with --incremental or --write-if-changed")
+    if args.shard and args.merge:
+        parser.error("--shard and --merge are separate steps")
+    return args
 
 def main():
-    base_path = sys.argv[1]
+    args = parse_args()
+    if not args.profile:
+        build(args)
+        return
+
+    profile = BuildProfile()
+    enable_profile(profile)
+    profiler = cProfile.Profile() if args.pstats else None
+    if profiler:
+        profiler.enable()
+    try:
+        build(args)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.pstats)
+        enable_profile(None)
+
+    report = profile.write_report(args.profile_output, args.profile_top)
+    print(format_report(report))
+    print(f"Profile report written to {args.profile_output}")
+
+def build(args):
+    base_path = args.base_path
     print(base_path)
     if not base_path:
         base_path = "/"
 
-    setup_public_dir("./docs/")
-    rec_copy_static("./static/", "./docs/")
-    generate_pages_recursive(base_path, "./content/", "./template.html", "./docs/")
+    before = snapshot_outputs(args.out) if args.incremental or args.write_if_changed else None
+    if args.merge:
+        merge_build(args)
+    else:
+        block_cache = BlockCache(args.block_cache, args.block_cache_size * 1024 * 1024) if args.block_cache else None
+        try:
+            build_pages(base_path, args, block_cache)
+        finally:
+            if block_cache is not None:
+                block_cache.close()
+                print(f"Block cache: {block_cache.hits} hits, {block_cache.misses} misses")
+
+    if args.precompress and not args.shard:
+        precompress_output(args.out)
+
+    if before is not None:
+        changes = diff_outputs(before, snapshot_outputs(args.out))
+        save_changes(args.out, changes)
+        print(f"Changes: {len(changes['added'])} added, {len(changes['modified'])} modified, {len(changes['deleted'])} deleted, listed in {CHANGES_NAME}")
+
+"""
+Post-processing stage after pages and static files are in place, shards leave it to the merge step.
+"""
+def precompress_output(dest_dir_path):
+    with phase("compress"):
+        result = precompress_dir(dest_dir_path)
+    encodings = "/".join(suffix for suffix, _ in ENCODERS)
+    print(f"Precompressed ({encodings}): {len(result['compressed'])} compressed, {len(result['removed'])} removed, {len(result['unchanged'])} unchanged")
+
+def build_pages(base_path, args, block_cache):
+    if args.shard:
+        shard_build(base_path, args, block_cache)
+        return
+
+    plan = make_plan("./content/", "./static/", args.out)
+    with phase("metadata"):
+        index = index_metadata(plan.pages, args.out, load_metadata_index(METADATA_INDEX_PATH))
+    if not args.drafts:
+        plan = skip_drafts(plan, index)
+    hashes = {}
+    hash_path = static_hasher(plan, hashes)
+    assets = fingerprint_static(plan, hash_path) if args.fingerprint else None
+    asset_map = asset_urls(assets) if assets else None
+    if assets is None:
+        remove_asset_manifest(args.out)
+    image_index = None
+    if args.image_dimensions:
+        with phase("metadata"):
+            image_index = index_images("./static/", plan.static_files(), load_image_index(IMAGE_INDEX_PATH))
+    transforms = page_transforms(args, image_index, UrlRewriter(base_path, asset_map))
+
+    if args.incremental or args.write_if_changed:
+        with phase("static_copy"):
+            result = sync_static("./static/", args.out, args.hash_static, args.link_static, src_files=plan.static_files(), dest_names=assets, hash_path=hash_path)
+        print(f"Static files: {len(result['copied'])} copied, {len(result['removed'])} removed, {len(result['unchanged'])} unchanged")
+        create_dirs(plan.dirs)
+        generate_pages_incremental(base_path, plan, "./template.html", args.out, args.jobs, args.explain, block_cache, asset_map, args.minify, transforms, args.write_if_changed)
+    else:
+        setup_public_dir(args.out)
+        create_dirs(plan.dirs)
+        with phase("static_copy"):
+            copy_static(static_pairs(plan, args.out, assets), args.link_static, hash_path)
+        record_synced_files(args.out, static_outputs(plan, assets))
+        generate_pages(base_path, plan.page_pairs(), "./template.html", args.jobs, block_cache, asset_map, args.minify, transforms)
+
+    if assets is not None:
+        save_asset_manifest(args.out, assets)
+    save_static_hashes(hashes)
+    save_metadata_index(METADATA_INDEX_PATH, index)
+    if image_index is not None:
+        save_image_index(IMAGE_INDEX_PATH, image_index)
+
+"""
+Pipeline of the --transform names. With --image-dimensions the sizes of the images in image_index are added first
+and images are lazy loaded, url_rewriter maps the static paths to the urls the pages use.
+"""
+def page_transforms(args, image_index, url_rewriter):
+    if not args.image_dimensions:
+        return make_pipeline(args.transform)
+    return make_pipeline([*args.transform, LazyImages.name], [ImageDimensions(image_dimensions(image_index, url_rewriter))])
+
+"""
+Copy of the plan without the pages the metadata index marks as drafts, they are never rendered.
+"""
+def skip_drafts(plan, index):
+    skipped = drafts(index)
+    if skipped:
+        print(f"Skipping {len(skipped)} draft pages")
+    return BuildPlan([entry for entry in plan.pages if entry.rel_path not in skipped], plan.static, plan.dirs)
+
+"""
+Returns the dict of static relative path -> fingerprinted relative path of the plan.
+"""
+def fingerprint_static(plan, hash_path=hash_file):
+    with phase("static_copy"):
+        return fingerprint_assets("./static/", [entry.rel_path for entry in plan.static], hash_path=hash_path)
+
+"""
+Hashes the static files of the plan with the stats of its scan, files that kept their size and mtime since
+the last build reuse the hash in HASH_CACHE_PATH. The hashes of this build are recorded in hashes.
+"""
+def static_hasher(plan, hashes):
+    return cached_hasher(load_json_state(HASH_CACHE_PATH), hashes, {entry.source: entry.stat() for entry in plan.static})
+
+"""
+Keeps the hashes of a build for the next one, a build that hashed nothing leaves the cache as it was.
+"""
+def save_static_hashes(hashes):
+    if hashes:
+        save_json_state(HASH_CACHE_PATH, hashes)
+
+"""
+(static path, output path) tuples of the plan, under their fingerprinted names if assets is given.
+"""
+def static_pairs(plan, dest_dir_path, assets=None):
+    if assets is None:
+        return plan.static_pairs()
+    return [(entry.source, os.path.join(dest_dir_path, assets[entry.rel_path])) for entry in plan.static]
+
+"""
+Relative output paths of the static files of the plan, under their fingerprinted names if assets is given.
+"""
+def static_outputs(plan, assets=None):
+    if assets is None:
+        return [entry.rel_path for entry in plan.static]
+    return list(assets.values())
+
+"""
+Renders only the pages of one shard into args.out, static files are left to the merge step.
+"""
+def shard_build(base_path, args, block_cache=None):
+    index, count = args.shard
+    plan = make_plan("./content/", None, args.out)
+    if not args.drafts:
+        with phase("metadata"):
+            metadata_index = index_metadata(plan.pages, args.out)
+        plan = skip_drafts(plan, metadata_index)
+    pages = [(entry.source, entry.dest) for entry in select_shard(plan.pages, index, count)]
+    static_plan = make_plan(None, "./static/", args.out)
+    hashes = {}
+    asset_map = asset_urls(fingerprint_static(static_plan, static_hasher(static_plan, hashes))) if args.fingerprint else None
+    image_index = index_images("./static/", static_plan.static_files()) if args.image_dimensions else None
+
+    setup_public_dir(args.out)
+    create_dirs(plan.dirs)
+    transforms = page_transforms(args, image_index, UrlRewriter(base_path, asset_map))
+    generate_pages(base_path, pages, "./template.html", args.jobs, block_cache, asset_map, args.minify, transforms)
+    write_shard_manifest(args.out, index, count, [dest_path for _, dest_path in pages])
+    save_static_hashes(hashes)
+    print(f"Shard {index}/{count}: {len(pages)} of {len(plan.pages)} pages")
+
+"""
+Copies the static files once and combines the outputs of every shard into args.out.
+The shards are checked against each other and the static files before args.out is emptied,
+so a failed merge leaves it untouched.
+"""
+def merge_build(args):
+    plan = make_plan(None, "./static/", args.out)
+    hashes = {}
+    hash_path = static_hasher(plan, hashes)
+    assets = fingerprint_static(plan, hash_path) if args.fingerprint else None
+    synced = static_outputs(plan, assets)
+    reserved = synced if assets is None else [*synced, ASSET_MANIFEST_NAME]
+    merge_plan = plan_merge(args.merge, args.out, reserved)
+
+    setup_public_dir(args.out)
+    create_dirs(plan.dirs)
+    with phase("static_copy"):
+        copy_static(static_pairs(plan, args.out, assets), args.link_static, hash_path)
+    record_synced_files(args.out, synced)
+    merged = write_merge(merge_plan, args.out)
+    save_static_hashes(hashes)
+    if assets is not None:
+        save_asset_manifest(args.out, assets)
+    print(f"Merged {len(merged['pages'])} pages from {merged['count']} shards into {args.out}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
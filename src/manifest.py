@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+
+MANIFEST_NAME = ".build-manifest.json"
+HASH_CACHE_PATH = "./.cache/file-hashes.json"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+"""
+Loads a json build state file, a missing or unreadable file or one that doesn't hold a kind gives an empty kind(),
+so the state is simply rebuilt.
+"""
+def load_json_state(path, kind=dict):
+    try:
+        with open(path) as state_file:
+            state = json.load(state_file)
+    except (OSError, ValueError):
+        return kind()
+    return state if isinstance(state, kind) else kind()
+
+"""
+Writes state as json into path through a temporary file, its directory is created if needed.
+replace moves the complete temporary file to path, e.g. changes.replace_if_changed to keep an unchanged file.
+"""
+def save_json_state(path, state, replace=os.replace):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as state_file:
+        json.dump(state, state_file, indent=2, sort_keys=True)
+    replace(tmp_path, path)
+    return path
+
+def empty_manifest():
+    return {"pages": {}, "files": {}}
+
+"""
+Loads the manifest stored in the output directory.
+pages - dict of output path -> inputs the page was built from, see depgraph
+files - dict of source path -> {"size", "mtime_ns", "hash"} so unchanged files are not hashed again,
+plus "urls" for sources whose references are tracked
+A missing or unreadable manifest is treated as empty, which simply forces a full rebuild.
+"""
+def load_manifest(path):
+    manifest = load_json_state(path)
+    if not isinstance(manifest.get("pages"), dict):
+        return empty_manifest()
+    if not isinstance(manifest.get("files"), dict):
+        manifest["files"] = {}
+    return manifest
+
+def save_manifest(path, manifest):
+    save_json_state(path, manifest)
+
+"""
+Returns the content hash of path and records it in files.
+If size and mtime match the record of the last build the recorded hash is reused without reading the file.
+"""
+def hash_file_cached(path, stat, old_files, files):
+    record = old_files.get(path)
+    if not record or record.get("size") != stat.st_size or record.get("mtime_ns") != stat.st_mtime_ns:
+        record = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": hash_file(path)}
+    files[path] = record
+    return record["hash"]
+
+"""
+Returns a function hashing a path like hash_file through hash_file_cached, so files that kept their size and mtime
+are not read again. stats - dict of path -> os.stat_result from an earlier scan, other paths are stat'ed.
+"""
+def cached_hasher(old_files, files, stats=None):
+    stats = stats or {}
+    def hash_path(path):
+        stat = stats.get(path)
+        return hash_file_cached(path, stat if stat is not None else os.stat(path), old_files, files)
+    return hash_path
+
+"""
+Returns the urls extract(text) finds in path and records them with the hash of path in files,
+so like the hash they are only looked up again once the file changed. hash_file_cached records path first.
+"""
+def urls_cached(path, files, extract):
+    record = files[path]
+    if "urls" not in record:
+        with open(path) as file:
+            record["urls"] = sorted(set(extract(file.read())))
+    return record["urls"]
@@ -0,0 +1,85 @@
+import os
+from frontmatter import read_front_matter
+from helperfunctions import find_title
+from manifest import load_json_state, save_json_state
+
+"""
+The index is build state, not output, so it lives next to the block cache instead of in the published directory.
+"""
+METADATA_INDEX_PATH = "./.cache/metadata-index.json"
+
+"""
+Metadata of one markdown file from its header alone: the front matter,
+with the title of the first "# " heading when the front matter has none.
+The body is only read up to that heading and never parsed or rendered.
+title is None if the page has neither.
+"""
+def read_page_metadata(path):
+    with open(path) as markdown_file:
+        metadata = read_front_matter(markdown_file)
+        if not metadata.get("title"):
+            try:
+                metadata["title"] = find_title(markdown_file)
+            except Exception:
+                metadata["title"] = None
+    metadata.setdefault("date", None)
+    metadata.setdefault("tags", [])
+    metadata.setdefault("draft", False)
+    return metadata
+
+def load_metadata_index(path):
+    return load_json_state(path)
+
+def save_metadata_index(path, index):
+    save_json_state(path, index)
+
+"""
+Builds the metadata index of the pages of a plan: dict of page path relative to the content directory ->
+{"size", "mtime_ns", "path", "metadata"}, path is the output relative to dest_dir.
+Pages whose size and mtime match their record in old_index keep its metadata without opening the file.
+"""
+def index_metadata(pages, dest_dir, old_index=None):
+    old_index = old_index or {}
+    index = {}
+    for entry in pages:
+        stat = entry.stat()
+        record = old_index.get(entry.rel_path)
+        if not record or record.get("size") != stat.st_size or record.get("mtime_ns") != stat.st_mtime_ns:
+            record = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "metadata": read_page_metadata(entry.source)}
+        record["path"] = os.path.relpath(entry.dest, dest_dir)
+        index[entry.rel_path] = record
+    return index
+
+def drafts(index):
+    return {rel_path for rel_path, record in index.items() if record["metadata"]["draft"]}
+
+"""
+(rel_path, record) of the published pages, newest first. Pages without a date come last in path order.
+"""
+def listing(index, tag=None):
+    records = [
+        (rel_path, record) for rel_path, record in sorted(index.items())
+        if not record["metadata"]["draft"] and (tag is None or tag in record["metadata"]["tags"])
+    ]
+    dated = [item for item in records if item[1]["metadata"]["date"]]
+    undated = [item for item in records if not item[1]["metadata"]["date"]]
+    dated.sort(key=lambda item: str(item[1]["metadata"]["date"]), reverse=True)
+    return dated + undated
+
+"""
+dict of tag -> listing of its published pages, for tag pages.
+"""
+def tag_listings(index):
+    tags = sorted({tag for record in index.values() if not record["metadata"]["draft"] for tag in record["metadata"]["tags"]})
+    return {tag: listing(index, tag) for tag in tags}
+
+"""
+dict of year -> listing of its published pages, for archive pages. Years are the first four characters of the date.
+"""
+def archive(index):
+    years = {}
+    for rel_path, record in listing(index):
+        date = record["metadata"]["date"]
+        if date:
+            years.setdefault(str(date)[:4], []).append((rel_path, record))
+    return years
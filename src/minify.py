@@ -0,0 +1,187 @@
+import re
+
+HTML_WHITESPACE = " \t\n\r\f"
+
+"""
+Elements whose content is written out unchanged, whitespace inside them is significant.
+"""
+RAW_TAGS = frozenset(("pre", "code", "textarea", "script", "style"))
+
+"""
+Elements that don't flow inline with the text around them, whitespace next to their tags is never rendered.
+"""
+BLOCK_TAGS = frozenset((
+    "html", "head", "body", "title", "meta", "link", "base", "script", "style", "noscript",
+    "article", "aside", "blockquote", "dd", "div", "dl", "dt", "figcaption", "figure", "footer", "form",
+    "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section",
+    "table", "tbody", "td", "tfoot", "th", "thead", "tr", "ul",
+))
+
+REGEX_TAG = re.compile(r"<(/?)([A-Za-z][A-Za-z0-9-]*)((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>")
+REGEX_TAG_START = re.compile(r"<[A-Za-z/!?]")
+REGEX_TAG_NAME = re.compile(r"</?([A-Za-z][A-Za-z0-9-]*)")
+REGEX_DECLARATION = re.compile(r"<[!?][^>]*>")
+REGEX_TEXT = re.compile(r"(?:[^<]|<(?![A-Za-z/!?]))+")
+REGEX_WHITESPACE = re.compile(f"[{HTML_WHITESPACE}]+")
+
+"""
+Inside a tag: quoted values that need no quotes, any other quoted value (kept as it is) and whitespace between attributes.
+A value followed by "/" keeps its quotes, unquoted it would swallow the slash of "/>".
+"""
+REGEX_ATTRIBUTE_PARTS = re.compile(f"=\"([^{HTML_WHITESPACE}\"'=<>`]+)\"(?=[{HTML_WHITESPACE}]|$)|\"[^\"]*\"|'[^']*'|[{HTML_WHITESPACE}]+")
+
+_raw_end_patterns = {}
+
+def raw_end_pattern(tag):
+    pattern = _raw_end_patterns.get(tag)
+    if pattern is None:
+        pattern = _raw_end_patterns[tag] = re.compile(f"</{tag}(?=[{HTML_WHITESPACE}/>])", re.IGNORECASE)
+    return pattern
+
+def minify_attribute_part(match):
+    if match.group(1):
+        return "=" + match.group(1)
+    part = match.group(0)
+    return " " if part[0] in HTML_WHITESPACE else part
+
+def minify_attributes(attributes):
+    return REGEX_ATTRIBUTE_PARTS.sub(minify_attribute_part, attributes).rstrip(HTML_WHITESPACE)
+
+class HtmlMinifier():
+
+    """
+    Minifies html fed to it in chunks of any size with one left to right pass, linear in the size of the input.
+    Comments are dropped (conditional comments are kept), attribute values that don't need quotes lose them,
+    whitespace runs in text collapse to one space and whitespace next to block-level tags is removed.
+    Content of RAW_TAGS elements (<pre>, <code>, ...) is copied unchanged.
+    Only the unfinished token at the end of a chunk is held back until the next feed.
+    """
+    def __init__(self):
+        self.pending = ""
+        self.raw_end = None
+        self.raw_tag_length = 0
+        self.after_block = True
+
+    def feed(self, text):
+        self.pending += text
+        return self.process(False)
+
+    def close(self):
+        return self.process(True)
+
+    def process(self, final):
+        text = self.pending
+        length = len(text)
+        out = []
+        position = 0
+
+        while position < length:
+            if self.raw_end is not None:
+                match = self.raw_end.search(text, position)
+                if not match:
+                    end = length if final else max(position, length - self.raw_tag_length)
+                    out.append(text[position:end])
+                    position = end
+                    break
+                out.append(text[position:match.start()])
+                position = match.start()
+                self.raw_end = None
+                continue
+
+            if position + 1 == length and text[position] == "<" and not final:
+                break
+
+            if not REGEX_TAG_START.match(text, position):
+                match = REGEX_TEXT.match(text, position)
+                end = match.end()
+                if end == length and not final:
+                    content = text[position:end - 1] if text.endswith("<") else text[position:end]
+                    content = content.rstrip(HTML_WHITESPACE)
+                    if content:
+                        out.append(self.minify_text(content, False))
+                        position += len(content)
+                    break
+
+                next_tag = REGEX_TAG_NAME.match(text, end)
+                if not final and (next_tag.end() == length if next_tag else text.startswith("</", end) and end + 2 == length):
+                    break
+                next_is_block = end == length or (next_tag is not None and next_tag.group(1).lower() in BLOCK_TAGS)
+                out.append(self.minify_text(text[position:end], next_is_block))
+                position = end
+                continue
+
+            if text.startswith("<!--", position):
+                end = text.find("-->", position + 4)
+                if end == -1:
+                    if not final:
+                        break
+                    end = length
+                comment = text[position:end + 3]
+                if comment.startswith("<!--[if"):
+                    out.append(comment)
+                position = end + 3
+                continue
+
+            match = REGEX_TAG.match(text, position) or REGEX_DECLARATION.match(text, position)
+            if not match:
+                if text.find(">", position) == -1 and not final:
+                    break
+                out.append("<")
+                self.after_block = False
+                position += 1
+                continue
+
+            position = match.end()
+            if match.re is REGEX_DECLARATION:
+                out.append(match.group(0))
+                self.after_block = True
+                continue
+
+            closing, tag, attributes = match.groups()
+            if attributes:
+                attributes = minify_attributes(attributes)
+            out.append(f"<{closing}{tag}{attributes}>")
+            name = tag.lower()
+            self.after_block = name in BLOCK_TAGS
+            if not closing and name in RAW_TAGS and not attributes.endswith("/"):
+                self.raw_end = raw_end_pattern(name)
+                self.raw_tag_length = len(name) + 3
+
+        self.pending = text[position:]
+        return "".join(out)
+
+    """
+    Collapses a text run, whitespace at a block-level boundary is dropped completely.
+    """
+    def minify_text(self, text, next_is_block):
+        if self.after_block:
+            text = text.lstrip(HTML_WHITESPACE)
+        if next_is_block:
+            text = text.rstrip(HTML_WHITESPACE)
+        if text:
+            self.after_block = False
+        return REGEX_WHITESPACE.sub(" ", text)
+
+def minify_html(html):
+    minifier = HtmlMinifier()
+    return minifier.feed(html) + minifier.close()
+
+class MinifyingFile():
+
+    """
+    File object wrapper that minifies everything written through it, close() writes what is still held back
+    but leaves the wrapped file open.
+    """
+    def __init__(self, file):
+        self.file = file
+        self.minifier = HtmlMinifier()
+
+    def write(self, text):
+        self.file.write(self.minifier.feed(text))
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def close(self):
+        self.file.write(self.minifier.close())
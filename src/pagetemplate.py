@@ -0,0 +1,66 @@
+import os
+from minify import minify_html
+from transform import NO_TRANSFORMS
+from urlrewriter import DEFAULT_URL_REWRITER
+
+TITLE_SLOT = "{{ Title }}"
+CONTENT_SLOT = "{{ Content }}"
+SLOTS = (TITLE_SLOT, CONTENT_SLOT)
+
+"""
+Splits the template into literal segments and slot names with one scan.
+Returns a list where slots are the strings of SLOTS and everything else is literal text.
+"""
+def split_segments(template_text):
+    segments = []
+    position = 0
+    while True:
+        found = [(template_text.find(slot, position), slot) for slot in SLOTS]
+        found = [(index, slot) for index, slot in found if index != -1]
+        if not found:
+            break
+
+        index, slot = min(found)
+        if index > position:
+            segments.append(template_text[position:index])
+        segments.append(slot)
+        position = index + len(slot)
+
+    if position < len(template_text):
+        segments.append(template_text[position:])
+    return segments
+
+class CompiledTemplate():
+
+    """
+    url_rewriter - UrlRewriter the template and the pages rendered into it are built with
+    minify - The template text is minified and pages rendered into it minify their content html
+    transforms - TransformPipeline applied to the node tree of every page rendered into it
+    text - The template text with its own href/src links already rewritten
+    segments - Literal strings and slot names in document order, render.write_page fills the slots
+    """
+    def __init__(self, template_text, url_rewriter=DEFAULT_URL_REWRITER, minify=False, transforms=NO_TRANSFORMS):
+        self.url_rewriter = url_rewriter
+        self.minify = minify
+        self.transforms = transforms
+        self.text = url_rewriter.rewrite_html(template_text)
+        if minify:
+            self.text = minify_html(self.text)
+        self.segments = split_segments(self.text)
+
+_compiled_templates = {}
+
+"""
+Reads and compiles template_path once per process, a changed mtime compiles it again.
+"""
+def load_template(template_path, url_rewriter=DEFAULT_URL_REWRITER, minify=False, transforms=NO_TRANSFORMS):
+    if not os.path.exists(template_path):
+        raise Exception(f"template file does not exist {template_path}")
+
+    key = (template_path, os.stat(template_path).st_mtime_ns, url_rewriter, minify, transforms)
+    template = _compiled_templates.get(key)
+    if template is None:
+        with open(template_path) as template_file:
+            template = CompiledTemplate(template_file.read(), url_rewriter, minify, transforms)
+        _compiled_templates[key] = template
+    return template
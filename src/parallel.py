@@ -0,0 +1,80 @@
+import multiprocessing
+import time
+from pagetemplate import load_template
+from profiler import BuildProfile, active_profile, enable_profile
+from render import write_page_file
+from transform import NO_TRANSFORMS
+from urlrewriter import UrlRewriter
+
+CHUNKS_PER_WORKER = 4
+
+_worker_template = None
+_worker_profiling = False
+_worker_block_cache = None
+
+"""
+Runs once in every worker process, so the compiled template is shipped to each worker only one time
+instead of being pickled with every page.
+"""
+def init_worker(template, profiling=False, block_cache=None):
+    global _worker_template, _worker_profiling, _worker_block_cache
+    _worker_template = template
+    _worker_profiling = profiling
+    _worker_block_cache = block_cache
+    enable_profile(None)
+
+"""
+Renders and writes a single page inside a worker.
+Returns (error, page seconds, phases, cache stats), error is None on success or a message,
+exceptions never cross the process boundary.
+phases are the profile timings of this page when profiling, otherwise None.
+cache stats are the block cache hits and misses of this page, or None without a block cache.
+"""
+def render_job(page):
+    from_path, dest_path = page
+    profile = BuildProfile() if _worker_profiling else None
+    enable_profile(profile)
+    page_start = time.perf_counter()
+    error = None
+    cache_stats = None
+    if _worker_block_cache is not None:
+        hits, misses = _worker_block_cache.hits, _worker_block_cache.misses
+    try:
+        write_page_file(dest_path, from_path, _worker_template, _worker_block_cache)
+        if _worker_block_cache is not None:
+            _worker_block_cache.flush()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    if _worker_block_cache is not None:
+        cache_stats = (_worker_block_cache.hits - hits, _worker_block_cache.misses - misses)
+    return error, time.perf_counter() - page_start, profile.phases if profile else None, cache_stats
+
+def chunk_size(page_count, jobs):
+    return max(1, page_count // (jobs * CHUNKS_PER_WORKER))
+
+"""
+Renders the (markdown path, html path) tuples on a pool of jobs processes, the output directories have to exist.
+Results are consumed in page order, so the log and the reported errors are identical for any number of workers.
+Every worker opens its own connection to the block cache and adds its hits and misses to block_cache.
+"""
+def generate_pages_parallel(base_path, pages, template_path, jobs, block_cache=None, asset_map=None, minify=False, transforms=NO_TRANSFORMS):
+    template = load_template(template_path, UrlRewriter(base_path, asset_map), minify, transforms)
+
+    profile = active_profile()
+    errors = []
+    with multiprocessing.Pool(jobs, initializer=init_worker, initargs=(template, profile is not None, block_cache)) as pool:
+        results = pool.imap(render_job, pages, chunk_size(len(pages), jobs))
+        for (from_path, dest_path), (error, page_wall, phases, cache_stats) in zip(pages, results):
+            print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+            if profile:
+                profile.add_page(from_path, page_wall)
+                profile.merge_phases(phases)
+            if cache_stats:
+                block_cache.hits += cache_stats[0]
+                block_cache.misses += cache_stats[1]
+            if error:
+                print(f"Failed to generate {dest_path}: {error}")
+                errors.append(f"{from_path}: {error}")
+
+    if errors:
+        raise Exception(f"{len(errors)} of {len(pages)} pages failed to generate:\n" + "\n".join(errors))
@@ -0,0 +1,121 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+from buildplan import scan_tree
+from changes import CHANGES_NAME
+from manifest import load_json_state, save_json_state
+from staticsync import remove_empty_dirs
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PRECOMPRESS_STATE_NAME = ".precompress-manifest.json"
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".svg", ".json")
+
+def gzip_bytes(data):
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def brotli_bytes(data):
+    return brotli.compress(data, quality=11)
+
+"""
+List of (sibling suffix, compress function), .br is only written when the brotli module is installed.
+"""
+ENCODERS = [(".gz", gzip_bytes)]
+if brotli is not None:
+    ENCODERS.append((".br", brotli_bytes))
+
+"""
+Files that get compressed siblings, build state files (dotfiles) are never served and left out.
+"""
+def is_compressible(rel_path):
+    return rel_path.endswith(COMPRESSIBLE_EXTENSIONS) and not os.path.basename(rel_path).startswith(".") and rel_path != CHANGES_NAME
+
+def load_compressed_files(path):
+    return load_json_state(path)
+
+def save_compressed_files(path, compressed):
+    save_json_state(path, compressed)
+
+def remove_siblings(path, suffixes):
+    for suffix in suffixes:
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+
+"""
+Writes path + suffix for every encoder whose output is smaller than the file,
+siblings that would not shrink are removed instead. The siblings get the mtime of the file.
+Returns the list of suffixes that were written.
+"""
+def compress_file(path, encoders=ENCODERS):
+    with open(path, "rb") as file:
+        data = file.read()
+        stat = os.fstat(file.fileno())
+
+    written = []
+    for suffix, compress in encoders:
+        compressed = compress(data)
+        if len(compressed) >= len(data):
+            remove_siblings(path, [suffix])
+            continue
+
+        tmp_path = path + suffix + ".tmp"
+        with open(tmp_path, "wb") as sibling:
+            sibling.write(compressed)
+        os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(tmp_path, path + suffix)
+        written.append(suffix)
+    return written
+
+def is_unchanged(path, stat, record):
+    if not record or record.get("size") != stat.st_size or record.get("mtime_ns") != stat.st_mtime_ns:
+        return False
+    return all(os.path.exists(path + suffix) for suffix in record.get("encodings", []))
+
+"""
+Writes precompressed siblings (.gz, and .br when brotli is available) next to every compressible file
+in dest_dir so a server can send them as they are, e.g. nginx gzip_static.
+Files with the same size and mtime as in the last run are skipped, siblings of files that are gone are removed.
+Compression runs on workers threads, zlib and brotli release the GIL.
+Returns a dict with the compressed, removed and unchanged relative paths.
+"""
+def precompress_dir(dest_dir, workers=None, encoders=ENCODERS):
+    state_path = os.path.join(dest_dir, PRECOMPRESS_STATE_NAME)
+    previous = load_compressed_files(state_path)
+    suffixes = [suffix for suffix, _ in encoders]
+
+    result = {"compressed": [], "removed": [], "unchanged": []}
+    compressed = {}
+    to_compress = []
+    for rel_path, entry in scan_tree(dest_dir):
+        if entry.is_dir() or not is_compressible(rel_path):
+            continue
+
+        stat = entry.stat()
+        record = previous.get(rel_path)
+        if is_unchanged(entry.path, stat, record):
+            compressed[rel_path] = record
+            result["unchanged"].append(rel_path)
+            continue
+        to_compress.append((rel_path, entry.path, stat))
+
+    with ThreadPoolExecutor(workers) as executor:
+        encodings = executor.map(lambda job: compress_file(job[1], encoders), to_compress)
+        for (rel_path, _, stat), written in zip(to_compress, encodings):
+            compressed[rel_path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "encodings": written}
+            result["compressed"].append(rel_path)
+
+    for rel_path in previous:
+        if rel_path in compressed:
+            continue
+        path = os.path.join(dest_dir, rel_path)
+        remove_siblings(path, suffixes)
+        remove_empty_dirs(dest_dir, path)
+        result["removed"].append(rel_path)
+
+    save_compressed_files(state_path, compressed)
+    return result
@@ -0,0 +1,99 @@
+import json
+import time
+from contextlib import nullcontext
+
+"""
+Pages are streamed to disk, so to_html includes writing the content html
+and write covers the template segments and replacing the output file.
+"""
+PHASES = ("metadata", "static_copy", "read", "block_split", "inline_parse", "to_html", "write", "compress")
+
+class PhaseTimer():
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profile.add_phase(self.name, time.perf_counter() - self.wall_start, time.process_time() - self.cpu_start)
+        return False
+
+class BuildProfile():
+
+    """
+    phases - dict of phase name -> {"wall": seconds, "cpu": seconds, "calls": count}
+    pages - list of (page path, wall seconds) in the order the pages were finished
+    """
+    def __init__(self):
+        self.phases = {}
+        self.pages = []
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+
+    def phase(self, name):
+        return PhaseTimer(self, name)
+
+    def add_phase(self, name, wall, cpu, calls=1):
+        stats = self.phases.setdefault(name, {"wall": 0.0, "cpu": 0.0, "calls": 0})
+        stats["wall"] += wall
+        stats["cpu"] += cpu
+        stats["calls"] += calls
+
+    def add_page(self, path, wall):
+        self.pages.append((path, wall))
+
+    """
+    Adds the phases of a profile recorded in another process, e.g. a render worker.
+    """
+    def merge_phases(self, phases):
+        for name, stats in phases.items():
+            self.add_phase(name, stats["wall"], stats["cpu"], stats["calls"])
+
+    def report(self, top=10):
+        slowest = sorted(self.pages, key=lambda page: page[1], reverse=True)[:top]
+        return {
+            "total": {"wall": time.perf_counter() - self.wall_start, "cpu": time.process_time() - self.cpu_start},
+            "phases": {name: self.phases[name] for name in sorted(self.phases, key=lambda name: PHASES.index(name) if name in PHASES else len(PHASES))},
+            "page_count": len(self.pages),
+            "page_wall_total": sum(wall for _, wall in self.pages),
+            "slowest_pages": [{"page": path, "wall": wall} for path, wall in slowest],
+        }
+
+    def write_report(self, path, top=10):
+        report = self.report(top)
+        with open(path, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+        return report
+
+_active_profile = None
+_no_profile = nullcontext()
+
+def enable_profile(profile):
+    global _active_profile
+    _active_profile = profile
+
+def active_profile():
+    return _active_profile
+
+"""
+Times the block as the named phase of the active profile, does nothing when profiling is off.
+"""
+def phase(name):
+    if _active_profile is None:
+        return _no_profile
+    return _active_profile.phase(name)
+
+def format_report(report):
+    lines = [f"Build took {report['total']['wall']:.3f}s wall, {report['total']['cpu']:.3f}s cpu"]
+    width = max([14, *(len(name) for name in report["phases"])])
+    for name, stats in report["phases"].items():
+        lines.append(f"  {name:<{width}} {stats['wall']:9.3f}s wall {stats['cpu']:9.3f}s cpu {stats['calls']:9d} calls")
+    if report["slowest_pages"]:
+        lines.append(f"Slowest of {report['page_count']} pages:")
+        for page in report["slowest_pages"]:
+            lines.append(f"  {page['wall'] * 1000:9.2f}ms {page['page']}")
+    return "\n".join(lines)
@@ -0,0 +1,14 @@
+from htmlnode import HTMLNode
+
+class RawNode(HTMLNode):
+
+    """
+    An already rendered html fragment, e.g. a block from the block cache. It is written out unchanged.
+    """
+    __slots__ = ()
+
+    def __init__(self, html):
+        super().__init__(None, html, None, None)
+
+    def to_html(self):
+        return self.value
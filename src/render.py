@@ -0,0 +1,126 @@
+import io
+import os
+from blocklexer import iter_blocks
+from changes import replace_if_changed
+from frontmatter import read_front_matter, split_front_matter
+from helperfunctions import find_title, markdown_to_html_node, render_block
+from htmlwriter import write_html
+from minify import MinifyingFile
+from pagetemplate import CONTENT_SLOT, TITLE_SLOT
+from profiler import phase
+
+"""
+Markdown files of at least this many bytes are streamed, see write_page_stream.
+"""
+STREAM_THRESHOLD = 8 * 1024 * 1024
+
+"""
+The title of the front matter, otherwise (also for an empty "title:") the first "# " heading of the body lines.
+The lines are only read up to that heading.
+"""
+def page_title(metadata, body_lines):
+    title = metadata.get("title")
+    if isinstance(title, str) and title:
+        return title
+    return find_title(body_lines)
+
+"""
+Streams the page into dest_path: the template segments and the html of the node tree are written
+straight to the file, the page html is never held in memory as one string.
+The page is written to a temporary file that replaces dest_path only once it is complete and only if its bytes differ,
+so a page that fails to render leaves nothing behind.
+block_cache - Optional BlockCache for the rendered blocks
+"""
+def write_page(dest_path, markdown_text, template, block_cache=None):
+    metadata, body = split_front_matter(markdown_text)
+    title = page_title(metadata, io.StringIO(body))
+    html_node = markdown_to_html_node(body, template.url_rewriter, block_cache, template.transforms)
+
+    tmp_path = dest_path + ".tmp"
+    try:
+        with open(tmp_path, "w") as destination_file:
+            for segment in template.segments:
+                if segment == CONTENT_SLOT:
+                    with phase("to_html"):
+                        if template.minify:
+                            minifying_file = MinifyingFile(destination_file)
+                            write_html(html_node, minifying_file)
+                            minifying_file.close()
+                        else:
+                            write_html(html_node, destination_file)
+                    continue
+
+                with phase("write"):
+                    destination_file.write(title if segment == TITLE_SLOT else segment)
+        with phase("write"):
+            replace_if_changed(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def write_content_stream(source_file, file, template, block_cache=None):
+    blocks = iter_blocks(source_file)
+    page_pass = template.transforms.page_pass()
+    file.write("<div>")
+    while True:
+        with phase("block_split"):
+            block = next(blocks, None)
+        if block is None:
+            break
+
+        blocktype, markdown_block = block
+        block_node = render_block(markdown_block, blocktype, template.url_rewriter, block_cache, template.transforms)
+        if page_pass:
+            block_node = page_pass.block(block_node)
+        with phase("to_html"):
+            write_html(block_node, file)
+    file.write("</div>")
+
+"""
+Streaming variant of write_page that reads the markdown from source_path line by line.
+The title is looked up first, then every block is rendered and written as soon as the lexer completes it,
+so memory is bounded by the largest block instead of the document. The html is the same as write_page's.
+"""
+def write_page_stream(dest_path, source_path, template, block_cache=None):
+    with phase("read"):
+        with open(source_path) as source_file:
+            metadata = read_front_matter(source_file)
+            title = page_title(metadata, source_file)
+
+    tmp_path = dest_path + ".tmp"
+    try:
+        with open(source_path) as source_file, open(tmp_path, "w") as destination_file:
+            for segment in template.segments:
+                if segment == CONTENT_SLOT:
+                    source_file.seek(0)
+                    read_front_matter(source_file)
+                    content_file = MinifyingFile(destination_file) if template.minify else destination_file
+                    write_content_stream(source_file, content_file, template, block_cache)
+                    if template.minify:
+                        content_file.close()
+                    if block_cache is not None:
+                        block_cache.flush()
+                    continue
+
+                with phase("write"):
+                    destination_file.write(title if segment == TITLE_SLOT else segment)
+        with phase("write"):
+            replace_if_changed(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+"""
+Renders the markdown file source_path into dest_path, files of at least stream_threshold bytes are streamed.
+"""
+def write_page_file(dest_path, source_path, template, block_cache=None, stream_threshold=STREAM_THRESHOLD):
+    if os.path.getsize(source_path) >= stream_threshold:
+        write_page_stream(dest_path, source_path, template, block_cache)
+        return
+
+    with phase("read"):
+        with open(source_path) as markdown_file:
+            markdown_text = markdown_file.read()
+    write_page(dest_path, markdown_text, template, block_cache)
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+from copyengine import transfer_files
+from manifest import hash_file, save_json_state
+
+SHARD_MANIFEST_NAME = ".shard-manifest.json"
+
+"""
+Parses "i/N" into (i, N), shards are numbered 1..N.
+"""
+def parse_shard(text):
+    try:
+        index, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise ValueError(f"invalid shard {text!r}, expected i/N like 2/4")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"invalid shard {text!r}, i has to be between 1 and N")
+    return index, count
+
+"""
+Stable shard number (1..count) of a page, derived from its path relative to the content directory.
+Uses sha256 of the path with "/" separators, so every machine and every Python process agrees on it.
+"""
+def shard_of(rel_path, count):
+    digest = hashlib.sha256(rel_path.replace(os.sep, "/").encode()).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+def select_shard(entries, index, count):
+    return [entry for entry in entries if shard_of(entry.rel_path, count) == index]
+
+def load_shard_manifest(dir_path):
+    path = os.path.join(dir_path, SHARD_MANIFEST_NAME)
+    if not os.path.exists(path):
+        raise Exception(f"no shard manifest in {dir_path}")
+    with open(path) as manifest_file:
+        return json.load(manifest_file)
+
+"""
+Records which outputs this shard produced, with the content hash of each,
+so the merge step can tell identical duplicates from conflicts.
+"""
+def write_shard_manifest(dest_dir, index, count, dest_paths):
+    pages = {os.path.relpath(dest_path, dest_dir): hash_file(dest_path) for dest_path in dest_paths}
+    manifest = {"shard": index, "count": count, "pages": pages}
+    save_json_state(os.path.join(dest_dir, SHARD_MANIFEST_NAME), manifest)
+    return manifest
+
+def check_shard_set(manifests, shard_dirs):
+    counts = {manifest["count"] for manifest in manifests}
+    if len(counts) != 1:
+        raise Exception(f"shards were built with different shard counts {sorted(counts)}")
+
+    count = counts.pop()
+    seen = {}
+    for shard_dir, manifest in zip(shard_dirs, manifests):
+        if manifest["shard"] in seen:
+            raise Exception(f"shard {manifest['shard']}/{count} found twice: {seen[manifest['shard']]} and {shard_dir}")
+        seen[manifest["shard"]] = shard_dir
+
+    missing = [index for index in range(1, count + 1) if index not in seen]
+    if missing:
+        raise Exception(f"missing shards {', '.join(f'{index}/{count}' for index in missing)}")
+    return count
+
+"""
+True if path is shard_dir or lies below it.
+"""
+def is_within(path, shard_dir):
+    path, shard_dir = os.path.realpath(path), os.path.realpath(shard_dir)
+    return path == shard_dir or path.startswith(shard_dir.rstrip(os.sep) + os.sep)
+
+"""
+Checks the shard builds before anything is written and returns the merge plan for write_merge.
+Every shard has to be present exactly once. An output produced by two shards with different content,
+or colliding with one of the reserved paths (the static files), is a conflict.
+dest_dir is emptied by the merge, so neither dest_dir nor a directory containing it may be a shard directory.
+"""
+def plan_merge(shard_dirs, dest_dir, reserved=()):
+    for shard_dir in shard_dirs:
+        if is_within(shard_dir, dest_dir):
+            raise Exception(f"the merge output {dest_dir} can't be or contain the shard directory {shard_dir}")
+    manifests = [load_shard_manifest(shard_dir) for shard_dir in shard_dirs]
+    count = check_shard_set(manifests, shard_dirs)
+
+    reserved = set(reserved)
+    owners = {}
+    conflicts = []
+    for shard_dir, manifest in sorted(zip(shard_dirs, manifests), key=lambda shard: shard[1]["shard"]):
+        for rel_path, page_hash in sorted(manifest["pages"].items()):
+            if rel_path in reserved:
+                conflicts.append(f"{rel_path} of shard {manifest['shard']} collides with a static file")
+                continue
+            owner = owners.get(rel_path)
+            if owner and owner["hash"] != page_hash:
+                conflicts.append(f"{rel_path} differs between shard {owner['shard']} and shard {manifest['shard']}")
+                continue
+            if not owner:
+                owners[rel_path] = {"shard": manifest["shard"], "hash": page_hash, "dir": shard_dir}
+
+    if conflicts:
+        raise Exception(f"{len(conflicts)} conflicts merging shards:\n" + "\n".join(conflicts))
+    return {"count": count, "owners": owners}
+
+"""
+Copies the outputs of a plan_merge plan into dest_dir and returns the merged manifest.
+"""
+def write_merge(plan, dest_dir):
+    owners = plan["owners"]
+    pairs = [(os.path.join(owner["dir"], rel_path), os.path.join(dest_dir, rel_path)) for rel_path, owner in owners.items()]
+    for dir_path in sorted({os.path.dirname(dest_path) for _, dest_path in pairs}):
+        os.makedirs(dir_path, exist_ok=True)
+    transfer_files(pairs)
+
+    merged = {"count": plan["count"], "pages": {rel_path: {"shard": owner["shard"], "hash": owner["hash"]} for rel_path, owner in owners.items()}}
+    save_json_state(os.path.join(dest_dir, SHARD_MANIFEST_NAME), merged)
+    return merged
+
+"""
+Combines the outputs of shard builds into dest_dir, see plan_merge. On any error nothing is merged.
+"""
+def merge_shards(shard_dirs, dest_dir, reserved=()):
+    return write_merge(plan_merge(shard_dirs, dest_dir, reserved), dest_dir)
@@ -0,0 +1,113 @@
+import os
+from buildplan import scan_tree
+from copyengine import dedupe_files, transfer_files
+from manifest import hash_file, load_json_state, save_json_state
+
+STATIC_STATE_NAME = ".static-manifest.json"
+
+"""
+Returns a dict of relative path -> os.stat_result for every file below root.
+"""
+def list_files(root):
+    return {rel_path: entry.stat() for rel_path, entry in scan_tree(root) if not entry.is_dir()}
+
+def load_synced_files(path):
+    return load_json_state(path, list)
+
+def save_synced_files(path, synced):
+    save_json_state(path, sorted(synced))
+
+"""
+Records the relative output paths a build copied into dest_dir without sync_static, e.g. after a full build,
+so a later sync_static removes them once their source is gone.
+"""
+def record_synced_files(dest_dir, synced):
+    save_synced_files(os.path.join(dest_dir, STATIC_STATE_NAME), synced)
+
+"""
+Decides if the destination has to be copied again.
+Size and mtime are compared first, use_hash additionally compares the content of files with equal size
+instead of trusting the mtime.
+"""
+def needs_copy(src_path, src_stat, dest_path, use_hash=False):
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return True
+
+    if src_stat.st_size != dest_stat.st_size:
+        return True
+
+    if use_hash:
+        return hash_file(src_path) != hash_file(dest_path)
+
+    return src_stat.st_mtime_ns != dest_stat.st_mtime_ns
+
+def is_linked(src_path, dest_path):
+    try:
+        return os.path.samestat(os.stat(src_path), os.stat(dest_path))
+    except FileNotFoundError:
+        return False
+
+def remove_empty_dirs(root, path):
+    root = os.path.abspath(root)
+    parent = os.path.abspath(os.path.dirname(path))
+    while parent != root and parent.startswith(root) and os.path.isdir(parent) and not os.listdir(parent):
+        os.rmdir(parent)
+        parent = os.path.dirname(parent)
+
+"""
+Mirrors src_dir into dest_dir without touching unchanged files.
+New and changed files are copied with their mtime, files that were synced by an earlier run
+but no longer exist in src_dir are removed. Files in dest_dir that never came from src_dir are left alone.
+With link=True the outputs are hardlinks, files with identical content share one inode.
+src_files - dict of relative path -> os.stat_result of src_dir from an earlier scan, src_dir is scanned if None
+dest_names - Optional dict of relative path -> relative output path, e.g. fingerprinted names
+hash_path - Hashes the same-size sources compared with link=True, see copyengine.dedupe_files
+Returns a dict with the copied, removed and unchanged relative output paths.
+"""
+def sync_static(src_dir, dest_dir, use_hash=False, link=False, workers=None, src_files=None, dest_names=None, hash_path=hash_file):
+    os.makedirs(dest_dir, exist_ok=True)
+    state_path = os.path.join(dest_dir, STATIC_STATE_NAME)
+    previous = load_synced_files(state_path)
+    if src_files is None:
+        src_files = list_files(src_dir)
+    if link:
+        canonical = dedupe_files([os.path.join(src_dir, rel_path) for rel_path in src_files], hash_path)
+
+    result = {"copied": [], "removed": [], "unchanged": []}
+    pairs = []
+    synced = set()
+    for rel_path, src_stat in src_files.items():
+        src_path = os.path.join(src_dir, rel_path)
+        if dest_names:
+            rel_path = dest_names[rel_path]
+        synced.add(rel_path)
+        dest_path = os.path.join(dest_dir, rel_path)
+        if link:
+            src_path = canonical[src_path]
+            changed = not is_linked(src_path, dest_path)
+        else:
+            changed = needs_copy(src_path, src_stat, dest_path, use_hash)
+
+        if changed:
+            pairs.append((src_path, dest_path))
+            result["copied"].append(rel_path)
+            continue
+        result["unchanged"].append(rel_path)
+
+    for dir_path in sorted({os.path.dirname(dest_path) for _, dest_path in pairs}):
+        os.makedirs(dir_path, exist_ok=True)
+    transfer_files(pairs, link, workers)
+
+    for rel_path in previous:
+        if rel_path in synced:
+            continue
+        dest_path = os.path.join(dest_dir, rel_path)
+        if os.path.isfile(dest_path):
+            os.remove(dest_path)
+            remove_empty_dirs(dest_dir, dest_path)
+        result["removed"].append(rel_path)
+
+    save_synced_files(state_path, synced)
+    return result
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from bench.corpus import CorpusConfig, iter_corpus, page_path, write_corpus
+from bench.memory import run_memory
+from bench.results import compare_results, format_results, make_results
+from helperfunctions import extract_title, markdown_to_html_node
+
+class TestBench(unittest.TestCase):
+
+    def test_corpus_is_deterministic(self):
+        self.assertEqual(list(iter_corpus(20, seed=1)), list(iter_corpus(20, seed=1)))
+        self.assertNotEqual(list(iter_corpus(20, seed=1)), list(iter_corpus(20, seed=2)))
+
+    def test_corpus_page_does_not_depend_on_page_count(self):
+        self.assertEqual(list(iter_corpus(5))[3], list(iter_corpus(50))[3])
+
+    def test_corpus_pages_render(self):
+        for _, markdown in iter_corpus(30):
+            extract_title(markdown)
+            markdown_to_html_node(markdown).to_html()
+
+    def test_corpus_config_counts(self):
+        config = CorpusConfig(block_mix={"paragraph": 1}, images_per_page=3, links_per_page=5, inline_density=0)
+        for _, markdown in iter_corpus(10, config=config):
+            self.assertEqual(markdown.count("!["), 3)
+            self.assertEqual(markdown.count("](/page/"), 5)
+            self.assertNotIn("**", markdown)
+
+    def test_page_path(self):
+        self.assertEqual(page_path(123, 2), os.path.join("section3", "section2", "page123", "index.md"))
+        self.assertEqual(page_path(7, 0), os.path.join("page7", "index.md"))
+
+    def test_write_corpus(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_corpus(tmp_dir, 3, config=CorpusConfig(nesting_depth=1))
+            self.assertTrue(os.path.isfile(os.path.join(tmp_dir, "section2", "page2", "index.md")))
+
+    def test_compare_results(self):
+        baseline = make_results({"a": {"seconds": 1.0}, "b": {"seconds": 1.0}, "c": {"seconds": 1.0}}, {})
+        current = make_results({"a": {"seconds": 1.05}, "b": {"seconds": 1.5}, "new": {"seconds": 9.0}}, {})
+        self.assertEqual(compare_results(current, baseline, 0.1), [("b", 1.0, 1.5)])
+
+    def test_memory_results_are_not_compared(self):
+        baseline = make_results({"a": {"bytes_per_node": 100.0}}, {})
+        current = make_results({"a": {"bytes_per_node": 150.0}}, {})
+        self.assertEqual(compare_results(current, baseline, 0.1), [])
+        self.assertIn("150.0B/node", format_results(current, baseline))
+
+    def test_run_memory(self):
+        results = run_memory(pages=3)
+        self.assertGreater(results["LeafNode"]["bytes_per_node"], 0)
+        self.assertGreater(results["markdown_to_html_node"]["bytes_per_node"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
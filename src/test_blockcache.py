@@ -0,0 +1,132 @@
+import os
+import pickle
+import tempfile
+import unittest
+from blockcache import *
+from helperfunctions import markdown_to_html_node
+from rawnode import RawNode
+from transform import ImageDimensions, TransformPipeline
+from urlrewriter import UrlRewriter
+
+MARKDOWN = """
+# Title
+
+A paragraph with **bold** and a [link](/about).
+
+- one
+- two
+
+```
+code
+```
+"""
+
+class TestBlockCache(unittest.TestCase):
+
+    def test_get_put(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = BlockCache(os.path.join(tmp_dir, "blocks.sqlite"))
+            key = cache.key("# Title")
+            self.assertIsNone(cache.get(key))
+            cache.put(key, "<h1>Title</h1>")
+            self.assertEqual(cache.get(key), "<h1>Title</h1>")
+            self.assertEqual(cache.stats(), {"hits": 1, "misses": 1})
+            cache.close()
+
+    def test_key_depends_on_context(self):
+        cache = BlockCache()
+        self.assertEqual(cache.key("text", ("/",)), cache.key("text", ("/",)))
+        self.assertNotEqual(cache.key("text", ("/",)), cache.key("text", ("/www/",)))
+        self.assertNotEqual(cache.key("text", ("/",)), cache.key("other", ("/",)))
+
+    def test_persists_across_instances(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "cache", "blocks.sqlite")
+            cache = BlockCache(path)
+            cache.put(cache.key("a"), "<p>a</p>")
+            cache.close()
+
+            cache = BlockCache(path)
+            self.assertEqual(cache.get(cache.key("a")), "<p>a</p>")
+            cache.close()
+
+    def test_version_change_empties_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "blocks.sqlite")
+            cache = BlockCache(path, version="1")
+            cache.put(cache.key("a"), "<p>a</p>")
+            cache.close()
+
+            cache = BlockCache(path, version="2")
+            self.assertIsNone(cache.get(cache.key("a")))
+            cache.close()
+
+    def test_evicts_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "blocks.sqlite")
+            cache = BlockCache(path, max_bytes=10)
+            cache.put("old", "<p>a</p>")
+            cache.flush()
+            cache.put("new", "<p>b</p>")
+            cache.close()
+
+            cache = BlockCache(path, max_bytes=10)
+            self.assertIsNone(cache.get("old"))
+            self.assertEqual(cache.get("new"), "<p>b</p>")
+            cache.close()
+
+    def test_put_flushes_in_batches(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = BlockCache(os.path.join(tmp_dir, "blocks.sqlite"))
+            for i in range(FLUSH_EVERY + 1):
+                cache.put(str(i), "<p></p>")
+            self.assertEqual(len(cache.pending_puts), 1)
+            cache.close()
+
+    def test_pickle_drops_connection(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = BlockCache(os.path.join(tmp_dir, "blocks.sqlite"), 1024)
+            cache.put("a", "<p>a</p>")
+            cache.flush()
+
+            copy = pickle.loads(pickle.dumps(cache))
+            self.assertIsNone(copy.connection)
+            self.assertEqual((copy.path, copy.max_bytes), (cache.path, cache.max_bytes))
+            self.assertEqual(copy.get("a"), "<p>a</p>")
+            copy.close()
+            cache.close()
+
+    def test_same_html_with_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            url_rewriter = UrlRewriter("/www/")
+            expected = markdown_to_html_node(MARKDOWN, url_rewriter).to_html()
+
+            cache = BlockCache(os.path.join(tmp_dir, "blocks.sqlite"))
+            self.assertEqual(markdown_to_html_node(MARKDOWN, url_rewriter, cache).to_html(), expected)
+            self.assertEqual(cache.misses, 4)
+            cached = markdown_to_html_node(MARKDOWN, url_rewriter, cache)
+            self.assertEqual(cached.to_html(), expected)
+            self.assertEqual(cache.hits, 4)
+            self.assertTrue(all(isinstance(child, RawNode) for child in cached.children))
+            cache.close()
+
+    def test_image_size_invalidates_only_its_blocks(self):
+        markdown = "![a](/a.png)\n\n![b](/b.png)\n\nText"
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = BlockCache(os.path.join(tmp_dir, "blocks.sqlite"))
+            markdown_to_html_node(markdown, block_cache=cache, transforms=TransformPipeline([ImageDimensions({"/a.png": (1, 1), "/b.png": (2, 2)})]))
+            html = markdown_to_html_node(markdown, block_cache=cache, transforms=TransformPipeline([ImageDimensions({"/a.png": (1, 1), "/b.png": (3, 3)})])).to_html()
+            self.assertEqual((cache.hits, cache.misses), (2, 4))
+            self.assertIn('width="3"', html)
+            cache.close()
+
+    def test_base_path_is_part_of_key(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = BlockCache(os.path.join(tmp_dir, "blocks.sqlite"))
+            markdown_to_html_node(MARKDOWN, UrlRewriter("/"), cache)
+            html = markdown_to_html_node(MARKDOWN, UrlRewriter("/www/"), cache).to_html()
+            self.assertIn('href="/www/about"', html)
+            cache.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import io
+import unittest
+from random import Random
+from blocklexer import *
+from blocktype import BlockType, block_to_block_type
+from helperfunctions import markdown_to_blocks, markdown_to_html_node
+
+class TestBlockLexer(unittest.TestCase):
+
+    def test_lex_blocks(self):
+        markdown = "# Title\n\nSome text\nmore text\n\n- a\n- b\n\n1. a\n2. b\n\n> quote\n\n```\ncode\n```"
+        self.assertEqual(lex_blocks(markdown), [
+            (BlockType.HEADING, "# Title"),
+            (BlockType.PARAGRAPH, "Some text\nmore text"),
+            (BlockType.UNORDERED_LIST, "- a\n- b"),
+            (BlockType.ORDERED_LIST, "1. a\n2. b"),
+            (BlockType.QUOTE, "> quote"),
+            (BlockType.CODE, "```\ncode\n```"),
+        ])
+
+    def test_fence_spans_blank_lines(self):
+        markdown = "text\n\n```\ndef f():\n\n\n    return 1\n```\n\nafter"
+        self.assertEqual(lex_blocks(markdown), [
+            (BlockType.PARAGRAPH, "text"),
+            (BlockType.CODE, "```\ndef f():\n\n\n    return 1\n```"),
+            (BlockType.PARAGRAPH, "after"),
+        ])
+
+    def test_fence_ends_block(self):
+        self.assertEqual(lex_blocks("```\ncode\n```\nafter"), [(BlockType.CODE, "```\ncode\n```"), (BlockType.PARAGRAPH, "after")])
+        self.assertEqual(lex_blocks("```inline```"), [(BlockType.CODE, "```inline```")])
+
+    def test_unclosed_fence_runs_to_the_end(self):
+        self.assertEqual(lex_blocks("```\ncode\n\nmore"), [(BlockType.CODE, "```\ncode\n\nmore")])
+
+    def test_ordered_list_must_count_from_one(self):
+        self.assertEqual(lex_blocks("1. a\n3. b"), [(BlockType.PARAGRAPH, "1. a\n3. b")])
+        self.assertEqual(lex_blocks("2. a"), [(BlockType.PARAGRAPH, "2. a")])
+
+    def test_whitespace_lines_separate_blocks(self):
+        self.assertEqual(lex_blocks("a\n  \r\nb"), [(BlockType.PARAGRAPH, "a"), (BlockType.PARAGRAPH, "b")])
+
+    def test_iter_blocks_over_file(self):
+        file = io.StringIO("# Title\n\n```\nx\n\ny\n```\n")
+        self.assertEqual(list(iter_blocks(file)), [(BlockType.HEADING, "# Title"), (BlockType.CODE, "```\nx\n\ny\n```")])
+
+    def test_same_as_split_and_classify(self):
+        random = Random(0)
+        lines = ["# h", "## h", "####### h", "#x", "#  ", "- ", "- a", "-a", "1. a", "2. b", "1.x", "10. z", "> q", "text", " lead", "", "", "x ``` y", "\t tab"]
+        for _ in range(5000):
+            markdown = "\n".join(random.choice(lines) for _ in range(random.randint(0, 12)))
+            expected = [(block_to_block_type(block), block) for block in markdown_to_blocks(markdown)]
+            self.assertEqual(lex_blocks(markdown), expected, markdown)
+
+    def test_code_with_blank_lines_renders(self):
+        html = markdown_to_html_node("```\na\n\nb\n```").to_html()
+        self.assertEqual(html, "<div><pre><code>a\n\nb\n</code></pre></div>")
+
+if __name__ == "__main__":
+    unittest.main()
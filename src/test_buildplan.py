@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+from buildplan import *
+
+class TestBuildPlan(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = self.tmp_dir.name
+        for rel_path in ("content/index.md", "content/blog/tom/index.md", "content/blog/a.md", "static/index.css", "static/images/tom.png"):
+            path = os.path.join(self.root, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as file:
+                file.write(rel_path)
+        os.makedirs(os.path.join(self.root, "static", "empty"))
+        self.content_dir = os.path.join(self.root, "content")
+        self.static_dir = os.path.join(self.root, "static")
+        self.dest_dir = os.path.join(self.root, "docs")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_scan_tree(self):
+        paths = [rel_path for rel_path, _ in scan_tree(self.content_dir)]
+        self.assertEqual(paths, [
+            "blog",
+            os.path.join("blog", "a.md"),
+            os.path.join("blog", "tom"),
+            os.path.join("blog", "tom", "index.md"),
+            "index.md",
+        ])
+
+    def test_make_plan_pages(self):
+        plan = make_plan(self.content_dir, self.static_dir, self.dest_dir)
+        self.assertEqual(plan.page_pairs(), [
+            (os.path.join(self.content_dir, "blog", "a.md"), os.path.join(self.dest_dir, "blog", "a.html")),
+            (os.path.join(self.content_dir, "blog", "tom", "index.md"), os.path.join(self.dest_dir, "blog", "tom", "index.html")),
+            (os.path.join(self.content_dir, "index.md"), os.path.join(self.dest_dir, "index.html")),
+        ])
+        self.assertEqual([entry.action for entry in plan.pages], [RENDER] * 3)
+
+    def test_make_plan_static(self):
+        plan = make_plan(self.content_dir, self.static_dir, self.dest_dir)
+        self.assertEqual(plan.static_pairs(), [
+            (os.path.join(self.static_dir, "images", "tom.png"), os.path.join(self.dest_dir, "images", "tom.png")),
+            (os.path.join(self.static_dir, "index.css"), os.path.join(self.dest_dir, "index.css")),
+        ])
+        self.assertEqual(plan.static_files()["index.css"].st_size, len("static/index.css"))
+
+    def test_make_plan_dirs(self):
+        plan = make_plan(self.content_dir, self.static_dir, self.dest_dir)
+        self.assertEqual(plan.dirs, [
+            self.dest_dir,
+            os.path.join(self.dest_dir, "blog"),
+            os.path.join(self.dest_dir, "blog", "tom"),
+            os.path.join(self.dest_dir, "empty"),
+            os.path.join(self.dest_dir, "images"),
+        ])
+
+    def test_make_plan_only_static(self):
+        plan = make_plan(None, self.static_dir, self.dest_dir)
+        self.assertEqual(plan.pages, [])
+        self.assertEqual(len(plan.static), 2)
+
+    def test_create_dirs(self):
+        plan = make_plan(self.content_dir, self.static_dir, self.dest_dir)
+        create_dirs(plan.dirs)
+        create_dirs(plan.dirs)
+        for dir_path in plan.dirs:
+            self.assertTrue(os.path.isdir(dir_path))
+
+if __name__ == "__main__":
+    unittest.main()
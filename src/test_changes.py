@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+from changes import *
+from testfiles import write_file
+
+class TestChanges(unittest.TestCase):
+
+    def test_replace_if_changed(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dest_path = os.path.join(tmp_dir, "index.html")
+            tmp_path = dest_path + ".tmp"
+            write_file(tmp_path, "<p>a</p>")
+            self.assertTrue(replace_if_changed(tmp_path, dest_path))
+            os.utime(dest_path, ns=(0, 0))
+
+            write_file(tmp_path, "<p>a</p>")
+            self.assertFalse(replace_if_changed(tmp_path, dest_path))
+            self.assertEqual(os.stat(dest_path).st_mtime_ns, 0)
+            self.assertFalse(os.path.exists(tmp_path))
+
+            write_file(tmp_path, "<p>b</p>")
+            self.assertTrue(replace_if_changed(tmp_path, dest_path))
+            with open(dest_path) as file:
+                self.assertEqual(file.read(), "<p>b</p>")
+
+    def test_snapshot_skips_build_state(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_file(os.path.join(tmp_dir, "index.html"), "a")
+            write_file(os.path.join(tmp_dir, ".build-manifest.json"), "{}")
+            write_file(os.path.join(tmp_dir, CHANGES_NAME), "{}")
+            write_file(os.path.join(tmp_dir, "blog", "index.html.tmp"), "a")
+            self.assertEqual(list(snapshot_outputs(tmp_dir)), ["index.html"])
+            self.assertEqual(snapshot_outputs(os.path.join(tmp_dir, "missing")), {})
+
+    def test_diff_outputs(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_file(os.path.join(tmp_dir, "same.html"), "a")
+            write_file(os.path.join(tmp_dir, "blog", "changed.html"), "a")
+            write_file(os.path.join(tmp_dir, "deleted.html"), "a")
+            before = snapshot_outputs(tmp_dir)
+
+            os.remove(os.path.join(tmp_dir, "deleted.html"))
+            write_file(os.path.join(tmp_dir, "blog", "changed.html.tmp"), "bb")
+            replace_if_changed(os.path.join(tmp_dir, "blog", "changed.html.tmp"), os.path.join(tmp_dir, "blog", "changed.html"))
+            write_file(os.path.join(tmp_dir, "added.html"), "a")
+
+            changes = diff_outputs(before, snapshot_outputs(tmp_dir))
+            self.assertEqual(changes, {"added": ["added.html"], "modified": ["blog/changed.html"], "deleted": ["deleted.html"]})
+            save_changes(tmp_dir, changes)
+            self.assertEqual(diff_outputs(before, snapshot_outputs(tmp_dir))["added"], ["added.html"])
+
+if __name__ == "__main__":
+    unittest.main()
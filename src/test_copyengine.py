@@ -0,0 +1,92 @@
+import os
+import stat
+import tempfile
+import unittest
+from copyengine import *
+from testfiles import write_file
+
+class TestCopyEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        os.mkdir(os.path.join(self.tmp_dir.name, "out"))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read(self, path):
+        with open(path, "rb") as file:
+            return file.read()
+
+    def test_fast_copy(self):
+        data = os.urandom(3 * 1024 * 1024 + 17)
+        src_path = write_file(os.path.join(self.tmp_dir.name, "src.bin"), data)
+        dest_path = os.path.join(self.tmp_dir.name, "dest.bin")
+        fast_copy(src_path, dest_path)
+        self.assertEqual(self.read(dest_path), data)
+
+    def test_fast_copy_empty_file(self):
+        src_path = write_file(os.path.join(self.tmp_dir.name, "empty.bin"), b"")
+        dest_path = os.path.join(self.tmp_dir.name, "dest.bin")
+        fast_copy(src_path, dest_path)
+        self.assertEqual(self.read(dest_path), b"")
+
+    def test_copy_file_keeps_mtime_not_mode(self):
+        src_path = write_file(os.path.join(self.tmp_dir.name, "src.css"), b"body {}")
+        os.chmod(src_path, 0o600)
+        os.utime(src_path, ns=(1_000_000_000, 2_000_000_000))
+        dest_path = os.path.join(self.tmp_dir.name, "out", "src.css")
+        copy_file(src_path, dest_path)
+        self.assertEqual(self.read(dest_path), b"body {}")
+        self.assertEqual(os.stat(dest_path).st_mtime_ns, 2_000_000_000)
+        self.assertNotEqual(stat.S_IMODE(os.stat(dest_path).st_mode), 0o600)
+        os.chmod(src_path, 0o644)
+
+    def test_copy_over_hardlink_keeps_source(self):
+        src_path = write_file(os.path.join(self.tmp_dir.name, "src.css"), b"old")
+        dest_path = os.path.join(self.tmp_dir.name, "out", "src.css")
+        link_file(src_path, dest_path)
+        other_path = write_file(os.path.join(self.tmp_dir.name, "other.css"), b"new")
+        copy_file(other_path, dest_path)
+        self.assertEqual(self.read(src_path), b"old")
+        self.assertEqual(self.read(dest_path), b"new")
+
+    def test_link_file(self):
+        src_path = write_file(os.path.join(self.tmp_dir.name, "src.png"), b"png")
+        dest_path = os.path.join(self.tmp_dir.name, "out", "src.png")
+        link_file(src_path, dest_path)
+        self.assertTrue(os.path.samefile(src_path, dest_path))
+
+    def test_link_file_twice_leaves_no_temporary_file(self):
+        src_path = write_file(os.path.join(self.tmp_dir.name, "src.png"), b"png")
+        dest_path = os.path.join(self.tmp_dir.name, "out", "src.png")
+        link_file(src_path, dest_path)
+        link_file(src_path, dest_path)
+        self.assertEqual(os.listdir(os.path.join(self.tmp_dir.name, "out")), ["src.png"])
+
+    def test_dedupe_files(self):
+        a = write_file(os.path.join(self.tmp_dir.name, "a.png"), b"same")
+        b = write_file(os.path.join(self.tmp_dir.name, "b.png"), b"same")
+        c = write_file(os.path.join(self.tmp_dir.name, "c.png"), b"diff")
+        d = write_file(os.path.join(self.tmp_dir.name, "d.png"), b"longer")
+        self.assertEqual(dedupe_files([a, b, c, d]), {a: a, b: a, c: c, d: d})
+        self.assertEqual(dedupe_files([a, b, c, d], lambda path: "same"), {a: a, b: a, c: a, d: d})
+
+    def test_transfer_files(self):
+        pairs = []
+        for i in range(5):
+            src_path = write_file(os.path.join(self.tmp_dir.name, f"src{i}.txt"), f"file {i}".encode())
+            pairs.append((src_path, os.path.join(self.tmp_dir.name, "out", f"dest{i}.txt")))
+        transfer_files(pairs, workers=3)
+        for i, (_, dest_path) in enumerate(pairs):
+            self.assertEqual(self.read(dest_path), f"file {i}".encode())
+
+    def test_transfer_files_link(self):
+        src_path = write_file(os.path.join(self.tmp_dir.name, "src.png"), b"png")
+        dest_paths = [os.path.join(self.tmp_dir.name, "out", name) for name in ("a.png", "b.png")]
+        transfer_files([(src_path, dest_path) for dest_path in dest_paths], link=True)
+        for dest_path in dest_paths:
+            self.assertTrue(os.path.samefile(src_path, dest_path))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from depgraph import *
+
+def inputs(source_hash="a", template_hash="b", base_path="/"):
+    return page_inputs("index.md", source_hash, "template.html", template_hash, base_path)
+
+class TestDepGraph(unittest.TestCase):
+
+    def test_page_inputs(self):
+        self.assertEqual(inputs(), {"source:index.md": "a", "template:template.html": "b", "param:base_path": "/"})
+
+    def test_page_inputs_transforms(self):
+        with_transforms = page_inputs("index.md", "a", "template.html", "b", "/", transforms="lazy-images")
+        self.assertEqual(with_transforms["param:transforms"], "lazy-images")
+        self.assertEqual(page_inputs("index.md", "a", "template.html", "b", "/", transforms=""), inputs())
+
+    def test_explain_unchanged(self):
+        self.assertEqual(explain_changes(inputs(), inputs()), [])
+
+    def test_explain_new_output(self):
+        self.assertEqual(explain_changes(None, inputs()), ["new output"])
+
+    def test_explain_changes(self):
+        self.assertEqual(explain_changes(inputs(), inputs(source_hash="c")), ["source:index.md changed"])
+        self.assertEqual(explain_changes(inputs(), inputs(template_hash="c")), ["template:template.html changed"])
+        self.assertEqual(explain_changes(inputs(), inputs(base_path="/www/")), ["param:base_path changed ('/' -> '/www/')"])
+
+    def test_explain_added_and_removed_inputs(self):
+        new_inputs = inputs()
+        new_inputs["partial:header.html"] = "x"
+        self.assertEqual(explain_changes(inputs(), new_inputs), ["new input partial:header.html"])
+        self.assertEqual(explain_changes(new_inputs, inputs()), ["input partial:header.html removed"])
+
+    def test_dependents(self):
+        graph = DependencyGraph()
+        graph.record("a.html", page_inputs("a.md", "1", "template.html", "t", "/"))
+        graph.record("b.html", page_inputs("b.md", "2", "template.html", "t", "/"))
+        self.assertEqual(graph.dependents("template:template.html"), ["a.html", "b.html"])
+        self.assertEqual(graph.dependents("source:b.md"), ["b.html"])
+
+    def test_template_change_invalidates_everything(self):
+        old_graph = DependencyGraph({"a.html": page_inputs("a.md", "1", "template.html", "t", "/"), "b.html": page_inputs("b.md", "2", "template.html", "t", "/")})
+        graph = DependencyGraph({"a.html": page_inputs("a.md", "1", "template.html", "u", "/"), "b.html": page_inputs("b.md", "2", "template.html", "u", "/")})
+        to_build, stale = invalidated_outputs(old_graph, graph, lambda output: True)
+        self.assertEqual(list(to_build), ["a.html", "b.html"])
+
+    def test_content_change_invalidates_only_its_page(self):
+        old_graph = DependencyGraph({"a.html": page_inputs("a.md", "1", "template.html", "t", "/"), "b.html": page_inputs("b.md", "2", "template.html", "t", "/")})
+        graph = DependencyGraph({"a.html": page_inputs("a.md", "1", "template.html", "t", "/"), "b.html": page_inputs("b.md", "3", "template.html", "t", "/")})
+        to_build, stale = invalidated_outputs(old_graph, graph, lambda output: True)
+        self.assertEqual(to_build, {"b.html": ["source:b.md changed"]})
+        self.assertEqual(stale, [])
+
+    def test_reference_inputs(self):
+        old_inputs = page_inputs("index.md", "a", "template.html", "b", "/", references={"asset:/index.css": "/index.1.css", "image:/a.png": "640x480"})
+        new_inputs = page_inputs("index.md", "a", "template.html", "b", "/", references={"asset:/index.css": "/index.2.css", "image:/a.png": "640x480"})
+        self.assertEqual(explain_changes(old_inputs, new_inputs), ["asset:/index.css changed"])
+
+    def test_missing_output_and_stale(self):
+        old_graph = DependencyGraph({"a.html": inputs(), "old.html": inputs()})
+        graph = DependencyGraph({"a.html": inputs()})
+        to_build, stale = invalidated_outputs(old_graph, graph, lambda output: False)
+        self.assertEqual(to_build, {"a.html": ["output missing"]})
+        self.assertEqual(stale, ["old.html"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+import unittest
+from fingerprint import *
+from manifest import hash_bytes
+
+class TestFingerprint(unittest.TestCase):
+
+    def test_fingerprint_path(self):
+        self.assertEqual(fingerprint_path(os.path.join("images", "tom.png"), "0123456789abcdef"), os.path.join("images", "tom.0123456789.png"))
+        self.assertEqual(fingerprint_path("LICENSE", "0123456789abcdef"), "LICENSE.0123456789")
+
+    def test_fingerprint_assets(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            os.makedirs(os.path.join(tmp_dir, "images"))
+            with open(os.path.join(tmp_dir, "index.css"), "wb") as file:
+                file.write(b"body {}")
+            with open(os.path.join(tmp_dir, "images", "a.png"), "wb") as file:
+                file.write(b"png")
+
+            assets = fingerprint_assets(tmp_dir, ["index.css", os.path.join("images", "a.png")])
+            self.assertEqual(assets["index.css"], f"index.{hash_bytes(b'body {}')[:FINGERPRINT_LENGTH]}.css")
+            self.assertEqual(assets[os.path.join("images", "a.png")], os.path.join("images", f"a.{hash_bytes(b'png')[:FINGERPRINT_LENGTH]}.png"))
+
+    def test_asset_urls(self):
+        assets = {os.path.join("images", "a.png"): os.path.join("images", "a.1.png")}
+        self.assertEqual(asset_urls(assets), {"/images/a.png": "/images/a.1.png"})
+
+    def test_save_asset_manifest(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = save_asset_manifest(tmp_dir, {"index.css": "index.1.css"})
+            self.assertEqual(path, os.path.join(tmp_dir, ASSET_MANIFEST_NAME))
+            with open(path) as file:
+                self.assertEqual(json.load(file), {"/index.css": "/index.1.css"})
+
+            remove_asset_manifest(tmp_dir)
+            self.assertFalse(os.path.exists(path))
+            remove_asset_manifest(tmp_dir)
+
+if __name__ == "__main__":
+    unittest.main()
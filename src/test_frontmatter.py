@@ -0,0 +1,50 @@
+import io
+import unittest
+from frontmatter import *
+
+class TestFrontMatter(unittest.TestCase):
+
+    def test_parse_front_matter(self):
+        lines = ["title: \"Hello: world\"\n", "date: 2024-03-01\n", "tags: [python, 'web']\n", "draft: yes\n", "# comment\n", "author: me\n"]
+        self.assertEqual(parse_front_matter(lines), {"title": "Hello: world", "date": "2024-03-01", "tags": ["python", "web"], "draft": True, "author": "me"})
+
+    def test_parse_block_list(self):
+        self.assertEqual(parse_front_matter(["tags:\n", "  - a\n", "  - b\n", "draft: false\n"]), {"tags": ["a", "b"], "draft": False})
+        self.assertEqual(parse_front_matter(["tags: a, b\n"]), {"tags": ["a", "b"]})
+
+    def test_empty_value(self):
+        self.assertEqual(parse_front_matter(["title:\n", "tags:\n", "draft:\n", "author:\n", "  - me\n"]), {"title": None, "tags": [], "author": ["me"]})
+
+    def test_invalid_front_matter(self):
+        with self.assertRaises(Exception):
+            parse_front_matter(["no separator\n"])
+        with self.assertRaises(Exception):
+            parse_front_matter(["draft: maybe\n"])
+
+    def test_split_front_matter(self):
+        self.assertEqual(split_front_matter("---\ntitle: T\n---\n# Body\n"), ({"title": "T"}, "# Body\n"))
+        self.assertEqual(split_front_matter("---\n---\nbody"), ({}, "body"))
+        self.assertEqual(split_front_matter("# Body\n"), ({}, "# Body\n"))
+        self.assertEqual(split_front_matter("---\ntitle: T\n# never closed"), ({}, "---\ntitle: T\n# never closed"))
+
+    def test_fenced_text_is_not_front_matter(self):
+        markdown = "---\nSome intro text\n---\n\n# Title"
+        self.assertEqual(split_front_matter(markdown), ({}, markdown))
+        file = io.StringIO(markdown)
+        self.assertEqual(read_front_matter(file), {})
+        self.assertEqual(file.read(), markdown)
+        self.assertFalse(is_front_matter(["title: T\n", "- item\n"]))
+        self.assertTrue(is_front_matter(["tags:\n", "- a\n", "# comment\n", "\n"]))
+
+    def test_read_front_matter_stops_at_fence(self):
+        file = io.StringIO("---\ntitle: T\n---\n# Body\n")
+        self.assertEqual(read_front_matter(file), {"title": "T"})
+        self.assertEqual(file.read(), "# Body\n")
+
+    def test_read_front_matter_without_header(self):
+        file = io.StringIO("# Body\n---\n")
+        self.assertEqual(read_front_matter(file), {})
+        self.assertEqual(file.read(), "# Body\n---\n")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,10 @@
 from itertools import count
+from random import Random
 import unittest
 import blocktype
 from textnode import TextNode, TextType
 from helperfunctions import *
+from urlrewriter import UrlRewriter
 
 class TestHelperfunctions(unittest.TestCase):
 
@@ -75,6 +77,16 @@ class TestHelperfunctions(unittest.TestCase):
         with self.assertRaises(AttributeError):
             TextNode("This is a text node", TextType.INVALIDBS, None)
 
+    def test_link_type_url_rewriter(self):
+        node = TextNode("This is a text node", TextType.LINK, "/blog/tom")
+        html_node = text_node_to_html_node(node, UrlRewriter("/www/"))
+        self.assertEqual(html_node.props, {"href" : "/www/blog/tom"})
+
+    def test_image_type_url_rewriter(self):
+        node = TextNode("This is a text node", TextType.IMAGE, "/images/tom.png")
+        html_node = text_node_to_html_node(node, UrlRewriter("/www/"))
+        self.assertEqual(html_node.props, {"src" : "/www/images/tom.png", "alt" : "This is a text node"})
+
     def test_image_type_value_is_empty_string(self):
         node = TextNode("Alt text", TextType.IMAGE, "https://example.com/image.png")
         html_node = text_node_to_html_node(node)
@@ -458,6 +470,37 @@ class TestHelperfunctions(unittest.TestCase):
             new_nodes
         )
 
+    def test_delimiters_in_link_text_to_textnodes(self):
+        new_nodes = text_to_textnodes("[a **b** c](/u) and ![](/empty.png)")
+        self.assertListEqual(
+            [
+                TextNode("a ", TextType.LINK, "/u"),
+                TextNode("b", TextType.BOLD),
+                TextNode(" c", TextType.LINK, "/u"),
+                TextNode(" and ", TextType.NORMAL),
+            ],
+            new_nodes
+        )
+
+    def test_same_as_chained_text_to_textnodes(self):
+        random = Random(0)
+        pieces = ["a", " ", "*", "**", "_", "`", "!", "[", "]", "(", ")", "![x](y)", "[l](u)", "![a_b](c)", "[**x**](/u)", "[](e)"]
+        for _ in range(5000):
+            text = "".join(random.choice(pieces) for _ in range(random.randint(0, 16)))
+            self.assertListEqual(text_to_textnodes(text), text_to_textnodes_chained(text), text)
+        for _ in range(20000):
+            text = "".join(random.choice("ab!()[]_*`") for _ in range(random.randint(0, 16)))
+            self.assertListEqual(text_to_textnodes(text), text_to_textnodes_chained(text), text)
+
+    def test_image_wins_over_overlapping_link(self):
+        text = "[](![ax)b]()"
+        self.assertListEqual(text_to_textnodes(text), [TextNode("[](", TextType.NORMAL), TextNode("ax)b", TextType.IMAGE, "")])
+        self.assertListEqual(text_to_textnodes(text), text_to_textnodes_chained(text))
+
+    def test_adversarial_text_to_textnodes(self):
+        for text in ["_" * 5000, "[" * 5000, "![" * 2500, "[a](" * 1000, "a_b*c`" * 1000]:
+            self.assertListEqual(text_to_textnodes(text), text_to_textnodes_chained(text))
+
     """--------------------------------"""
     """markdown_to_blocks function test"""
     """--------------------------------"""
@@ -648,6 +691,56 @@ the **same** even with inline stuff
         md = "   #    Title With Extra Spaces    \nContent"
         result = extract_title(md)
         self.assertEqual(result, "Title With Extra Spaces")
+
+    def test_code_is_escaped(self):
+        self.assertEqual(markdown_to_html_node("use `a < b && c`\n\n```\n<p>\n```").to_html(),
+            "<div><p>use <code>a &lt; b &amp;&amp; c</code></p><pre><code>&lt;p&gt;\n</code></pre></div>")
+
+    def test_text_to_spans(self):
+        self.assertEqual(text_to_spans("a **b** [l _i_](/x) ![im](/i.png)"), [
+            (None, "a ", None), ("b", "b", None), (None, " ", None), ("a", "l ", "/x"), ("i", "i", None),
+            (None, " ", None), ("img", "im", "/i.png"),
+        ])
+
+    def test_span_to_html_node_same_as_text_node_to_html_node(self):
+        text = "a **b** _c_ `d` [l **x**](/x) ![im](/i.png)"
+        expected = [text_node_to_html_node(node).to_html() for node in text_to_textnodes(text)]
+        self.assertEqual([span_to_html_node(*span).to_html() for span in text_to_spans(text)], expected)
+        with self.assertRaises(ValueError):
+            span_to_html_node("a", "link", "")
+
+    def test_find_title_same_as_extract_title(self):
+        random = Random(0)
+        lines = ["# T", "#", "# ", "## S", "text", "", "  # In", " #x ", "#\tTab  ", "###", "\t"]
+        for _ in range(5000):
+            md = "\n".join(random.choice(lines) for _ in range(random.randint(1, 6)))
+            try:
+                expected = extract_title(md)
+            except Exception:
+                with self.assertRaises(Exception):
+                    find_title(md.splitlines(keepends=True))
+                continue
+            self.assertEqual(find_title(md.splitlines(keepends=True)), expected, md)
+
+    def test_markdown_urls_covers_parsed_urls(self):
+        random = Random(0)
+        pieces = ["[", "]", "(", ")", "!", "/a.png", " ", "\n", "x", "- "]
+        for _ in range(5000):
+            md = "".join(random.choice(pieces) for _ in range(random.randint(1, 16)))
+            urls = set(markdown_urls(md))
+            for text in (md, *md.split("\n")):
+                parsed = {url for tag, _, url in text_to_spans(text.strip().replace("\n", " ")) if url}
+                self.assertLessEqual(parsed, urls, md)
+
+    def test_url_inputs(self):
+        rewriter = UrlRewriter("/www/", {"/a.png": "/a.1.png"})
+        self.assertEqual(url_inputs(markdown_urls("![a](/a.png) [b](/b)"), rewriter), {"asset:/a.png": "/a.1.png", "asset:/b": None})
+        self.assertEqual(url_inputs(["/a.png"]), {})
+
+    def test_find_title_stops_at_title(self):
+        lines = iter(["intro\n", "# Title\n", "rest\n"])
+        self.assertEqual(find_title(lines), "Title")
+        self.assertEqual(list(lines), ["rest\n"])
         
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -44,5 +44,14 @@ class TestHTMLNode(unittest.TestCase):
         testString = "HTMLNode(<a>, None, ['this is a child', 'this is also a child'], None)"
         self.assertEqual(str(node), testString)
 
+    def test_slots(self):
+        node = HTMLNode("p", "value")
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.other = 1
+
+    def test_tag_is_interned(self):
+        self.assertIs(HTMLNode("".join(["h", "1"])).tag, HTMLNode("h1").tag)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
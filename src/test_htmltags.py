@@ -0,0 +1,36 @@
+import unittest
+from htmltags import *
+
+class TestHtmlTags(unittest.TestCase):
+
+    def test_escape_text(self):
+        self.assertEqual(escape_text("a < b && c > \"d\""), "a &lt; b &amp;&amp; c &gt; \"d\"")
+        text = "nothing to escape"
+        self.assertIs(escape_text(text), text)
+
+    def test_escape_attribute(self):
+        self.assertEqual(escape_attribute("say \"hi\" & <go>"), "say &quot;hi&quot; &amp; &lt;go&gt;")
+
+    def test_tag_tables(self):
+        self.assertEqual(OPEN_TAGS["p"], "<p>")
+        self.assertEqual(CLOSE_TAGS["p"], "</p>")
+        self.assertIs(OPEN_TAGS["p"], OPEN_TAGS["p"])
+
+    def test_render_props(self):
+        self.assertEqual(render_props(None), "")
+        self.assertEqual(render_props({}), "")
+        self.assertEqual(render_props({"src": "/a.png", "alt": "a"}), " src=\"/a.png\" alt=\"a\"")
+        self.assertEqual(render_props({"data": ["unhashable"]}), " data=\"['unhashable']\"")
+
+    def test_render_props_is_cached(self):
+        attributes_html.cache_clear()
+        render_props({"href": "/about"})
+        render_props({"href": "/about"})
+        self.assertEqual(attributes_html.cache_info().hits, 1)
+
+    def test_open_tag(self):
+        self.assertEqual(open_tag("a"), "<a>")
+        self.assertEqual(open_tag("a", {"href": "/x"}), "<a href=\"/x\">")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from io import StringIO
+from helperfunctions import markdown_to_html_node
+from htmlwriter import iter_html, write_html
+from leafnode import LeafNode
+from parentnode import ParentNode
+
+class TestHTMLWriter(unittest.TestCase):
+
+    def test_iter_html_leaf(self):
+        self.assertEqual("".join(iter_html(LeafNode("a", "link", {"href": "/x"}))), "<a href=\"/x\">link</a>")
+
+    def test_iter_html_nested(self):
+        node = ParentNode("div", [
+            ParentNode("p", [LeafNode(None, "text "), LeafNode("b", "bold")]),
+            ParentNode("ul", [ParentNode("li", [LeafNode(None, "one")]), ParentNode("li", [LeafNode(None, "two")])]),
+        ])
+        self.assertEqual("".join(iter_html(node)), "<div><p>text <b>bold</b></p><ul><li>one</li><li>two</li></ul></div>")
+
+    def test_iter_html_is_lazy(self):
+        chunks = iter_html(ParentNode("div", [LeafNode("b", "x")]))
+        self.assertEqual(next(chunks), "<div>")
+
+    def test_iter_html_matches_markdown(self):
+        md = "# Title\n\nSome **bold** and _italic_ [link](/x)\n\n- a\n- b\n\n1. one\n2. two\n\n> quote\n\n```\ncode\n```"
+        node = markdown_to_html_node(md)
+        self.assertEqual("".join(iter_html(node)), "<div><h1>Title</h1><p>Some <b>bold</b> and <i>italic</i> <a href=\"/x\">link</a></p><ul><li>a</li><li>b</li></ul><ol><li>one</li><li>two</li></ol><blockquote>quote</blockquote><pre><code>code\n</code></pre></div>")
+
+    def test_deep_tree_does_not_recurse(self):
+        node = LeafNode(None, "deep")
+        for _ in range(20000):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span><span>"))
+        self.assertEqual(len(html), 20000 * len("<span></span>") + len("deep"))
+
+    def test_invalid_nodes_raise(self):
+        with self.assertRaises(ValueError):
+            "".join(iter_html(ParentNode("div", [ParentNode(None, [LeafNode(None, "x")])])))
+        with self.assertRaises(ValueError):
+            "".join(iter_html(ParentNode("div", [ParentNode("p", [])])))
+        with self.assertRaises(ValueError):
+            "".join(iter_html(ParentNode("div", [LeafNode("p", None)])))
+
+    def test_write_html(self):
+        node = ParentNode("ul", [ParentNode("li", [LeafNode(None, str(i))]) for i in range(100)])
+        file = StringIO()
+        write_html(node, file, buffer_size=16)
+        self.assertEqual(file.getvalue(), node.to_html())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import struct
+import tempfile
+import unittest
+from imageheaders import *
+from testfiles import write_file
+from urlrewriter import UrlRewriter
+
+PNG = PNG_SIGNATURE + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", 640, 480) + b"\x08\x06\x00\x00\x00" + b"\x00" * 64
+GIF = b"GIF89a" + struct.pack("<HH", 32, 16) + b"\x00" * 64
+WEBP_VP8 = b"RIFF\x00\x00\x00\x00WEBPVP8 \x00\x00\x00\x00" + b"\x00\x00\x00\x9d\x01\x2a" + struct.pack("<HH", 400, 300) + b"\x00" * 16
+WEBP_VP8L = b"RIFF\x00\x00\x00\x00WEBPVP8L\x00\x00\x00\x00\x2f" + ((200 - 1) | (100 - 1) << 14).to_bytes(4, "little") + b"\x00" * 16
+WEBP_VP8X = b"RIFF\x00\x00\x00\x00WEBPVP8X\x0a\x00\x00\x00" + b"\x00" * 4 + (1920 - 1).to_bytes(3, "little") + (1080 - 1).to_bytes(3, "little") + b"\x00" * 16
+JPEG = (JPEG_SOI + b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+        + b"\xff\xdb" + struct.pack(">H", 4) + b"\x00\x00"
+        + b"\xff\xc2" + struct.pack(">HBHH", 17, 8, 720, 1280) + b"\x00" * 12 + b"\xff\xd9")
+
+class TestImageHeaders(unittest.TestCase):
+
+    def test_image_size(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            images = {"a.png": PNG, "a.gif": GIF, "a.webp": WEBP_VP8, "b.webp": WEBP_VP8L, "c.webp": WEBP_VP8X, "a.jpg": JPEG}
+            sizes = {name: image_size(write_file(os.path.join(tmp_dir, name), data)) for name, data in images.items()}
+            self.assertEqual(sizes, {"a.png": (640, 480), "a.gif": (32, 16), "a.webp": (400, 300), "b.webp": (200, 100), "c.webp": (1920, 1080), "a.jpg": (1280, 720)})
+
+    def test_unknown_or_broken_images(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.assertIsNone(image_size(write_file(os.path.join(tmp_dir, "a.png"), b"not an image" * 10)))
+            self.assertIsNone(image_size(write_file(os.path.join(tmp_dir, "b.png"), PNG[:20])))
+            self.assertIsNone(image_size(write_file(os.path.join(tmp_dir, "a.jpg"), JPEG_SOI + b"\xff\xda" + b"\x00" * 40)))
+
+    def test_index_images(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_file(os.path.join(tmp_dir, "images", "a.png"), PNG)
+            write_file(os.path.join(tmp_dir, "index.css"), b"body {}")
+            static_files = {rel_path: os.stat(os.path.join(tmp_dir, rel_path)) for rel_path in (os.path.join("images", "a.png"), "index.css")}
+
+            index = index_images(tmp_dir, static_files)
+            self.assertEqual(list(index), [os.path.join("images", "a.png")])
+            self.assertEqual((index[os.path.join("images", "a.png")]["width"], index[os.path.join("images", "a.png")]["height"]), (640, 480))
+            self.assertEqual(image_dimensions(index, UrlRewriter("/www/")), {"/www/images/a.png": (640, 480)})
+
+    def test_unchanged_images_are_not_read(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_file(os.path.join(tmp_dir, "a.png"), PNG)
+            static_files = {"a.png": os.stat(os.path.join(tmp_dir, "a.png"))}
+            index_path = os.path.join(tmp_dir, ".cache", "image-index.json")
+            save_image_index(index_path, index_images(tmp_dir, static_files))
+            old_index = load_image_index(index_path)
+            old_index["a.png"]["width"] = 1
+
+            self.assertEqual(index_images(tmp_dir, static_files, old_index)["a.png"]["width"], 1)
+            os.utime(os.path.join(tmp_dir, "a.png"), ns=(0, 0))
+            static_files = {"a.png": os.stat(os.path.join(tmp_dir, "a.png"))}
+            self.assertEqual(index_images(tmp_dir, static_files, old_index)["a.png"]["width"], 640)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -14,6 +14,10 @@ class TestLeafNode(unittest.TestCase):
         node = LeafNode("a", "Hello, world!", {"href": "https://github.com/PaulSteindl"})
         self.assertEqual(node.to_html(), "<a href=\"https://github.com/PaulSteindl\">Hello, world!</a>")
 
+    def test_img_props_are_escaped(self):
+        node = LeafNode("img", "", {"src": "/a.png?x=1&y=2", "alt": "say \"hi\" <now>"})
+        self.assertEqual(node.to_html(), "<img src=\"/a.png?x=1&amp;y=2\" alt=\"say &quot;hi&quot; &lt;now&gt;\"></img>")
+
     def test_none_tag_to_html(self):
         node = LeafNode(None, "Hello, world!")
         self.assertEqual(node.to_html(), "Hello, world!")
@@ -0,0 +1,148 @@
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from changes import CHANGES_NAME
+from fingerprint import fingerprint_path
+from manifest import HASH_CACHE_PATH, MANIFEST_NAME, load_json_state, save_json_state
+from main import build, parse_args
+from shard import SHARD_MANIFEST_NAME
+from testfiles import write_file
+
+class TestMain(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp_dir.name)
+        write_file("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        write_file(os.path.join("content", "index.md"), "# Home")
+        write_file(os.path.join("content", "blog", "post.md"), "# Post\n\nText")
+        write_file(os.path.join("content", "blog", "old", "gone.md"), "# Gone")
+        write_file(os.path.join("static", "index.css"), "body {}")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp_dir.cleanup()
+
+    def build(self, *argv):
+        log = StringIO()
+        with redirect_stdout(log):
+            build(parse_args(["/", "--out", "docs", *argv]))
+        return log.getvalue()
+
+    def read(self, rel_path):
+        with open(os.path.join("docs", rel_path)) as file:
+            return file.read()
+
+    def manifest_pages(self):
+        with open(os.path.join("docs", MANIFEST_NAME)) as file:
+            return json.load(file)["pages"]
+
+    def generated(self, log):
+        return [line.split()[3] for line in log.splitlines() if line.startswith("Generating page from ")]
+
+    def test_parse_args_flag_rules(self):
+        args = parse_args(["--explain"])
+        self.assertTrue(args.incremental)
+        for argv in (["--shard", "1/2", "--incremental"], ["--merge", "s1", "--write-if-changed"], ["--shard", "1/2", "--merge", "s1"]):
+            with redirect_stderr(StringIO()):
+                with self.assertRaises(SystemExit):
+                    parse_args(argv)
+
+    def test_full_build(self):
+        self.build()
+        self.assertEqual(self.read("index.html"), "<title>Home</title><div><h1>Home</h1></div>")
+        self.assertEqual(self.read("index.css"), "body {}")
+        self.assertFalse(os.path.exists(os.path.join("docs", MANIFEST_NAME)))
+
+    def test_incremental_no_op(self):
+        self.build("--incremental")
+        self.assertEqual(sorted(self.manifest_pages()), [os.path.join("blog", "old", "gone.html"), os.path.join("blog", "post.html"), "index.html"])
+        log = self.build("--incremental")
+        self.assertEqual(self.generated(log), [])
+        self.assertIn("0 of 3 pages rebuilt, 0 removed", log)
+        self.assertEqual(self.read(os.path.join("blog", "post.html")), "<title>Post</title><div><h1>Post</h1><p>Text</p></div>")
+
+    def test_incremental_edited_page(self):
+        self.build("--incremental")
+        write_file(os.path.join("content", "blog", "post.md"), "# Post\n\nNew text")
+        log = self.build("--explain")
+        self.assertEqual(self.generated(log), [os.path.join("./content/", "blog", "post.md")])
+        self.assertIn(f"Rebuilding {os.path.join('blog', 'post.html')}: source:{os.path.join('blog', 'post.md')} changed", log)
+        self.assertEqual(self.read(os.path.join("blog", "post.html")), "<title>Post</title><div><h1>Post</h1><p>New text</p></div>")
+        self.assertEqual(self.build("--incremental").count("Generating page"), 0)
+
+    def test_incremental_deleted_page(self):
+        self.build("--incremental")
+        os.remove(os.path.join("content", "blog", "old", "gone.md"))
+        os.rmdir(os.path.join("content", "blog", "old"))
+        log = self.build("--incremental")
+        self.assertIn("0 of 2 pages rebuilt, 1 removed", log)
+        self.assertFalse(os.path.exists(os.path.join("docs", "blog", "old")))
+        self.assertTrue(os.path.exists(os.path.join("docs", "blog", "post.html")))
+        self.assertNotIn(os.path.join("blog", "old", "gone.html"), self.manifest_pages())
+
+    def test_incremental_edited_template(self):
+        self.build("--incremental")
+        write_file("template.html", "<h>{{ Title }}</h>{{ Content }}")
+        log = self.build("--incremental")
+        self.assertEqual(len(self.generated(log)), 3)
+        self.assertEqual(self.read("index.html"), "<h>Home</h><div><h1>Home</h1></div>")
+
+    def test_incremental_missing_output(self):
+        self.build("--incremental")
+        os.remove(os.path.join("docs", "index.html"))
+        log = self.build("--explain")
+        self.assertEqual(self.generated(log), [os.path.join("./content/", "index.md")])
+        self.assertIn("Rebuilding index.html: output missing", log)
+        self.assertTrue(os.path.exists(os.path.join("docs", "index.html")))
+
+    def test_fingerprint_reuses_static_hashes(self):
+        self.build("--incremental", "--fingerprint")
+        source = os.path.join(".", "static", "index.css")
+        hashes = load_json_state(HASH_CACHE_PATH)
+        self.assertTrue(os.path.exists(os.path.join("docs", fingerprint_path("index.css", hashes[source]["hash"]))))
+
+        hashes[source]["hash"] = "0123456789recorded"
+        save_json_state(HASH_CACHE_PATH, hashes)
+        self.build("--incremental", "--fingerprint", "--link-static")
+        self.assertTrue(os.path.exists(os.path.join("docs", "index.0123456789.css")))
+
+    def test_failed_merge_leaves_out_untouched(self):
+        self.build()
+        self.build("--shard", "1/3", "--out", "s1")
+        self.build("--shard", "2/3", "--out", "s2")
+        before = sorted(os.listdir("docs"))
+        with self.assertRaises(Exception) as context:
+            self.build("--merge", "s1", "s2")
+        self.assertIn("missing shards 3/3", str(context.exception))
+        self.assertEqual(sorted(os.listdir("docs")), before)
+        self.assertEqual(self.read("index.html"), "<title>Home</title><div><h1>Home</h1></div>")
+
+        with self.assertRaises(Exception):
+            self.build("--merge", "s1", "s2", "--out", "s1")
+        self.assertTrue(os.path.exists(os.path.join("s1", SHARD_MANIFEST_NAME)))
+
+    def test_merge(self):
+        for index in (1, 2):
+            self.build("--shard", f"{index}/2", "--out", f"s{index}")
+        log = self.build("--merge", "s1", "s2")
+        self.assertIn("Merged 3 pages from 2 shards into docs", log)
+        self.assertEqual(self.read(os.path.join("blog", "post.html")), "<title>Post</title><div><h1>Post</h1><p>Text</p></div>")
+        self.assertEqual(self.read("index.css"), "body {}")
+
+    def test_write_if_changed_renders_every_page(self):
+        self.build("--incremental")
+        write_file(os.path.join("content", "index.md"), "# Welcome")
+        log = self.build("--write-if-changed")
+        self.assertEqual(len(self.generated(log)), 3)
+        with open(os.path.join("docs", CHANGES_NAME)) as file:
+            changes = json.load(file)
+        self.assertEqual(changes["modified"], ["index.html"])
+        self.assertEqual(changes["added"] + changes["deleted"], [])
+
+if __name__ == "__main__":
+    unittest.main()
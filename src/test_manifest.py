@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from manifest import *
+
+class TestManifest(unittest.TestCase):
+
+    def test_hash_file_matches_hash_bytes(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "index.md")
+            with open(path, "wb") as file:
+                file.write(b"# Title")
+            self.assertEqual(hash_file(path), hash_bytes(b"# Title"))
+
+    def test_json_state(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, ".cache", "state.json")
+            self.assertEqual(load_json_state(path), {})
+            self.assertEqual(save_json_state(path, ["a", "b"]), path)
+            self.assertEqual(load_json_state(path, list), ["a", "b"])
+            self.assertEqual(load_json_state(path), {})
+            self.assertEqual(os.listdir(os.path.dirname(path)), ["state.json"])
+
+    def test_load_missing_manifest(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.assertEqual(load_manifest(os.path.join(tmp_dir, MANIFEST_NAME)), {"pages": {}, "files": {}})
+
+    def test_load_broken_manifest(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, MANIFEST_NAME)
+            with open(path, "w") as file:
+                file.write("{not json")
+            self.assertEqual(load_manifest(path), {"pages": {}, "files": {}})
+
+    def test_load_manifest_without_files(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, MANIFEST_NAME)
+            save_manifest(path, {"pages": {"index.html": {}}})
+            self.assertEqual(load_manifest(path), {"pages": {"index.html": {}}, "files": {}})
+
+    def test_save_and_load_manifest(self):
+        manifest = {"pages": {"index.html": {"source:index.md": "a"}}, "files": {}}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, MANIFEST_NAME)
+            save_manifest(path, manifest)
+            self.assertEqual(load_manifest(path), manifest)
+            self.assertFalse(os.path.exists(path + ".tmp"))
+
+    def test_hash_file_cached(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "index.md")
+            with open(path, "wb") as file:
+                file.write(b"# Title")
+            files = {}
+            self.assertEqual(hash_file_cached(path, os.stat(path), {}, files), hash_bytes(b"# Title"))
+            self.assertEqual(files[path]["size"], 7)
+
+    def test_hash_file_cached_reuses_record(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "index.md")
+            with open(path, "wb") as file:
+                file.write(b"# Title")
+            stat = os.stat(path)
+            old_files = {path: {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": "recorded"}}
+            self.assertEqual(hash_file_cached(path, stat, old_files, {}), "recorded")
+            old_files[path]["mtime_ns"] += 1
+            self.assertEqual(hash_file_cached(path, stat, old_files, {}), hash_bytes(b"# Title"))
+
+    def test_cached_hasher(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "a.png")
+            with open(path, "wb") as file:
+                file.write(b"png")
+            stat = os.stat(path)
+            old_files = {path: {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": "recorded"}}
+            files = {}
+            self.assertEqual(cached_hasher(old_files, files, {path: stat})(path), "recorded")
+            self.assertEqual(files[path]["hash"], "recorded")
+            self.assertEqual(cached_hasher({}, {})(path), hash_bytes(b"png"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+from buildplan import make_plan
+from metaindex import *
+
+POSTS = {
+    "index.md": "# Home\n\ntext",
+    "blog/old.md": "---\ntitle: Old\ndate: 2023-05-01\ntags: [python]\n---\nbody",
+    "blog/new.md": "---\ntitle: New\ndate: 2024-01-02\ntags: [python, web]\n---\nbody",
+    "blog/draft.md": "---\ntitle: Draft\ndate: 2024-02-01\ntags: [web]\ndraft: true\n---\nbody",
+}
+
+class TestMetadataIndex(unittest.TestCase):
+
+    def make_site(self, tmp_dir):
+        content_dir = os.path.join(tmp_dir, "content")
+        for rel_path, markdown in POSTS.items():
+            path = os.path.join(content_dir, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as file:
+                file.write(markdown)
+        return make_plan(content_dir, None, os.path.join(tmp_dir, "docs"))
+
+    def test_read_page_metadata(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "index.md")
+            with open(path, "w") as file:
+                file.write("intro\n# Heading\n")
+            self.assertEqual(read_page_metadata(path), {"title": "Heading", "date": None, "tags": [], "draft": False})
+            with open(path, "w") as file:
+                file.write("no heading")
+            self.assertIsNone(read_page_metadata(path)["title"])
+            with open(path, "w") as file:
+                file.write("---\ntitle:\ndraft:\n---\n# Heading\n")
+            self.assertEqual(read_page_metadata(path), {"title": "Heading", "date": None, "tags": [], "draft": False})
+
+    def test_index_and_listings(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            plan = self.make_site(tmp_dir)
+            index = index_metadata(plan.pages, os.path.join(tmp_dir, "docs"))
+            self.assertEqual(index[os.path.join("blog", "new.md")]["path"], os.path.join("blog", "new.html"))
+            self.assertEqual(drafts(index), {os.path.join("blog", "draft.md")})
+            self.assertEqual([record["metadata"]["title"] for _, record in listing(index)], ["New", "Old", "Home"])
+            self.assertEqual({tag: [rel_path for rel_path, _ in pages] for tag, pages in tag_listings(index).items()},
+                {"python": [os.path.join("blog", "new.md"), os.path.join("blog", "old.md")], "web": [os.path.join("blog", "new.md")]})
+            self.assertEqual(list(archive(index)), ["2024", "2023"])
+
+    def test_unchanged_pages_are_not_read(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            plan = self.make_site(tmp_dir)
+            index_path = os.path.join(tmp_dir, ".cache", "metadata-index.json")
+            save_metadata_index(index_path, index_metadata(plan.pages, tmp_dir))
+            old_index = load_metadata_index(index_path)
+            old_index["index.md"]["metadata"]["title"] = "Cached"
+
+            index = index_metadata(plan.pages, tmp_dir, old_index)
+            self.assertEqual(index["index.md"]["metadata"]["title"], "Cached")
+
+    def test_load_missing_index(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.assertEqual(load_metadata_index(os.path.join(tmp_dir, ".cache", "metadata-index.json")), {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import io
+import unittest
+from random import Random
+from minify import *
+
+TEMPLATE = """<!doctype html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+
+  <body>
+    <!-- page -->
+    <article>{{ Content }}</article>
+  </body>
+</html>"""
+
+class TestMinify(unittest.TestCase):
+
+    def test_template(self):
+        self.assertEqual(
+            minify_html(TEMPLATE),
+            "<!doctype html><html><head><meta charset=utf-8 /><title>{{ Title }}</title><link href=/index.css rel=stylesheet /></head><body><article>{{ Content }}</article></body></html>"
+        )
+
+    def test_collapses_text_whitespace(self):
+        self.assertEqual(minify_html("<p>\n  Some   <b>bold</b>\n text  \n</p>"), "<p>Some <b>bold</b> text</p>")
+
+    def test_keeps_space_between_inline_tags(self):
+        self.assertEqual(minify_html("<p><b>a</b>  \n <i>b</i></p>"), "<p><b>a</b> <i>b</i></p>")
+
+    def test_pre_and_code_unchanged(self):
+        html = "<pre><code>def f():\n    return  1\n</code></pre>\n<p>a <code>x  =  1</code></p>"
+        self.assertEqual(minify_html(html), "<pre><code>def f():\n    return  1\n</code></pre><p>a <code>x  =  1</code></p>")
+
+    def test_quotes(self):
+        self.assertEqual(minify_html('<img src="/a.png" alt="two words">'), '<img src=/a.png alt="two words">')
+        self.assertEqual(minify_html('<img src="a.png"/>'), '<img src="a.png"/>')
+        self.assertEqual(minify_html('<a href="" title=\'a="b"\'>x</a>'), '<a href="" title=\'a="b"\'>x</a>')
+
+    def test_comments(self):
+        self.assertEqual(minify_html("<p>a<!-- note --></p>"), "<p>a</p>")
+        self.assertEqual(minify_html("<!--[if IE]><p>x</p><![endif]-->"), "<!--[if IE]><p>x</p><![endif]-->")
+
+    def test_lone_less_than_is_text(self):
+        self.assertEqual(minify_html("<p><a href=\"/\">< Back  Home</a></p>"), "<p><a href=/>< Back Home</a></p>")
+
+    def test_chunked_feed_matches_whole(self):
+        html = TEMPLATE.replace("{{ Content }}", "<p>a  <b>b</b></p>\n<pre>x\n  y</pre>\n<p>< c</p>")
+        expected = minify_html(html)
+        for size in (1, 2, 3, 7, 64):
+            minifier = HtmlMinifier()
+            chunks = [minifier.feed(html[i:i + size]) for i in range(0, len(html), size)]
+            self.assertEqual("".join(chunks) + minifier.close(), expected)
+
+    def test_split_before_tag_name(self):
+        minifier = HtmlMinifier()
+        self.assertEqual(minifier.feed("<div><p>q </") + minifier.feed("p></div>") + minifier.close(), minify_html("<div><p>q </p></div>"))
+
+    def test_random_chunks_match_whole(self):
+        random = Random(0)
+        pieces = ["<p>", "</p>", "<b>", "</b>", "<div>", "</div>", "<pre>", "</pre>", "<code>", "</code>", "<!-- c -->",
+                  "<a href=\"/x\">", "</a>", "<br/>", "<", "</", ">", "x", "y z", " ", "  ", "\n", "<!doctype html>"]
+        for _ in range(3000):
+            html = "".join(random.choice(pieces) for _ in range(random.randint(1, 12)))
+            cuts = sorted(random.sample(range(1, len(html) + 1), min(len(html), random.randint(1, 4))))
+            minifier = HtmlMinifier()
+            chunks = [minifier.feed(html[start:end]) for start, end in zip([0, *cuts], [*cuts, len(html)])]
+            self.assertEqual("".join(chunks) + minifier.close(), minify_html(html), repr((html, cuts)))
+
+    def test_minifying_file(self):
+        output = io.StringIO()
+        minifying_file = MinifyingFile(output)
+        minifying_file.write("<p>a \n")
+        minifying_file.writelines(["  b</p>", "\n"])
+        minifying_file.close()
+        self.assertEqual(output.getvalue(), "<p>a b</p>")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+from pagetemplate import *
+from urlrewriter import UrlRewriter
+
+class TestPageTemplate(unittest.TestCase):
+
+    def test_split_segments(self):
+        self.assertEqual(
+            split_segments("<title>{{ Title }}</title><body>{{ Content }}</body>"),
+            ["<title>", "{{ Title }}", "</title><body>", "{{ Content }}", "</body>"]
+        )
+
+    def test_split_segments_adjacent_and_repeated_slots(self):
+        self.assertEqual(
+            split_segments("{{ Title }}{{ Content }}<h1>{{ Title }}</h1>"),
+            ["{{ Title }}", "{{ Content }}", "<h1>", "{{ Title }}", "</h1>"]
+        )
+
+    def test_split_segments_without_slots(self):
+        self.assertEqual(split_segments("<html></html>"), ["<html></html>"])
+
+    def test_segments(self):
+        template = CompiledTemplate("<title>{{ Title }}</title>{{ Content }}")
+        self.assertEqual(template.segments, ["<title>", TITLE_SLOT, "</title>", CONTENT_SLOT])
+
+    def test_base_path_applied_at_compile_time(self):
+        template = CompiledTemplate("<link href=\"/index.css\"><img src=\"/a.png\">{{ Content }}", UrlRewriter("/www/"))
+        self.assertEqual(template.segments, ["<link href=\"/www/index.css\"><img src=\"/www/a.png\">", CONTENT_SLOT])
+
+    def test_load_template_is_cached(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "template.html")
+            with open(path, "w") as file:
+                file.write("{{ Content }}")
+            self.assertIs(load_template(path), load_template(path))
+            self.assertIsNot(load_template(path), load_template(path, UrlRewriter("/www/")))
+
+    def test_load_missing_template(self):
+        with self.assertRaises(Exception):
+            load_template("/does/not/exist.html")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from blockcache import BlockCache
+from parallel import chunk_size, generate_pages_parallel
+
+class TestParallel(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.template_path = os.path.join(self.tmp_dir.name, "template.html")
+        with open(self.template_path, "w") as file:
+            file.write("<h>{{ Title }}</h>{{ Content }}")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_pages(self, texts):
+        pages = []
+        for i, text in enumerate(texts):
+            from_path = os.path.join(self.tmp_dir.name, f"page{i}.md")
+            with open(from_path, "w") as file:
+                file.write(text)
+            dest_dir = os.path.join(self.tmp_dir.name, "out", f"page{i}")
+            os.makedirs(dest_dir)
+            pages.append((from_path, os.path.join(dest_dir, "index.html")))
+        return pages
+
+    def test_chunk_size(self):
+        self.assertEqual(chunk_size(1, 4), 1)
+        self.assertEqual(chunk_size(1000, 4), 62)
+
+    def test_generate_pages_parallel(self):
+        pages = self.write_pages([f"# Page {i}" for i in range(6)])
+        log = StringIO()
+        with redirect_stdout(log):
+            generate_pages_parallel("/", pages, self.template_path, 3)
+
+        for i, (from_path, dest_path) in enumerate(pages):
+            with open(dest_path) as file:
+                self.assertEqual(file.read(), f"<h>Page {i}</h><div><h1>Page {i}</h1></div>")
+        self.assertEqual(log.getvalue().splitlines(), [f"Generating page from {f} to {d} using {self.template_path}" for f, d in pages])
+
+    def test_generate_pages_parallel_reports_errors_in_order(self):
+        pages = self.write_pages(["# Fine", "no title", "# Fine", "still no title"])
+        with redirect_stdout(StringIO()):
+            with self.assertRaises(Exception) as context:
+                generate_pages_parallel("/", pages, self.template_path, 2)
+
+        message = str(context.exception)
+        self.assertTrue(message.startswith("2 of 4 pages failed to generate"))
+        self.assertLess(message.index(pages[1][0]), message.index(pages[3][0]))
+        self.assertTrue(os.path.exists(pages[2][1]))
+
+    def test_block_cache_evicted_after_workers(self):
+        pages = self.write_pages([f"# Page {i}\n\nText {i}" for i in range(6)])
+        path = os.path.join(self.tmp_dir.name, "blocks.sqlite")
+        block_cache = BlockCache(path, max_bytes=0)
+        with redirect_stdout(StringIO()):
+            generate_pages_parallel("/", pages, self.template_path, 3, block_cache)
+        self.assertEqual(block_cache.misses, 12)
+        block_cache.close()
+
+        connection = sqlite3.connect(path)
+        self.assertEqual(connection.execute("SELECT COUNT(*) FROM blocks").fetchone()[0], 0)
+        connection.close()
+
+if __name__ == "__main__":
+    unittest.main()
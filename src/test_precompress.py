@@ -0,0 +1,76 @@
+import gzip
+import os
+import tempfile
+import unittest
+from precompress import *
+from testfiles import write_file
+
+HTML = b"<html><body>" + b"<p>repetitive text</p>" * 100 + b"</body></html>"
+
+class TestPrecompress(unittest.TestCase):
+
+    def test_is_compressible(self):
+        self.assertTrue(is_compressible("index.html"))
+        self.assertTrue(is_compressible("blog/index.css"))
+        self.assertTrue(is_compressible("images/logo.svg"))
+        self.assertFalse(is_compressible("images/tom.png"))
+        self.assertFalse(is_compressible(".build-manifest.json"))
+        self.assertFalse(is_compressible("changes.json"))
+
+    def test_gzip_is_deterministic(self):
+        self.assertEqual(gzip_bytes(HTML), gzip_bytes(HTML))
+
+    def test_compress_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "index.html")
+            write_file(path, HTML)
+            self.assertEqual(compress_file(path, [(".gz", gzip_bytes)]), [".gz"])
+            with open(path + ".gz", "rb") as file:
+                self.assertEqual(gzip.decompress(file.read()), HTML)
+            self.assertEqual(os.stat(path + ".gz").st_mtime_ns, os.stat(path).st_mtime_ns)
+
+    def test_skips_files_that_do_not_shrink(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "tiny.css")
+            write_file(path, b"a{}")
+            self.assertEqual(compress_file(path, [(".gz", gzip_bytes)]), [])
+            self.assertFalse(os.path.exists(path + ".gz"))
+
+    def test_precompress_dir(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            write_file(os.path.join(tmp_dir, "index.html"), HTML)
+            write_file(os.path.join(tmp_dir, "blog", "index.html"), HTML)
+            write_file(os.path.join(tmp_dir, "images", "tom.png"), HTML)
+
+            result = precompress_dir(tmp_dir)
+            self.assertEqual(sorted(result["compressed"]), [os.path.join("blog", "index.html"), "index.html"])
+            self.assertTrue(os.path.exists(os.path.join(tmp_dir, "blog", "index.html.gz")))
+            self.assertFalse(os.path.exists(os.path.join(tmp_dir, "images", "tom.png.gz")))
+
+            result = precompress_dir(tmp_dir)
+            self.assertEqual(result["compressed"], [])
+            self.assertEqual(len(result["unchanged"]), 2)
+
+    def test_recompresses_changed_files(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "index.html")
+            write_file(path, HTML)
+            precompress_dir(tmp_dir)
+            write_file(path, HTML + b"<p>more</p>")
+
+            self.assertEqual(precompress_dir(tmp_dir)["compressed"], ["index.html"])
+            with open(path + ".gz", "rb") as file:
+                self.assertEqual(gzip.decompress(file.read()), HTML + b"<p>more</p>")
+
+    def test_removes_siblings_of_deleted_files(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "blog", "index.html")
+            write_file(path, HTML)
+            precompress_dir(tmp_dir)
+            os.remove(path)
+
+            self.assertEqual(precompress_dir(tmp_dir)["removed"], [os.path.join("blog", "index.html")])
+            self.assertFalse(os.path.exists(os.path.join(tmp_dir, "blog")))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import json
+import os
+import tempfile
+import unittest
+import profiler
+from profiler import *
+
+class TestProfiler(unittest.TestCase):
+
+    def tearDown(self):
+        enable_profile(None)
+
+    def test_phase_without_profile_is_noop(self):
+        enable_profile(None)
+        with phase("read"):
+            pass
+        self.assertIsNone(active_profile())
+
+    def test_phase_records_time_and_calls(self):
+        profile = BuildProfile()
+        enable_profile(profile)
+        with phase("read"):
+            pass
+        with phase("read"):
+            pass
+        self.assertEqual(profile.phases["read"]["calls"], 2)
+        self.assertGreaterEqual(profile.phases["read"]["wall"], 0)
+
+    def test_phase_records_on_exception(self):
+        profile = BuildProfile()
+        enable_profile(profile)
+        with self.assertRaises(ValueError):
+            with phase("write"):
+                raise ValueError("boom")
+        self.assertEqual(profile.phases["write"]["calls"], 1)
+
+    def test_merge_phases(self):
+        profile = BuildProfile()
+        profile.add_phase("to_html", 1.0, 0.5)
+        profile.merge_phases({"to_html": {"wall": 2.0, "cpu": 1.0, "calls": 3}})
+        self.assertEqual(profile.phases["to_html"], {"wall": 3.0, "cpu": 1.5, "calls": 4})
+
+    def test_report_slowest_pages_and_phase_order(self):
+        profile = BuildProfile()
+        profile.add_phase("write", 1, 1)
+        profile.add_phase("read", 1, 1)
+        for i, wall in enumerate([0.1, 0.5, 0.3]):
+            profile.add_page(f"page{i}.md", wall)
+        report = profile.report(top=2)
+        self.assertEqual(list(report["phases"]), ["read", "write"])
+        self.assertEqual(report["page_count"], 3)
+        self.assertEqual([page["page"] for page in report["slowest_pages"]], ["page1.md", "page2.md"])
+
+    def test_write_report(self):
+        profile = BuildProfile()
+        profile.add_page("index.md", 0.1)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "profile.json")
+            profile.write_report(path)
+            with open(path) as file:
+                self.assertEqual(json.load(file)["slowest_pages"], [{"page": "index.md", "wall": 0.1}])
+
+    def test_format_report(self):
+        profile = BuildProfile()
+        profile.add_phase("read", 0.5, 0.25)
+        profile.add_page("index.md", 0.1)
+        text = format_report(profile.report())
+        self.assertIn("read", text)
+        self.assertIn("index.md", text)
+
+if __name__ == "__main__":
+    unittest.main()
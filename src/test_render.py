@@ -0,0 +1,112 @@
+import os
+import tempfile
+import unittest
+from pagetemplate import CompiledTemplate
+from render import write_page, write_page_file, write_page_stream
+from transform import make_pipeline
+from urlrewriter import UrlRewriter
+
+TEMPLATE = "<title>{{ Title }}</title><link href=\"/index.css\"><article>{{ Content }}</article>"
+
+def render_page(markdown, template):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dest_path = os.path.join(tmp_dir, "index.html")
+        write_page(dest_path, markdown, template)
+        with open(dest_path) as file:
+            return file.read()
+
+class TestRender(unittest.TestCase):
+
+    def test_write_page(self):
+        html = render_page("# Hello\n\nSome **text**", CompiledTemplate(TEMPLATE))
+        self.assertEqual(html, "<title>Hello</title><link href=\"/index.css\"><article><div><h1>Hello</h1><p>Some <b>text</b></p></div></article>")
+
+    def test_write_page_base_path(self):
+        html = render_page("# Hello\n\n![img](/images/a.png)", CompiledTemplate(TEMPLATE, UrlRewriter("/www/")))
+        self.assertEqual(html, "<title>Hello</title><link href=\"/www/index.css\"><article><div><h1>Hello</h1><p><img src=\"/www/images/a.png\" alt=\"img\"></img></p></div></article>")
+
+    def test_write_page_base_path_leaves_code_alone(self):
+        html = render_page("# Hello\n\n`<a href=\"/x\">`", CompiledTemplate(TEMPLATE, UrlRewriter("/www/")))
+        self.assertIn("<code>&lt;a href=\"/x\"&gt;</code>", html)
+
+    def test_write_page_front_matter(self):
+        html = render_page("---\ntitle: From front matter\ntags: [a]\n---\n# Hello\n\ntext", CompiledTemplate(TEMPLATE))
+        self.assertEqual(html, "<title>From front matter</title><link href=\"/index.css\"><article><div><h1>Hello</h1><p>text</p></div></article>")
+        html = render_page("---\ndraft: false\n---\n# Hello", CompiledTemplate(TEMPLATE))
+        self.assertEqual(html, "<title>Hello</title><link href=\"/index.css\"><article><div><h1>Hello</h1></div></article>")
+
+    def test_write_page_minify(self):
+        markdown = "# Hello\n\nSome   text with a [link](/about)\n\n```\nkeep   this\n```"
+        template = CompiledTemplate("<title>{{ Title }}</title>\n  <link href=\"/index.css\">\n<article>{{ Content }}</article>", minify=True)
+        self.assertEqual(render_page(markdown, template), "<title>Hello</title><link href=/index.css><article><div><h1>Hello</h1><p>Some text with a <a href=/about>link</a></p><pre><code>keep   this\n</code></pre></div></article>")
+
+    def test_write_page_stream_same_as_write_page(self):
+        markdown = "# Hello\n\nSome **text** and [a link](/about)\n\n```\ncode\n\nwith a blank line\n```\n\n- a\n- b\n\n## Hello\n"
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source_path = os.path.join(tmp_dir, "index.md")
+            with open(source_path, "w") as file:
+                file.write(markdown)
+
+            for template in (CompiledTemplate(TEMPLATE, UrlRewriter("/www/")), CompiledTemplate(TEMPLATE, minify=True), CompiledTemplate(TEMPLATE, transforms=make_pipeline(["heading-anchors"]))):
+                write_page(os.path.join(tmp_dir, "page.html"), markdown, template)
+                write_page_stream(os.path.join(tmp_dir, "stream.html"), source_path, template)
+                with open(os.path.join(tmp_dir, "page.html")) as page, open(os.path.join(tmp_dir, "stream.html")) as stream:
+                    self.assertEqual(stream.read(), page.read())
+
+    def test_fenced_text_is_body(self):
+        html = render_page("---\nSome intro text\n---\n\n# Title", CompiledTemplate(TEMPLATE))
+        self.assertEqual(html, "<title>Title</title><link href=\"/index.css\"><article><div><p>--- Some intro text ---</p><h1>Title</h1></div></article>")
+
+    def test_write_page_stream_front_matter(self):
+        markdown = "---\ntitle: Front\n---\n# Hello\n\ntext\n"
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source_path = os.path.join(tmp_dir, "index.md")
+            with open(source_path, "w") as file:
+                file.write(markdown)
+
+            write_page(os.path.join(tmp_dir, "page.html"), markdown, CompiledTemplate(TEMPLATE))
+            write_page_stream(os.path.join(tmp_dir, "stream.html"), source_path, CompiledTemplate(TEMPLATE))
+            with open(os.path.join(tmp_dir, "page.html")) as page, open(os.path.join(tmp_dir, "stream.html")) as stream:
+                self.assertEqual(stream.read(), page.read())
+
+    def test_empty_front_matter_title(self):
+        markdown = "---\ntitle:\n---\n# Real\n"
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source_path = os.path.join(tmp_dir, "index.md")
+            with open(source_path, "w") as file:
+                file.write(markdown)
+
+            write_page(os.path.join(tmp_dir, "page.html"), markdown, CompiledTemplate(TEMPLATE))
+            write_page_stream(os.path.join(tmp_dir, "stream.html"), source_path, CompiledTemplate(TEMPLATE))
+            for name in ("page.html", "stream.html"):
+                with open(os.path.join(tmp_dir, name)) as file:
+                    self.assertTrue(file.read().startswith("<title>Real</title>"))
+
+    def test_write_page_file_streams_large_files(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source_path = os.path.join(tmp_dir, "index.md")
+            dest_path = os.path.join(tmp_dir, "index.html")
+            with open(source_path, "w") as file:
+                file.write("# Hello\n\ntext")
+            write_page_file(dest_path, source_path, CompiledTemplate(TEMPLATE), stream_threshold=0)
+            with open(dest_path) as file:
+                self.assertEqual(file.read(), "<title>Hello</title><link href=\"/index.css\"><article><div><h1>Hello</h1><p>text</p></div></article>")
+
+    def test_write_page_stream_without_title(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source_path = os.path.join(tmp_dir, "index.md")
+            with open(source_path, "w") as file:
+                file.write("no heading here")
+            with self.assertRaises(Exception):
+                write_page_stream(os.path.join(tmp_dir, "index.html"), source_path, CompiledTemplate(TEMPLATE))
+            self.assertEqual(os.listdir(tmp_dir), ["index.md"])
+
+    def test_write_page_failure_leaves_no_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dest_path = os.path.join(tmp_dir, "index.html")
+            with self.assertRaises(Exception):
+                write_page(dest_path, "no heading here", CompiledTemplate(TEMPLATE))
+            self.assertFalse(os.path.exists(dest_path))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import unittest
+from buildplan import PlanEntry, RENDER
+from shard import *
+
+class TestShard(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_shard(self, name, index, count, pages):
+        shard_dir = os.path.join(self.tmp_dir.name, name)
+        paths = []
+        for rel_path, text in pages.items():
+            path = os.path.join(shard_dir, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as file:
+                file.write(text)
+            paths.append(path)
+        os.makedirs(shard_dir, exist_ok=True)
+        write_shard_manifest(shard_dir, index, count, paths)
+        return shard_dir
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for text in ("0/4", "5/4", "1/0", "a/b", "1", "1/2/3"):
+            with self.assertRaises(ValueError):
+                parse_shard(text)
+
+    def test_shard_of_is_stable(self):
+        self.assertEqual(shard_of("blog/tom/index.md", 4), shard_of("blog/tom/index.md", 4))
+        self.assertEqual(shard_of("index.md", 1), 1)
+        self.assertTrue(all(1 <= shard_of(f"page{i}.md", 3) <= 3 for i in range(100)))
+
+    def test_select_shard_partitions_pages(self):
+        entries = [PlanEntry(f"content/page{i}.md", f"page{i}.md", f"docs/page{i}.html", RENDER) for i in range(200)]
+        shards = [select_shard(entries, index, 4) for index in range(1, 5)]
+        self.assertEqual(sum(len(shard) for shard in shards), 200)
+        self.assertEqual(sorted(entry.rel_path for shard in shards for entry in shard), sorted(entry.rel_path for entry in entries))
+        self.assertTrue(all(shards))
+
+    def test_merge_shards(self):
+        first = self.write_shard("s1", 1, 2, {"index.html": "a", os.path.join("blog", "index.html"): "b"})
+        second = self.write_shard("s2", 2, 2, {os.path.join("contact", "index.html"): "c"})
+        dest_dir = os.path.join(self.tmp_dir.name, "docs")
+        os.makedirs(dest_dir)
+        merged = merge_shards([second, first], dest_dir)
+        self.assertEqual(merged["count"], 2)
+        self.assertEqual(merged["pages"]["index.html"]["shard"], 1)
+        with open(os.path.join(dest_dir, "contact", "index.html")) as file:
+            self.assertEqual(file.read(), "c")
+        with open(os.path.join(dest_dir, SHARD_MANIFEST_NAME)) as file:
+            self.assertEqual(len(json.load(file)["pages"]), 3)
+
+    def test_merge_identical_duplicate_is_fine(self):
+        first = self.write_shard("s1", 1, 2, {"index.html": "same"})
+        second = self.write_shard("s2", 2, 2, {"index.html": "same"})
+        dest_dir = os.path.join(self.tmp_dir.name, "docs")
+        self.assertEqual(len(merge_shards([first, second], dest_dir)["pages"]), 1)
+
+    def test_merge_conflict(self):
+        first = self.write_shard("s1", 1, 2, {"index.html": "a"})
+        second = self.write_shard("s2", 2, 2, {"index.html": "b"})
+        dest_dir = os.path.join(self.tmp_dir.name, "docs")
+        with self.assertRaises(Exception) as context:
+            merge_shards([first, second], dest_dir)
+        self.assertIn("index.html differs between shard 1 and shard 2", str(context.exception))
+        self.assertFalse(os.path.exists(os.path.join(dest_dir, "index.html")))
+
+    def test_merge_conflict_with_static(self):
+        first = self.write_shard("s1", 1, 1, {"index.css": "a"})
+        with self.assertRaises(Exception):
+            merge_shards([first], os.path.join(self.tmp_dir.name, "docs"), reserved=["index.css"])
+
+    def test_merge_into_shard_dir(self):
+        first = self.write_shard("s1", 1, 1, {"index.html": "a"})
+        for dest_dir in (first, self.tmp_dir.name):
+            with self.assertRaises(Exception) as context:
+                plan_merge([first], dest_dir)
+            self.assertIn("can't be or contain the shard directory", str(context.exception))
+        self.assertEqual(len(plan_merge([first], os.path.join(first, "docs"))["owners"]), 1)
+
+    def test_merge_missing_and_mismatched_shards(self):
+        first = self.write_shard("s1", 1, 3, {"a.html": "a"})
+        second = self.write_shard("s2", 2, 3, {"b.html": "b"})
+        other = self.write_shard("o", 2, 2, {"c.html": "c"})
+        dest_dir = os.path.join(self.tmp_dir.name, "docs")
+        with self.assertRaises(Exception) as context:
+            merge_shards([first, second], dest_dir)
+        self.assertIn("missing shards 3/3", str(context.exception))
+        with self.assertRaises(Exception):
+            merge_shards([first, other], dest_dir)
+        with self.assertRaises(Exception):
+            merge_shards([first, first], dest_dir)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+from staticsync import *
+from testfiles import write_file
+
+class TestStaticSync(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.src_dir = os.path.join(self.tmp_dir.name, "static")
+        self.dest_dir = os.path.join(self.tmp_dir.name, "docs")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_list_files(self):
+        write_file(os.path.join(self.src_dir, "index.css"), "a")
+        write_file(os.path.join(self.src_dir, "images", "a.png"), "bb")
+        files = list_files(self.src_dir)
+        self.assertEqual(sorted(files), [os.path.join("images", "a.png"), "index.css"])
+        self.assertEqual(files["index.css"].st_size, 1)
+
+    def test_first_sync_copies_everything(self):
+        write_file(os.path.join(self.src_dir, "index.css"), "body {}")
+        write_file(os.path.join(self.src_dir, "images", "a.png"), "png")
+        result = sync_static(self.src_dir, self.dest_dir)
+        self.assertEqual(sorted(result["copied"]), [os.path.join("images", "a.png"), "index.css"])
+        with open(os.path.join(self.dest_dir, "images", "a.png")) as file:
+            self.assertEqual(file.read(), "png")
+
+    def test_second_sync_leaves_files_untouched(self):
+        write_file(os.path.join(self.src_dir, "index.css"), "body {}")
+        sync_static(self.src_dir, self.dest_dir)
+        dest_path = os.path.join(self.dest_dir, "index.css")
+        os.utime(dest_path, ns=(0, os.stat(os.path.join(self.src_dir, "index.css")).st_mtime_ns))
+        result = sync_static(self.src_dir, self.dest_dir)
+        self.assertEqual(result["copied"], [])
+        self.assertEqual(result["unchanged"], ["index.css"])
+        self.assertEqual(os.stat(dest_path).st_atime_ns, 0)
+
+    def test_recorded_files_are_removed(self):
+        write_file(os.path.join(self.dest_dir, "index.0123456789.css"), "body {}")
+        record_synced_files(self.dest_dir, ["index.0123456789.css"])
+        write_file(os.path.join(self.src_dir, "index.css"), "body {}")
+        result = sync_static(self.src_dir, self.dest_dir)
+        self.assertEqual(result["removed"], ["index.0123456789.css"])
+        self.assertEqual(sorted(os.listdir(self.dest_dir)), [STATIC_STATE_NAME, "index.css"])
+
+    def test_changed_file_is_copied(self):
+        src_path = write_file(os.path.join(self.src_dir, "index.css"), "body {}")
+        sync_static(self.src_dir, self.dest_dir)
+        write_file(os.path.join(self.src_dir, "index.css"), "body { color: red; }")
+        result = sync_static(self.src_dir, self.dest_dir)
+        self.assertEqual(result["copied"], ["index.css"])
+        self.assertEqual(os.stat(os.path.join(self.dest_dir, "index.css")).st_mtime_ns, os.stat(src_path).st_mtime_ns)
+
+    def test_hash_detects_same_size_change(self):
+        src_path = write_file(os.path.join(self.src_dir, "index.css"), "aaaa")
+        sync_static(self.src_dir, self.dest_dir)
+        mtime = os.stat(src_path).st_mtime_ns
+        write_file(os.path.join(self.src_dir, "index.css"), "bbbb")
+        os.utime(src_path, ns=(mtime, mtime))
+        self.assertEqual(sync_static(self.src_dir, self.dest_dir)["copied"], [])
+        self.assertEqual(sync_static(self.src_dir, self.dest_dir, use_hash=True)["copied"], ["index.css"])
+
+    def test_removed_file_is_deleted(self):
+        write_file(os.path.join(self.src_dir, "images", "a.png"), "png")
+        write_file(os.path.join(self.src_dir, "index.css"), "body {}")
+        sync_static(self.src_dir, self.dest_dir)
+        os.remove(os.path.join(self.src_dir, "images", "a.png"))
+        result = sync_static(self.src_dir, self.dest_dir)
+        self.assertEqual(result["removed"], [os.path.join("images", "a.png")])
+        self.assertFalse(os.path.exists(os.path.join(self.dest_dir, "images")))
+
+    def test_dest_names(self):
+        write_file(os.path.join(self.src_dir, "index.css"), "body {}")
+        result = sync_static(self.src_dir, self.dest_dir, dest_names={"index.css": "index.1.css"})
+        self.assertEqual(result["copied"], ["index.1.css"])
+        self.assertTrue(os.path.exists(os.path.join(self.dest_dir, "index.1.css")))
+
+        result = sync_static(self.src_dir, self.dest_dir, dest_names={"index.css": "index.2.css"})
+        self.assertEqual((result["copied"], result["removed"]), (["index.2.css"], ["index.1.css"]))
+        self.assertFalse(os.path.exists(os.path.join(self.dest_dir, "index.1.css")))
+
+    def test_foreign_files_are_kept(self):
+        write_file(os.path.join(self.src_dir, "index.css"), "body {}")
+        page = write_file(os.path.join(self.dest_dir, "index.html"), "<html></html>")
+        sync_static(self.src_dir, self.dest_dir)
+        self.assertTrue(os.path.exists(page))
+
+    def test_link_sync_dedupes_and_is_stable(self):
+        write_file(os.path.join(self.src_dir, "a.png"), "same")
+        write_file(os.path.join(self.src_dir, "b.png"), "same")
+        result = sync_static(self.src_dir, self.dest_dir, link=True)
+        self.assertEqual(sorted(result["copied"]), ["a.png", "b.png"])
+        self.assertTrue(os.path.samefile(os.path.join(self.src_dir, "a.png"), os.path.join(self.dest_dir, "b.png")))
+        result = sync_static(self.src_dir, self.dest_dir, link=True)
+        self.assertEqual(result["copied"], [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+from blockcache import BlockCache
+from helperfunctions import markdown_to_html_node
+from leafnode import LeafNode
+from parentnode import ParentNode
+from profiler import BuildProfile, enable_profile
+from transform import *
+
+MARKDOWN = """# Hello **World**
+
+An ![image](/a.png) with [a link](https://example.com) and [another](/about).
+"""
+
+class Uppercase(Transform):
+    name = "uppercase"
+
+    def visit(self, node):
+        if isinstance(node, LeafNode) and node.tag is None:
+            return LeafNode(None, node.value.upper())
+        return node
+
+class TestTransform(unittest.TestCase):
+
+    def test_builtin_transforms(self):
+        pipeline = make_pipeline(["heading-anchors", "lazy-images", "external-links"])
+        html = markdown_to_html_node(MARKDOWN, transforms=pipeline).to_html()
+        self.assertEqual(html,
+            "<div><h1><a id=\"hello-world\"></a>Hello <b>World</b></h1>"
+            "<p>An <img src=\"/a.png\" alt=\"image\" loading=\"lazy\" decoding=\"async\"></img> with "
+            "<a href=\"https://example.com\" rel=\"external noopener\">a link</a> and <a href=\"/about\">another</a>.</p></div>")
+
+    def test_no_transforms_same_html(self):
+        self.assertEqual(markdown_to_html_node(MARKDOWN, transforms=TransformPipeline()).to_html(), markdown_to_html_node(MARKDOWN).to_html())
+
+    def test_single_traversal_and_replacement(self):
+        pipeline = TransformPipeline([Uppercase(), LazyImages()])
+        tree = ParentNode("p", [LeafNode(None, "text "), LeafNode("img", "", {"src": "/a.png"})])
+        tree = pipeline.apply(tree)
+        self.assertEqual(tree.to_html(), "<p>TEXT <img src=\"/a.png\" loading=\"lazy\" decoding=\"async\"></img></p>")
+        self.assertEqual(pipeline.stats["uppercase"]["calls"], 3)
+        self.assertEqual(pipeline.stats["lazy-images"]["calls"], 1)
+
+    def test_props_are_not_shared(self):
+        props = {"src": "/a.png"}
+        node = LazyImages().visit(LeafNode("img", "", props))
+        self.assertEqual(props, {"src": "/a.png"})
+        self.assertEqual(node.props["loading"], "lazy")
+
+    def test_props_on_parent_nodes_are_rejected(self):
+        class ParagraphClass(Transform):
+            name = "paragraph-class"
+            tags = ("p",)
+
+            def visit(self, node):
+                return with_props(node, **{"class": "lead"})
+
+        with self.assertRaises(ValueError) as context:
+            markdown_to_html_node("Some text", transforms=TransformPipeline([ParagraphClass()]))
+        self.assertIn("transform paragraph-class set props on <p>", str(context.exception))
+
+    def test_image_dimensions(self):
+        pipeline = make_pipeline(["lazy-images"], [ImageDimensions({"/a.png": (640, 480)})])
+        html = pipeline.apply(ParentNode("p", [LeafNode("img", "", {"src": "/a.png"}), LeafNode("img", "", {"src": "/b.png"})])).to_html()
+        self.assertEqual(html, "<p><img src=\"/a.png\" width=\"640\" height=\"480\" loading=\"lazy\" decoding=\"async\"></img>"
+            "<img src=\"/b.png\" loading=\"lazy\" decoding=\"async\"></img></p>")
+        self.assertEqual(pipeline.key, ("image-dimensions", "lazy-images"))
+        self.assertEqual(pipeline.inputs(["/a.png", "/b.png", "/about"]), {"image:/a.png": "640x480", "image:/b.png": None})
+
+    def test_heading_ids_unique_per_page(self):
+        markdown = "# Intro\n\n## Intro\n\n## Intro-2\n\n### Intro"
+        expected = "<div><h1><a id=\"intro\"></a>Intro</h1><h2><a id=\"intro-2\"></a>Intro</h2><h2><a id=\"intro-2-2\"></a>Intro-2</h2><h3><a id=\"intro-3\"></a>Intro</h3></div>"
+        pipeline = make_pipeline(["heading-anchors"])
+        self.assertEqual(markdown_to_html_node(markdown, transforms=pipeline).to_html(), expected)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = BlockCache(os.path.join(tmp_dir, "blocks.sqlite"))
+            markdown_to_html_node(markdown, block_cache=cache, transforms=pipeline)
+            self.assertEqual(markdown_to_html_node(markdown, block_cache=cache, transforms=pipeline).to_html(), expected)
+            self.assertEqual(cache.hits, 4)
+            cache.close()
+        self.assertIsNone(make_pipeline(["lazy-images"]).page_pass())
+
+    def test_slugify(self):
+        self.assertEqual(slugify("Hello, World!"), "hello-world")
+        self.assertEqual(slugify("  Über  _ 42 "), "über-42")
+
+    def test_timings_go_to_profile(self):
+        profile = BuildProfile()
+        enable_profile(profile)
+        try:
+            make_pipeline(["lazy-images"]).apply(ParentNode("p", [LeafNode("img", "", {"src": "/a.png"})]))
+        finally:
+            enable_profile(None)
+        self.assertEqual(profile.phases["transform.lazy-images"]["calls"], 1)
+
+    def test_transforms_are_part_of_block_cache_key(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = BlockCache(os.path.join(tmp_dir, "blocks.sqlite"))
+            plain = markdown_to_html_node(MARKDOWN, block_cache=cache).to_html()
+            lazy = markdown_to_html_node(MARKDOWN, block_cache=cache, transforms=make_pipeline(["lazy-images"])).to_html()
+            self.assertNotEqual(plain, lazy)
+            self.assertIn("loading=\"lazy\"", lazy)
+            cache.close()
+
+if __name__ == "__main__":
+    unittest.main()
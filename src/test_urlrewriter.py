@@ -0,0 +1,56 @@
+import unittest
+from urlrewriter import UrlRewriter, html_urls
+
+class TestUrlRewriter(unittest.TestCase):
+
+    def test_default_keeps_urls(self):
+        self.assertEqual(UrlRewriter().rewrite("/images/tom.png"), "/images/tom.png")
+
+    def test_base_path(self):
+        self.assertEqual(UrlRewriter("/www/").rewrite("/images/tom.png"), "/www/images/tom.png")
+        self.assertEqual(UrlRewriter("/www/").rewrite("/"), "/www/")
+
+    def test_base_path_without_trailing_slash(self):
+        self.assertEqual(UrlRewriter("/www").rewrite("/blog"), "/www/blog")
+
+    def test_other_urls_untouched(self):
+        rewriter = UrlRewriter("/www/")
+        self.assertEqual(rewriter.rewrite("https://github.com/PaulSteindl"), "https://github.com/PaulSteindl")
+        self.assertEqual(rewriter.rewrite("//cdn.example.com/a.js"), "//cdn.example.com/a.js")
+        self.assertEqual(rewriter.rewrite("images/tom.png"), "images/tom.png")
+        self.assertEqual(rewriter.rewrite("#top"), "#top")
+
+    def test_rewrite_html(self):
+        html = "<link href=\"/index.css\" rel=\"stylesheet\" /><script src=\"https://x.org/a.js\"></script><a data-href=\"/x\">"
+        self.assertEqual(
+            UrlRewriter("/www/").rewrite_html(html),
+            "<link href=\"/www/index.css\" rel=\"stylesheet\" /><script src=\"https://x.org/a.js\"></script><a data-href=\"/x\">"
+        )
+
+    def test_asset_map(self):
+        rewriter = UrlRewriter("/www/", {"/index.css": "/index.0123456789.css"})
+        self.assertEqual(rewriter.rewrite("/index.css"), "/www/index.0123456789.css")
+        self.assertEqual(rewriter.rewrite("/index.css?v=2#top"), "/www/index.0123456789.css?v=2#top")
+        self.assertEqual(rewriter.rewrite("/blog"), "/www/blog")
+        self.assertEqual(rewriter.rewrite("index.css"), "index.css")
+
+    def test_asset_map_is_part_of_key(self):
+        self.assertNotEqual(UrlRewriter("/", {"/a.css": "/a.1.css"}), UrlRewriter("/", {"/a.css": "/a.2.css"}))
+        self.assertEqual(UrlRewriter("/", {"/a.css": "/a.1.css"}), UrlRewriter("/", {"/a.css": "/a.1.css"}))
+        self.assertEqual(UrlRewriter("/", {}), UrlRewriter("/"))
+
+    def test_inputs(self):
+        rewriter = UrlRewriter("/www/", {"/index.css": "/index.0123456789.css"})
+        self.assertEqual(rewriter.inputs(["/index.css?v=2", "/blog", "https://x.org/a.css", "index.css"]), {"asset:/index.css": "/index.0123456789.css", "asset:/blog": None})
+        self.assertEqual(UrlRewriter("/www/").inputs(["/index.css"]), {})
+
+    def test_html_urls(self):
+        self.assertEqual(html_urls("<link href=\"/index.css\" /><img src=\"/a.png\"><a data-href=\"/x\">"), ["/index.css", "/a.png"])
+
+    def test_eq_and_hash(self):
+        self.assertEqual(UrlRewriter("/www/"), UrlRewriter("/www"))
+        self.assertNotEqual(UrlRewriter("/www/"), UrlRewriter("/"))
+        self.assertEqual(hash(UrlRewriter("/www/")), hash(UrlRewriter("/www/")))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,10 @@
+import os
+
+"""
+Test fixture: writes data (str or bytes) to path, creating its directories. Returns path.
+"""
+def write_file(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb" if isinstance(data, bytes) else "w") as file:
+        file.write(data)
+    return path
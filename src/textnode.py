@@ -15,6 +15,8 @@ class TextNode():
     text_type - The type of text this node contains, which is a member of the TextType enum.
     url - The URL of the link or image, if the text is a link. Default to None if nothing is passed in.
     """
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url = None):
         self.text = text
         self.text_type = text_type
@@ -0,0 +1,272 @@
+import re
+import time
+from depgraph import IMAGE, input_key
+from imageheaders import is_image
+from leafnode import LeafNode
+from parentnode import ParentNode
+from profiler import active_profile
+from rawnode import RawNode
+
+REGEX_SLUG_SEPARATORS = re.compile(r"[\W_]+")
+REGEX_HEADING_ANCHOR = re.compile(r"<h[1-6]><a id=\"([^\"]*)\"></a>")
+
+class Transform():
+
+    """
+    A change to the node tree of a page, applied by a TransformPipeline.
+    name - Name on the command line and of the timing counter
+    tags - Tags of the nodes visit is called for, None visits every node
+    key - What the output of the transform depends on besides the node and the urls, part of the block cache key
+    inputs(urls) - What the output depends on per referenced url, see TransformPipeline.inputs
+    visit(node) returns the node that takes the place of node, usually node itself changed in place.
+    Only leaf nodes (img, a, code, ...) render their props. Block tags like p, h1-h6, ul or blockquote are ParentNodes,
+    which render as plain tags, so the pipeline rejects a ParentNode with props instead of silently dropping them.
+    Transforms see one node at a time and keep no state between nodes, so a block renders the same
+    on every page and its cached html stays valid.
+    page_pass() - None, or a fresh object whose block(node) sees the top-level block nodes of one page in order,
+    after the block cache, for changes that depend on the rest of the page
+    """
+    name = None
+    tags = None
+
+    @property
+    def key(self):
+        return (self.name,)
+
+    def inputs(self, urls):
+        return {}
+
+    def visit(self, node):
+        return node
+
+    def page_pass(self):
+        return None
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+def with_props(node, **props):
+    node.props = {**node.props, **props} if node.props else props
+    return node
+
+class LazyImages(Transform):
+
+    """
+    Images load lazily and decode off the main thread.
+    """
+    name = "lazy-images"
+    tags = ("img",)
+
+    def visit(self, node):
+        return with_props(node, loading="lazy", decoding="async")
+
+class ExternalLinks(Transform):
+
+    """
+    Links to other sites (http:// and https:// urls) get rel="external noopener".
+    """
+    name = "external-links"
+    tags = ("a",)
+
+    def visit(self, node):
+        href = node.props.get("href", "") if node.props else ""
+        if href.startswith(("http://", "https://")):
+            return with_props(node, rel="external noopener")
+        return node
+
+class ImageDimensions(Transform):
+
+    """
+    Images with a known size get width and height, so the browser reserves their space before they load.
+    dimensions - dict of src url -> (width, height), see imageheaders.image_dimensions
+    A page only depends on the sizes of the images it references, not on the whole map.
+    """
+    name = "image-dimensions"
+    tags = ("img",)
+
+    def __init__(self, dimensions):
+        self.dimensions = dimensions
+
+    def inputs(self, urls):
+        inputs = {}
+        for url in urls:
+            if is_image(url):
+                size = self.dimensions.get(url)
+                inputs[input_key(IMAGE, url)] = f"{size[0]}x{size[1]}" if size else None
+        return inputs
+
+    def visit(self, node):
+        size = self.dimensions.get(node.props.get("src")) if node.props else None
+        if size is None:
+            return node
+        return with_props(node, width=str(size[0]), height=str(size[1]))
+
+def node_text(node):
+    if not isinstance(node, ParentNode):
+        return node.value if node.tag != "img" and node.value else ""
+    return "".join(node_text(child) for child in node.children)
+
+def slugify(text):
+    return REGEX_SLUG_SEPARATORS.sub("-", text.lower()).strip("-")
+
+class HeadingAnchors(Transform):
+
+    """
+    Headings start with an empty <a id="slug"></a> anchor, so page.html#slug links to them.
+    Blocks are cached without knowing the page, so ids are made unique per page afterwards by UniqueAnchors.
+    """
+    name = "heading-anchors"
+    tags = ("h1", "h2", "h3", "h4", "h5", "h6")
+
+    def visit(self, node):
+        slug = slugify(node_text(node))
+        if slug and isinstance(node, ParentNode):
+            node.children.insert(0, LeafNode("a", "", {"id": slug}))
+        return node
+
+    def page_pass(self):
+        return UniqueAnchors()
+
+class UniqueAnchors():
+
+    """
+    Page pass of HeadingAnchors: the second heading with the same slug gets the id "slug-2", the third "slug-3" and so on,
+    skipping ids already taken. Headings are blocks, so their anchor is always right at the start of a block,
+    either the first child of the heading node or, from the block cache, at the start of its html.
+    """
+    def __init__(self):
+        self.used = set()
+
+    def unique(self, slug):
+        candidate = slug
+        count = 1
+        while candidate in self.used:
+            count += 1
+            candidate = f"{slug}-{count}"
+        self.used.add(candidate)
+        return candidate
+
+    def block(self, node):
+        if isinstance(node, RawNode):
+            anchor = REGEX_HEADING_ANCHOR.match(node.value)
+            if anchor:
+                slug = self.unique(anchor.group(1))
+                if slug != anchor.group(1):
+                    return RawNode(node.value[:anchor.start(1)] + slug + node.value[anchor.end(1):])
+            return node
+
+        if node.tag in HeadingAnchors.tags and isinstance(node, ParentNode) and node.children:
+            anchor = node.children[0]
+            if anchor.tag == "a" and anchor.props and "id" in anchor.props:
+                with_props(anchor, id=self.unique(anchor.props["id"]))
+        return node
+
+TRANSFORMS = {transform.name: transform for transform in (HeadingAnchors, LazyImages, ExternalLinks)}
+
+class TransformPipeline():
+
+    """
+    Applies several transforms in one traversal of the tree, every node is visited once
+    and handed to the transforms registered for its tag in registration order.
+    A transform that sets props on a ParentNode raises a ValueError, see Transform.
+    stats - dict of transform name -> {"wall", "cpu", "calls"}, the time spent in each transform.
+    With an active build profile the times also go to its "transform.<name>" phases.
+    key - The keys of all transforms, for the block cache and the dependency graph
+    """
+    def __init__(self, transforms=()):
+        self.transforms = list(transforms)
+        self.key = tuple(part for transform in self.transforms for part in transform.key)
+        self.stats = {transform.name: {"wall": 0.0, "cpu": 0.0, "calls": 0} for transform in self.transforms}
+        self.dispatch = {}
+
+    def __bool__(self):
+        return bool(self.transforms)
+
+    def transforms_for(self, tag):
+        transforms = self.dispatch.get(tag)
+        if transforms is None:
+            transforms = self.dispatch[tag] = [transform for transform in self.transforms if transform.tags is None or tag in transform.tags]
+        return transforms
+
+    """
+    dict of input key -> fingerprint of everything the transforms look up for the urls, e.g. image sizes.
+    urls - The urls as they appear in the html, after rewriting
+    """
+    def inputs(self, urls):
+        inputs = {}
+        for transform in self.transforms:
+            inputs.update(transform.inputs(urls))
+        return inputs
+
+    """
+    A PagePass over the page passes of the transforms for one page, None if no transform has one.
+    """
+    def page_pass(self):
+        passes = [page_pass for page_pass in (transform.page_pass() for transform in self.transforms) if page_pass is not None]
+        return PagePass(passes) if passes else None
+
+    def visit(self, node, timings):
+        for transform in self.transforms_for(node.tag):
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            node = transform.visit(node)
+            if node.props and isinstance(node, ParentNode):
+                raise ValueError(f"transform {transform.name} set props on <{node.tag}>, only leaf nodes render their props")
+            timing = timings[transform.name]
+            timing[0] += time.perf_counter() - wall_start
+            timing[1] += time.process_time() - cpu_start
+            timing[2] += 1
+        return node
+
+    """
+    Transforms the tree below root (root included) and returns its new root.
+    """
+    def apply(self, root):
+        if not self.transforms:
+            return root
+
+        timings = {name: [0.0, 0.0, 0] for name in self.stats}
+        root = self.visit(root, timings)
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if not isinstance(node, ParentNode) or not node.children:
+                continue
+            children = node.children
+            for i, child in enumerate(children):
+                child = children[i] = self.visit(child, timings)
+                stack.append(child)
+
+        profile = active_profile()
+        for name, (wall, cpu, calls) in timings.items():
+            stats = self.stats[name]
+            stats["wall"] += wall
+            stats["cpu"] += cpu
+            stats["calls"] += calls
+            if profile and calls:
+                profile.add_phase(f"transform.{name}", wall, cpu, calls)
+        return root
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.transforms})"
+
+class PagePass():
+
+    """
+    Hands the top-level block nodes of a page to every page pass in order.
+    """
+    def __init__(self, passes):
+        self.passes = passes
+
+    def block(self, node):
+        for page_pass in self.passes:
+            node = page_pass.block(node)
+        return node
+
+"""
+Pipeline of transforms followed by the built-in transforms with the given names, in that order, a repeated name runs once.
+"""
+def make_pipeline(names, transforms=()):
+    return TransformPipeline([*transforms, *(TRANSFORMS[name]() for name in dict.fromkeys(names))])
+
+NO_TRANSFORMS = TransformPipeline()
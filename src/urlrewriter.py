@@ -0,0 +1,79 @@
+import hashlib
+import re
+from depgraph import ASSET, input_key
+
+REGEX_TEMPLATE_URLS = re.compile(r"(?<=\s)(href|src)=\"([^\"]*)\"")
+REGEX_URL_SUFFIX = re.compile(r"[?#]")
+
+"""
+Short stable fingerprint of an asset map, used in cache keys instead of the whole map.
+"""
+def asset_map_digest(asset_map):
+    hasher = hashlib.sha256()
+    for url, fingerprinted_url in sorted(asset_map.items()):
+        hasher.update(f"{url}\0{fingerprinted_url}\0".encode())
+    return hasher.hexdigest()
+
+class UrlRewriter():
+
+    """
+    base_path - The prefix site-absolute urls ("/images/a.png") are served under, e.g. "/staticSiteGenerator/"
+    asset_map - Optional dict of site-absolute asset url -> fingerprinted url, e.g. "/index.css" -> "/index.3f2a1b9c04.css"
+    """
+    def __init__(self, base_path="/", asset_map=None):
+        self.base_path = base_path if base_path.endswith("/") else base_path + "/"
+        self.asset_map = asset_map or {}
+        self.key = (self.base_path, asset_map_digest(self.asset_map)) if self.asset_map else (self.base_path,)
+
+    """
+    Rewrites a single url. Only site-absolute urls are touched,
+    relative, external ("https://...") and protocol-relative ("//cdn...") urls stay as they are.
+    Assets of the asset map get their fingerprinted name, a query or fragment is kept.
+    """
+    def rewrite(self, url):
+        if not url.startswith("/") or url.startswith("//"):
+            return url
+        if self.asset_map:
+            suffix = REGEX_URL_SUFFIX.search(url)
+            path, rest = (url[:suffix.start()], url[suffix.start():]) if suffix else (url, "")
+            url = self.asset_map.get(path, path) + rest
+        return self.base_path + url[1:]
+
+    """
+    The fingerprinted url of every site-absolute url as a dict of "asset:<url>" -> fingerprinted url,
+    None for urls that aren't assets, so an asset added later under that url is noticed too.
+    Empty without an asset map, the urls then only depend on base_path.
+    """
+    def inputs(self, urls):
+        if not self.asset_map:
+            return {}
+
+        inputs = {}
+        for url in urls:
+            if url.startswith("/") and not url.startswith("//"):
+                path = REGEX_URL_SUFFIX.split(url, 1)[0]
+                inputs[input_key(ASSET, path)] = self.asset_map.get(path)
+        return inputs
+
+    """
+    Rewrites every href="..." and src="..." attribute of an html document in one pass.
+    """
+    def rewrite_html(self, html):
+        return REGEX_TEMPLATE_URLS.sub(lambda match: f"{match.group(1)}=\"{self.rewrite(match.group(2))}\"", html)
+
+    def __eq__(self, value):
+        return isinstance(value, UrlRewriter) and self.key == value.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.base_path})"
+
+"""
+The urls of the href="..." and src="..." attributes rewrite_html rewrites, e.g. of a template.
+"""
+def html_urls(html):
+    return [match.group(2) for match in REGEX_TEMPLATE_URLS.finditer(html)]
+
+DEFAULT_URL_REWRITER = UrlRewriter()